@@ -0,0 +1,256 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Streaming accumulators for per-cell statistics.
+# Use these with make_a_netCDF_file.py so that the mean and standard deviation
+# can be built one satellite track at a time, instead of keeping every track in memory.
+
+# Welford's online algorithm is described here:
+# https://en.wikipedia.org/wiki/Algorithms_for_calculating_variance
+
+# The effective sample size uses the lag-1 autocorrelation r1 of each cell's readings (in the order they were added):
+# n_eff = n (1 - r1) / (1 + r1)
+# r1 is built up in the same pass from the sum of the products of consecutive readings.
+
+# A CompositeAccumulator can be saved to a checkpoint (.npz) and loaded again,
+# so a composite can be updated with new tracks without reading the old ones again.
+
+import os
+import numpy as np
+
+def lastReadingPerCell(cellIndices, readings):
+    """ Keep one reading per cell, using the last reading for that cell in the track.
+    This matches assigning the readings into a row of nCells with fancy indexing,
+    where a later reading overwrites an earlier one in the same cell. """
+    reversedCells = cellIndices[::-1]
+    uniqueCells, firstInReversed = np.unique(reversedCells, return_index=True)
+    return uniqueCells, readings[::-1][firstInReversed]
+
+def reduceTrackReadings(cellIndices, readings):
+    """ Reduce one satellite track to the readings used for the observed freeboard statistics.
+    Only the last reading per cell is used, and only readings above zero are counted. """
+    cells, values = lastReadingPerCell(np.asarray(cellIndices), np.asarray(readings))
+    positive = values > 0
+    return cells[positive], values[positive]
+
+class FreeboardAccumulator:
+    """ Keeps a running count, mean and M2 (sum of squared differences from the mean)
+    for every cell on the mesh. Memory is O(nCells) no matter how many tracks are added. 
+    For the lag-1 autocorrelation it also keeps the first and last reading of each cell
+    and the sum of the products of consecutive readings (measured from the first reading, 
+    which keeps the sums small). """
+
+    def __init__(self, cellCount):
+        self.cellCount      = cellCount
+        self.count          = np.zeros(cellCount, dtype=np.int64)
+        self.mean           = np.zeros(cellCount, dtype=np.float64)
+        self.m2             = np.zeros(cellCount, dtype=np.float64)
+        self.first          = np.zeros(cellCount, dtype=np.float64)
+        self.last           = np.zeros(cellCount, dtype=np.float64)
+        self.lagProducts    = np.zeros(cellCount, dtype=np.float64)
+
+    def addReadings(self, cellIndices, readings):
+        """ Add one reading per cell (cellIndices must be unique).
+        This is Welford's update, done for all cells in the track at once. 
+        Readings must be added in time order for the autocorrelation to be right. """
+        readings = np.asarray(readings, dtype=np.float64)
+
+        # Product of this reading and the cell's previous reading, both measured from the cell's first reading
+        isFirst = self.count[cellIndices] == 0
+        self.first[cellIndices] = np.where(isFirst, readings, self.first[cellIndices])
+        previous = self.last[cellIndices] - self.first[cellIndices]
+        current = readings - self.first[cellIndices]
+        self.lagProducts[cellIndices] += np.where(isFirst, 0.0, previous * current)
+        self.last[cellIndices] = readings
+
+        self.count[cellIndices] += 1
+        delta = readings - self.mean[cellIndices]
+        self.mean[cellIndices] += delta / self.count[cellIndices]
+        self.m2[cellIndices] += delta * (readings - self.mean[cellIndices])
+
+    def getState(self, prefix):
+        """ Return the count, mean, M2 and lag-1 arrays as a dictionary, for a checkpoint. """
+        return {prefix + "Count": self.count, prefix + "Mean": self.mean, prefix + "M2": self.m2,
+                prefix + "First": self.first, prefix + "Last": self.last, prefix + "LagProducts": self.lagProducts}
+
+    def setState(self, state, prefix):
+        """ Restore the arrays saved by getState. """
+        self.count          = np.array(state[prefix + "Count"], dtype=np.int64)
+        self.mean           = np.array(state[prefix + "Mean"], dtype=np.float64)
+        self.m2             = np.array(state[prefix + "M2"], dtype=np.float64)
+        self.first          = np.array(state[prefix + "First"], dtype=np.float64)
+        self.last           = np.array(state[prefix + "Last"], dtype=np.float64)
+        self.lagProducts    = np.array(state[prefix + "LagProducts"], dtype=np.float64)
+
+    def getMean(self):
+        """ Return the mean per cell. Cells with no readings are NaN. """
+        means = np.full(self.cellCount, np.nan)
+        hasData = self.count > 0
+        means[hasData] = self.mean[hasData]
+        return means
+
+    def getStandardDeviation(self):
+        """ Return the population standard deviation per cell (like np.std).
+        Cells with no readings are NaN. """
+        stdDeviations = np.full(self.cellCount, np.nan)
+        hasData = self.count > 0
+        stdDeviations[hasData] = np.sqrt(self.m2[hasData] / self.count[hasData])
+        return stdDeviations
+
+    def getLag1Autocorrelation(self):
+        """ Return the lag-1 autocorrelation per cell:
+        r1 = sum((x[t] - mean) * (x[t+1] - mean)) / sum((x[t] - mean)**2).
+        Cells with fewer than 2 readings, or with the same reading every time, are 0. """
+        autocorrelations = np.zeros(self.cellCount)
+        hasData = (self.count > 1) & (self.m2 > 0)
+        count = self.count[hasData]
+        mean = self.mean[hasData] - self.first[hasData]     # Measured from the first reading, like lagProducts
+        total = count * mean
+        lastReading = self.last[hasData] - self.first[hasData]
+
+        # Expand the sum of products around the mean; the first reading is 0 when measured from itself
+        numerator = self.lagProducts[hasData] - mean * (2 * total - lastReading) + (count - 1) * mean**2
+        autocorrelations[hasData] = numerator / self.m2[hasData]
+        return autocorrelations
+
+    def getEffectiveSampleSize(self):
+        """ Return the effective sample size per cell, n (1 - r1) / (1 + r1). 
+        A negative r1 is treated as 0, so the effective sample size is never more than the count.
+        Cells with no readings are NaN. """
+        effectiveSampleSizes = np.full(self.cellCount, np.nan)
+        hasData = self.count > 0
+        r1 = np.clip(self.getLag1Autocorrelation()[hasData], 0.0, 1.0)
+        effectiveSampleSizes[hasData] = self.count[hasData] * (1 - r1) / (1 + r1)
+        return effectiveSampleSizes
+
+def packCellsPerDay(cellsPerDay):
+    """ Pack a dictionary of (year, month, day) -> cell indices into CSR arrays:
+    the days, the offset of each day's cells, and all of the cells one day after another. """
+    days = sorted(cellsPerDay)
+    counts = [len(cellsPerDay[day]) for day in days]
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+    cells = np.concatenate([cellsPerDay[day] for day in days]) if days else np.array([], dtype=np.int64)
+    return np.array(days, dtype=np.int64).reshape(-1, 3), offsets, cells.astype(np.int64)
+
+def unpackCellsPerDay(days, offsets, cells):
+    """ Return the dictionary packed by packCellsPerDay. """
+    return {tuple(day): cells[offsets[i]:offsets[i + 1]] for i, day in enumerate(days.tolist())}
+
+class CompositeAccumulator:
+    """ Everything needed to write one composite file (i.e. spring_2003.nc):
+    the samplemf and sampleof counts, and the observed and model freeboard accumulators. 
+    The model freeboard is only sampled where the satellite was: on each day, at the model cells 
+    of that day's tracks. Those cells are kept per day, so memory grows with the number of cells 
+    the tracks passed over, not with days x nCells. """
+
+    def __init__(self, cellCount, fingerprint="", selectedFileIndices=()):
+        self.cellCount          = cellCount
+        self.samples            = np.zeros(cellCount)
+        self.observations       = np.zeros(cellCount)
+        self.observedFreeboard  = FreeboardAccumulator(cellCount)
+        self.modelFreeboard     = FreeboardAccumulator(cellCount)
+
+        # Synchronizer indices of the tracks already added
+        self.ingestedFileIndices    = set()
+
+        # The mesh and synchronizer the composite is built from (see make_a_netCDF_file.getInputFingerprint),
+        # and the synchronizer indices of every track in the composite's selection
+        self.fingerprint            = fingerprint
+        self.selectedFileIndices    = [int(fileIndex) for fileIndex in selectedFileIndices]
+
+        # (year, month, day) -> unique model cells passed over by that day's tracks,
+        # and the cells of that day whose model freeboard has already been added
+        self.modelCellsPerDay       = {}
+        self.addedModelCellsPerDay  = {}
+
+    def addTrack(self, cellIndicesForAllSamples, cellIndicesForAllObservations, observedCells, observedReadings, 
+                 fileIndex=None, modelDay=None):
+        """ Add one reduced satellite track (see make_a_netCDF_file.readOneSatelliteTrack). 
+        fileIndex is the track's index in the synchronizer, so a checkpoint knows the track was added.
+        modelDay is the track's (year, month, day) in the model; the model freeboard of that day
+        will be sampled at the track's model cells. Leave it as None if the model has no such day. """
+
+        # Sample model freeboard is the # of times that cell was passed over 
+        # (ex. once in a day) in the full time
+        self.samples += np.bincount(cellIndicesForAllSamples, minlength=self.samples.size)
+
+        # Sample observation freeboard is the # of photon reads per cell over full time
+        self.observations += np.bincount(cellIndicesForAllObservations, minlength=self.observations.size)
+
+        # Update the running mean and standard deviation with this track's freeboard readings
+        self.observedFreeboard.addReadings(observedCells, observedReadings)
+
+        if modelDay is not None:
+            modelDay = tuple(int(value) for value in modelDay)
+            previousCells = self.modelCellsPerDay.get(modelDay, np.array([], dtype=np.int64))
+            self.modelCellsPerDay[modelDay] = np.union1d(previousCells, cellIndicesForAllSamples)
+
+        if fileIndex is not None:
+            self.ingestedFileIndices.add(int(fileIndex))
+
+    def getPendingModelCells(self, modelDay):
+        """ Return the cells of modelDay whose model freeboard has not been added yet. """
+        cells = self.modelCellsPerDay.get(modelDay, np.array([], dtype=np.int64))
+        if modelDay not in self.addedModelCellsPerDay:
+            return cells
+        return np.setdiff1d(cells, self.addedModelCellsPerDay[modelDay], assume_unique=True)
+
+    def getPendingModelDays(self):
+        """ Return the model days, in order, that have cells whose model freeboard has not been added yet. """
+        return [modelDay for modelDay in sorted(self.modelCellsPerDay) if len(self.getPendingModelCells(modelDay)) > 0]
+
+    def addModelDay(self, modelFreeboard, modelDay):
+        """ Add one day of model freeboard (for all cells), sampled at the cells the tracks 
+        of that day passed over. modelDay is (year, month, day). """
+        cells = self.getPendingModelCells(modelDay)
+        self.modelFreeboard.addReadings(cells, np.asarray(modelFreeboard)[cells])
+        self.addedModelCellsPerDay[modelDay] = self.modelCellsPerDay[modelDay]
+
+    def saveCheckpoint(self, fileName):
+        """ Save the counts, the accumulators, the tracks added so far, the model cells of each day,
+        the fingerprint and the selection to a .npz file.
+        The file is written next to fileName first and then renamed, so a run that dies 
+        while saving leaves the last checkpoint as it was. """
+        modelDays, modelCellOffsets, modelCells = packCellsPerDay(self.modelCellsPerDay)
+        addedModelDays, addedModelCellOffsets, addedModelCells = packCellsPerDay(self.addedModelCellsPerDay)
+
+        temporaryFileName = fileName + ".tmp"
+        with open(temporaryFileName, "wb") as checkpointFile:
+            np.savez(checkpointFile, 
+                     cellCount                  = self.cellCount,
+                     fingerprint                = np.array(self.fingerprint),
+                     selectedFileIndices        = np.array(self.selectedFileIndices, dtype=np.int64),
+                     samples                    = self.samples,
+                     observations               = self.observations,
+                     ingestedFileIndices        = np.array(sorted(self.ingestedFileIndices), dtype=np.int64),
+                     modelDays                  = modelDays,
+                     modelCellOffsets           = modelCellOffsets,
+                     modelCells                 = modelCells,
+                     addedModelDays             = addedModelDays,
+                     addedModelCellOffsets      = addedModelCellOffsets,
+                     addedModelCells            = addedModelCells,
+                     **self.observedFreeboard.getState("observed"),
+                     **self.modelFreeboard.getState("model"))
+        os.replace(temporaryFileName, fileName)
+
+    @classmethod
+    def fromCheckpoint(cls, fileName, cellCount=None):
+        """ Load a CompositeAccumulator saved by saveCheckpoint. 
+        Raises ValueError if cellCount is given and the checkpoint is for a different mesh. """
+        with np.load(fileName) as state:
+            if cellCount is not None and int(state["cellCount"]) != cellCount:
+                raise ValueError(f"Checkpoint {fileName} has {int(state['cellCount'])} cells, but the mesh has {cellCount}")
+
+            # Checkpoints saved before the fingerprint was added never match one
+            composite = cls(int(state["cellCount"]), str(state["fingerprint"]) if "fingerprint" in state else "",
+                            state["selectedFileIndices"].tolist() if "selectedFileIndices" in state else ())
+            composite.samples                   = state["samples"]
+            composite.observations              = state["observations"]
+            composite.ingestedFileIndices       = set(state["ingestedFileIndices"].tolist())
+            composite.modelCellsPerDay          = unpackCellsPerDay(state["modelDays"], state["modelCellOffsets"], 
+                                                                    state["modelCells"])
+            composite.addedModelCellsPerDay     = unpackCellsPerDay(state["addedModelDays"], state["addedModelCellOffsets"], 
+                                                                    state["addedModelCells"])
+            composite.observedFreeboard.setState(state, "observed")
+            composite.modelFreeboard.setState(state, "model")
+        return composite
@@ -0,0 +1,181 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+##########
+# TO RUN #
+##########
+
+# Use this with e3sm_data_over_time_visualization.py.
+# The maps, scatter plots, color bars and time box are made once;
+# each frame only changes the colors of the scatter plots and the text in the time box.
+
+import matplotlib.pyplot as plt
+import matplotlib.animation as animation
+from e3sm_data_visualization import *
+from utility import *
+from streaming_writer import *
+import multiprocessing
+from PIL import Image
+
+def gatherFramesFromFiles(filePaths, keyVariableToPlot=VARIABLETOPLOT, fileMax=None):
+    """ Return one (file path, day number, time string) per day in each file, in order.
+    Only the file path is kept, so the dataset can be reopened from the dataset pool when the frame is drawn. """
+    frames = []
+    for fileIndex, filePath in enumerate(filePaths):
+        if fileIndex == fileMax:
+            break
+
+        output = loadData("", filePath)
+        days = getNumberOfDays(output, keyVariableToPlot)
+        timeList = printDateTime(output, timeStringVariable=START_TIME_VARIABLE, days=days, printTimes=False)
+        if isinstance(timeList, str):
+            timeList = [timeList]
+
+        for day in range(days):
+            frames.append((filePath, day, str(timeList[day]) if day < len(timeList) else ""))
+
+    return frames
+
+class PolarAnimationEngine:
+    """ Draws an animation of one or both poles from a list of frames (see gatherFramesFromFiles).
+    The per-frame cost is the same on every frame and memory does not grow with the number of days. """
+
+    def __init__(self, latCell, lonCell, hemispheres=("north", "south"), keyVariableToPlot=VARIABLETOPLOT,
+                 colorBarOn=COLORBARON, grid=GRIDON, oceanFeature=OCEANFEATURE, landFeature=LANDFEATURE,
+                 coastlines=COASTLINES, dot_size=DOT_SIZE, animated=True, renderMode=RENDER_MODE):
+        self.latCell            = latCell
+        self.lonCell            = lonCell
+        self.hemispheres        = hemispheres
+        self.keyVariableToPlot  = keyVariableToPlot
+
+        if tuple(hemispheres) == ("north", "south"):
+            self.fig, northMap, southMap = generateNorthandSouthPoleAxes()
+            self.maps = [northMap, southMap]
+        elif tuple(hemispheres) == ("north",):
+            self.fig, northMap = generateNorthPoleAxes()
+            self.maps = [northMap]
+        elif tuple(hemispheres) == ("south",):
+            self.fig, southMap = generateSouthPoleAxes()
+            self.maps = [southMap]
+        else:
+            raise ValueError(f"hemispheres must be ('north', 'south'), ('north',) or ('south',), not {hemispheres!r}")
+
+        # Adjust the margins around the plots (as a fraction of the width or height).
+        self.fig.subplots_adjust(bottom=0.05, top=0.85, left=0.04, right=0.95, wspace=0.02)
+
+        # Build each map, its scatter plot (or image, for RENDER_MODE = "raster") and its color bar once.
+        emptyDay = np.zeros(latCell.shape[0])
+        self.caps = []
+        self.rasterGrids = []
+        self.scatters = []
+        for hemisphere, hemisphereMap in zip(hemispheres, self.maps):
+            setUpPolarMap(hemisphereMap, hemisphere, oceanFeature, landFeature, grid, coastlines)
+
+            if hemisphere == "north":
+                scatter = mapNorthernHemisphere(latCell, lonCell, emptyDay, "Arctic Sea Ice", hemisphereMap, 
+                                                dot_size=dot_size, renderMode=renderMode)
+            else:
+                scatter = mapSouthernHemisphere(latCell, lonCell, emptyDay, "Antarctic Sea Ice", hemisphereMap, 
+                                                dot_size=dot_size, renderMode=renderMode)
+            scatter.set_animated(animated)
+
+            if colorBarOn:
+                plt.colorbar(scatter, ax=hemisphereMap)
+
+            cap = getPolarCap(latCell, lonCell, hemisphere)
+            self.caps.append(cap)
+            self.rasterGrids.append(cap.getRasterGrid(hemisphereMap.projection) if renderMode == "raster" else None)
+            self.scatters.append(scatter)
+
+        plt.suptitle(MAP_SUPTITLE_TOP, size="x-large", fontweight="bold")
+
+        # Add time textbox to the first map
+        self.textBox = self.maps[0].text(0.05, 0.95, "", transform=self.maps[0].transAxes, fontsize=14,
+                                     verticalalignment='top', bbox=boxStyling, animated=animated)
+
+    def drawFrame(self, variableToPlot1Day, timeString):
+        """ Update the scatter colors (or the images) and the time box for one day. Returns the artists that changed. """
+        for cap, rasterGrid, scatter in zip(self.caps, self.rasterGrids, self.scatters):
+            if rasterGrid is None:
+                scatter.set_array(np.ma.ravel(cap.gather(variableToPlot1Day)))
+            else:
+                scatter.set_data(rasterGrid.rasterize(cap.gather(variableToPlot1Day)))
+        self.textBox.set_text("Time: " + timeString)
+        return self.scatters + [self.textBox]
+
+    def drawFrameFromFile(self, frame):
+        """ Read one day from its file and draw it. frame is (file path, day number, time string). """
+        filePath, dayNumber, timeString = frame
+        output = loadData("", filePath)
+        variableForOneDay = reduceToOneDay(output, keyVariableToPlot=self.keyVariableToPlot, dayNumber=dayNumber)
+        return self.drawFrame(variableForOneDay, timeString)
+
+    def animate(self, frames, interval=INTERVALS):
+        """ Return a FuncAnimation that draws each frame with blitting. """
+        return animation.FuncAnimation(fig=self.fig, func=lambda frame: self.drawFrameFromFile(frame),
+                                       frames=frames, init_func=lambda: self.scatters + [self.textBox],
+                                       interval=interval, blit=True, cache_frame_data=False)
+
+    def save(self, frames, animationFileName, interval=INTERVALS):
+        """ Draw every frame and save the animation as a .gif. """
+        print(f"Number of frames: {len(frames)}")
+        ani = self.animate(frames, interval)
+        ani.save(filename=animationFileName, writer=getStreamingWriter(animationFileName, interval))
+        print("Saved .gif")
+
+    def renderFrameToPalette(self, frame):
+        """ Draw one frame and return it as a 256 color (P mode) image, ready to append to a .gif. """
+        self.drawFrameFromFile(frame)
+        with stage("frame render"):
+            self.fig.canvas.draw()
+        image = Image.frombuffer("RGBA", self.fig.canvas.get_width_height(), 
+                                 self.fig.canvas.buffer_rgba(), "raw", "RGBA", 0, 1)
+        return quantizeFrame(image)
+
+# Each render worker process builds its own engine once, in initializeRenderWorker
+workerEngine = None
+
+def initializeRenderWorker(meshPath, hemispheres, keyVariableToPlot, engineOptions):
+    """ Build the figure and engine once for this worker process. """
+    global workerEngine
+    plt.switch_backend("Agg")
+    latCell, lonCell = loadMesh("", meshPath)
+
+    # Frames are drawn with fig.canvas.draw, which skips animated artists
+    workerEngine = PolarAnimationEngine(latCell, lonCell, hemispheres, keyVariableToPlot, animated=False, **engineOptions)
+
+def renderFrameChunk(frames):
+    """ Render and quantize a list of frames in this worker process. Returns their P mode images in order. """
+    return [workerEngine.renderFrameToPalette(frame) for frame in frames]
+
+def renderFramesInParallel(frames, workers=RENDER_WORKERS, meshPath=meshFileName, 
+                           hemispheres=("north", "south"), keyVariableToPlot=VARIABLETOPLOT, **engineOptions):
+    """ Split the frames across worker processes. Each worker builds its figure once, renders
+    its frames and quantizes them, so only appending the frames to the file is left for this process.
+    engineOptions (colorBarOn, grid, oceanFeature, landFeature, coastlines, dot_size, renderMode)
+    are passed to each worker's PolarAnimationEngine. Yields the P mode image of each frame in order. """
+    chunkSize = max(1, len(frames) // (workers * 4))
+    chunks = [frames[start:start + chunkSize] for start in range(0, len(frames), chunkSize)]
+
+    with multiprocessing.Pool(workers, initializer=initializeRenderWorker,
+                              initargs=(meshPath, hemispheres, keyVariableToPlot, engineOptions)) as pool:
+        for paletteFrames in pool.imap(renderFrameChunk, chunks):
+            yield from paletteFrames
+
+def saveAnimationInParallel(frames, animationFileName, workers=RENDER_WORKERS, interval=INTERVALS, 
+                            meshPath=meshFileName, hemispheres=("north", "south"), keyVariableToPlot=VARIABLETOPLOT,
+                            **engineOptions):
+    """ Render the frames in worker processes and put them together in order as a .gif.
+    engineOptions are passed to PolarAnimationEngine, as in renderFramesInParallel. """
+    if not animationFileName.lower().endswith(".gif"):
+        raise ValueError(f"saveAnimationInParallel only writes .gif files, not {animationFileName!r}; "
+                         "use PolarAnimationEngine.save for videos")
+    print(f"Number of frames: {len(frames)}, render workers: {workers}")
+
+    # Each frame is appended to the .gif as it arrives, so the frames are never all in memory
+    writer = StreamingGifWriter(fps=1000 / interval)
+    writer.openFile(animationFileName)
+    for paletteFrame in renderFramesInParallel(frames, workers, meshPath, hemispheres, keyVariableToPlot, **engineOptions):
+        writer.writeImage(paletteFrame)
+    writer.finish()
+    print("Saved .gif")
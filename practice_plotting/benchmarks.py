@@ -0,0 +1,437 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+##########
+# TO RUN #
+##########
+
+# Times the hot paths of the plotting and composite code on synthetic data.
+# Make sure that you navigate to the directory that contains benchmarks.py
+
+# $ python benchmarks.py
+# $ python benchmarks.py --data-directory /pscratch/sd/b/user/benchmark_data --sizes small ec30to60 icoswisc30
+
+# No data ships with the repo, so this writes a synthetic mesh, orbital synchronizer,
+# icesat_E3SM_* track files and timeSeriesStatsDaily files for each size (and reuses them on the next run).
+# Then it times loadMesh, reduceToOneDay, a composite build (make_a_netCDF_file.makeComposites),
+# rendering one frame (scatter and raster) and encoding an animation.
+# It also times how long the command line modules take to import, and which heavy packages each one loads.
+# The results are saved as benchmark_<commit>.json, so runs on different commits can be compared.
+
+import argparse
+import calendar
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import netCDF4
+from polar_caps import *
+from synchronizer_index import *
+
+# Number of cells in the meshes used by this repo
+EC30TO60_CELLS      = 236853    # seaice.EC30to60E2r2
+ICOSWISC30_CELLS    = 465044    # mpassi.IcoswISC30E3r5
+
+BENCHMARK_SIZES = {
+    "small":        20000,
+    "ec30to60":     EC30TO60_CELLS,
+    "icoswisc30":   ICOSWISC30_CELLS,
+}
+
+# The ICESat campaigns are in these months
+BENCHMARK_SEASON_MONTHS = {"spring": (2, 3), "fall": (10, 11)}
+
+# Names used by the real files
+SYNTHETIC_MESH_FILE_NAME         = "synthetic_mesh.nc"
+SYNTHETIC_SYNCHRONIZER_FILE_NAME = "E3SM_IcoswISC30E3r5_ICESat_Orbital_Synchronizer.nc"
+SYNTHETIC_SETTINGS_FILE_NAME     = "synthetic_settings.json"
+TIME_STRING_LENGTH               = 64
+
+def makeSyntheticLatLon(cellCount, seed=0):
+    """ Return random latitudes and longitudes (in degrees) spread evenly over the sphere. """
+    rng = np.random.default_rng(seed)
+    latCell = np.degrees(np.arcsin(rng.uniform(-1, 1, cellCount)))
+    lonCell = rng.uniform(MINLONGITUDE, MAXLONGITUDE, cellCount)
+    return latCell, lonCell
+
+def timeFunction(function, repeats):
+    """ Return the average time in seconds of one call to function. """
+    startTime = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - startTime) / repeats
+
+#######################
+# SYNTHETIC MPAS DATA #
+#######################
+
+def writeSyntheticMesh(meshPath, cellCount, seed=0):
+    """ Write an MPAS-like mesh file with latCell and lonCell (in radians, like the real meshes). """
+    latCell, lonCell = makeSyntheticLatLon(cellCount, seed)
+    with netCDF4.Dataset(meshPath, "w") as mesh:
+        mesh.createDimension("nCells", cellCount)
+        mesh.createVariable("latCell", "f8", ("nCells",))[:] = np.radians(latCell)
+        mesh.createVariable("lonCell", "f8", ("nCells",))[:] = np.radians(lonCell)
+
+def makeSyntheticTrackTimes(years, tracksPerMonth, seasonMonths=BENCHMARK_SEASON_MONTHS):
+    """ Return (season, year, month, day, hour) for every synthetic track, in chronological order.
+    The tracks of each month are 2 hours apart, starting on the 1st. """
+    trackTimes = []
+    for year in years:
+        for season, months in seasonMonths.items():
+            for month in months:
+                daysInMonth = calendar.monthrange(year, month)[1]
+                for track in range(tracksPerMonth):
+                    day = 1 + (2 * track // 24) % daysInMonth
+                    trackTimes.append((season, year, month, day, 2 * track % 24))
+    return sorted(trackTimes, key=lambda trackTime: trackTime[1:])
+
+def convertDatesToHours(years, months, days, hours):
+    """ Return hours since 2000-01-01 (the units of the synchronizer's time) for arrays of dates. """
+    dates = np.array([f"{year:04d}-{month:02d}-{day:02d}" for year, month, day in zip(years, months, days)],
+                     dtype="datetime64[D]")
+    return (dates - np.datetime64("2000-01-01")).astype(np.float64) * 24 + hours
+
+def makeCharArray(strings):
+    """ Return strings as a netCDF character array, padded to TIME_STRING_LENGTH. """
+    return np.array(strings, dtype=f"S{TIME_STRING_LENGTH}").view("S1").reshape(len(strings), TIME_STRING_LENGTH)
+
+def writeSyntheticSynchronizer(synchronizerPath, trackTimes):
+    """ Write an orbital synchronizer with one record per track, in chronological order. """
+    seasons = [trackTime[0] for trackTime in trackTimes]
+    years, months, days, hours = (np.array([trackTime[i] for trackTime in trackTimes]) for i in range(1, 5))
+    timeStrings = [f"{year}-{month:02d}-{day:02d}_{hour:02d}:00:00" for year, month, day, hour in zip(years, months, days, hours)]
+
+    with netCDF4.Dataset(synchronizerPath, "w") as synchronizer:
+        synchronizer.createDimension("nTracks", len(trackTimes))
+        synchronizer.createDimension("StrLen", TIME_STRING_LENGTH)
+        synchronizer.createVariable("seasonalcluster", "i4", ("nTracks",))[:] = [seasonToCluster(season) for season in seasons]
+        synchronizer.createVariable("year", "i4", ("nTracks",))[:]  = years
+        synchronizer.createVariable("month", "i4", ("nTracks",))[:] = months
+        synchronizer.createVariable("day", "i4", ("nTracks",))[:]   = days
+        synchronizer.createVariable("hour", "i4", ("nTracks",))[:]  = hours
+        synchronizer.createVariable("time", "f8", ("nTracks",))[:]  = convertDatesToHours(years, months, days, hours)
+        synchronizer.createVariable("time_string", "S1", ("nTracks", "StrLen"))[:] = makeCharArray(timeStrings)
+
+def writeSyntheticTracks(satelliteDirectory, trackTimes, cellCount, samplesPerTrack, seed=0):
+    """ Write one icesat_E3SM_<season>_<year>_<month>_<day>_<hour>.nc file per track, with 1-based
+    cell and modcell indices (like the MATLAB preprocessing) and a freeboard reading per sample.
+    Each track runs along a band of neighboring cells and hits most of them more than once, like a real track. """
+    rng = np.random.default_rng(seed)
+    for season, year, month, day, hour in trackTimes:
+        fileName = f"icesat_E3SM_{season}_{year}_{month:02d}_{day:02d}_{hour:02d}.nc"
+        start = rng.integers(0, cellCount)
+        cells = (start + np.sort(rng.integers(0, samplesPerTrack // 4 + 1, samplesPerTrack))) % cellCount + 1
+
+        with netCDF4.Dataset(os.path.join(satelliteDirectory, fileName), "w") as track:
+            track.createDimension("one", 1)
+            track.createDimension("nSamples", samplesPerTrack)
+            track.createVariable("cell", "i4", ("one", "nSamples"))[:]      = cells[np.newaxis, :]
+            track.createVariable("modcell", "i4", ("one", "nSamples"))[:]   = cells[np.newaxis, :]
+            track.createVariable("freeboard", "f8", ("nSamples",))[:]       = rng.normal(0.3, 0.2, samplesPerTrack)
+
+def writeSyntheticDailyFiles(dailyDataDirectory, years, cellCount, seasonMonths=BENCHMARK_SEASON_MONTHS, seed=0):
+    """ Write one timeSeriesStatsDaily file per month with the snow volume, ice volume and ice area of every day.
+    The model has no leap days, so February always has 28 days. """
+    from make_a_netCDF_file import getModelDailyDataFileName   # Imported here so the other benchmarks do not need it
+
+    rng = np.random.default_rng(seed)
+    for year in years:
+        for month in sorted(month for months in seasonMonths.values() for month in months):
+            daysInMonth = calendar.monthrange(2001, month)[1]   # 2001 is not a leap year
+            path = os.path.join(dailyDataDirectory, getModelDailyDataFileName(year, month))
+            iceArea = rng.uniform(0, 1, (daysInMonth, cellCount)).astype(np.float32)
+
+            with netCDF4.Dataset(path, "w") as daily:
+                daily.createDimension("Time", None)
+                daily.createDimension("nCells", cellCount)
+                daily.createDimension("StrLen", TIME_STRING_LENGTH)
+                daily.createVariable("timeDaily_avg_iceAreaCell", "f4", ("Time", "nCells"))[:]     = iceArea
+                daily.createVariable("timeDaily_avg_iceVolumeCell", "f4", ("Time", "nCells"))[:]   = iceArea * rng.uniform(0, 3, cellCount).astype(np.float32)
+                daily.createVariable("timeDaily_avg_snowVolumeCell", "f4", ("Time", "nCells"))[:]  = iceArea * rng.uniform(0, 0.3, cellCount).astype(np.float32)
+                daily.createVariable("xtime_startDaily", "S1", ("Time", "StrLen"))[:] = \
+                    makeCharArray([f"{year}-{month:02d}-{day:02d}_00:00:00" for day in range(1, daysInMonth + 1)])
+
+def generateSyntheticData(dataDirectory, cellCount, years=(2003,), tracksPerMonth=30, samplesPerTrack=20000, seed=0):
+    """ Write a full synthetic data set for one mesh size into dataDirectory, unless the same one is already there.
+    Returns the paths, as used by make_a_netCDF_file.loadCompositeInputs and makeComposites. """
+    settings = {"cellCount": cellCount, "years": list(years), "tracksPerMonth": tracksPerMonth,
+                "samplesPerTrack": samplesPerTrack, "seed": seed}
+    paths = {
+        "mesh":                 os.path.join(dataDirectory, SYNTHETIC_MESH_FILE_NAME),
+        "directory":            dataDirectory + "/",
+        "synchronizer":         SYNTHETIC_SYNCHRONIZER_FILE_NAME,
+        "satelliteDirectory":   os.path.join(dataDirectory, "satellite_data_preprocessed"),
+        "dailyDataDirectory":   os.path.join(dataDirectory, "output_files") + "/",
+        "catalog":              os.path.join(dataDirectory, "satellite_catalog.json"),
+    }
+
+    settingsPath = os.path.join(dataDirectory, SYNTHETIC_SETTINGS_FILE_NAME)
+    if os.path.exists(settingsPath):
+        with open(settingsPath) as settingsFile:
+            if json.load(settingsFile) == settings:
+                return paths
+    shutil.rmtree(dataDirectory, ignore_errors=True)
+
+    print("Writing synthetic data to ", dataDirectory)
+    os.makedirs(paths["satelliteDirectory"])
+    os.makedirs(paths["dailyDataDirectory"])
+
+    trackTimes = makeSyntheticTrackTimes(years, tracksPerMonth)
+    writeSyntheticMesh(paths["mesh"], cellCount, seed)
+    writeSyntheticSynchronizer(os.path.join(dataDirectory, SYNTHETIC_SYNCHRONIZER_FILE_NAME), trackTimes)
+    writeSyntheticTracks(paths["satelliteDirectory"], trackTimes, cellCount, samplesPerTrack, seed)
+    writeSyntheticDailyFiles(paths["dailyDataDirectory"], years, cellCount, seed=seed)
+
+    # Written last, so a run that was stopped part way is written again next time
+    with open(settingsPath, "w") as settingsFile:
+        json.dump(settings, settingsFile)
+    return paths
+
+##############
+# BENCHMARKS #
+##############
+
+def benchmarkPolarCap(cellCount=ICOSWISC30_CELLS, frames=50, latLimit=LAT_LIMIT):
+    """ Compare the per-frame cost of finding the cap cells on every frame
+    with gathering one day's values from a precomputed PolarCap. """
+    latCell, lonCell = makeSyntheticLatLon(cellCount)
+    variableToPlot1Day = np.random.default_rng(1).uniform(0, 1, cellCount)
+
+    def everyFrame():
+        indices = np.where(latCell > latLimit)
+        return lonCell[indices], latCell[indices], variableToPlot1Day[indices]
+
+    def withPolarCap():
+        cap = getPolarCap(latCell, lonCell, "north", latLimit)
+        return cap.lonCell, cap.latCell, cap.gather(variableToPlot1Day)
+
+    withPolarCap() # Build the cap once, like the first frame of an animation
+
+    perFrameBefore  = timeFunction(everyFrame, frames)
+    perFrameAfter   = timeFunction(withPolarCap, frames)
+
+    print(f"Polar cap, {cellCount} cells, lat limit {latLimit}")
+    print(f"    np.where every frame:   {perFrameBefore*1000:.3f} ms per frame")
+    print(f"    precomputed PolarCap:   {perFrameAfter*1000:.3f} ms per frame")
+    return {"cells": cellCount, "everyFrameSeconds": perFrameBefore, "polarCapSeconds": perFrameAfter}
+
+def benchmarkRasterGrid(cellCount=ICOSWISC30_CELLS, frames=50, resolution=RASTER_RESOLUTION, latLimit=LAT_LIMIT):
+    """ Time binning one day's values into the polar image used by RENDER_MODE = "raster". """
+    import cartopy.crs as ccrs
+
+    latCell, lonCell = makeSyntheticLatLon(cellCount)
+    variableToPlot1Day = np.random.default_rng(1).uniform(0, 1, cellCount)
+    projection = ccrs.NorthPolarStereo(central_longitude=270, globe=None)
+
+    cap = getPolarCap(latCell, lonCell, "north", latLimit)
+    buildSeconds = timeFunction(lambda: PolarCap(latCell, lonCell, "north", latLimit).getRasterGrid(projection, resolution), 1)
+    grid = cap.getRasterGrid(projection, resolution)
+
+    perFrame = timeFunction(lambda: grid.rasterize(cap.gather(variableToPlot1Day)), frames)
+
+    print(f"Raster grid, {cellCount} cells, {resolution}x{resolution} pixels")
+    print(f"    build once:             {buildSeconds*1000:.3f} ms")
+    print(f"    rasterize one day:      {perFrame*1000:.3f} ms per frame")
+    return {"cells": cellCount, "resolution": resolution, "buildSeconds": buildSeconds, "rasterizeSeconds": perFrame}
+
+def benchmarkLoadMesh(meshPath, cacheDirectory):
+    """ Time loadMesh reading the netCDF mesh (and writing the .npy cache), loading the .npy cache
+    like a new process would, and finding the mesh already loaded in this process. """
+    from utility import loadMesh, meshCache
+
+    shutil.rmtree(cacheDirectory, ignore_errors=True)
+    meshCache.clear()
+    netCDFSeconds = timeFunction(lambda: loadMesh("", meshPath, cacheDirectory), 1)
+
+    def loadFromCacheFiles():
+        meshCache.clear()
+        latCell, lonCell = loadMesh("", meshPath, cacheDirectory)
+        return float(np.sum(latCell)) + float(np.sum(lonCell))    # Touch every page of the memory-mapped files
+    cacheFileSeconds = timeFunction(loadFromCacheFiles, 5)
+
+    inMemorySeconds = timeFunction(lambda: loadMesh("", meshPath, cacheDirectory), 100)
+
+    print(f"loadMesh: netCDF {netCDFSeconds*1000:.1f} ms, .npy cache {cacheFileSeconds*1000:.2f} ms, "
+          f"in memory {inMemorySeconds*1e6:.1f} us")
+    return {"netCDFSeconds": netCDFSeconds, "cacheFileSeconds": cacheFileSeconds, "inMemorySeconds": inMemorySeconds}
+
+def benchmarkReduceToOneDay(dailyPath, keyVariableToPlot="timeDaily_avg_iceAreaCell"):
+    """ Time reading every day of one variable from a timeSeriesStatsDaily file, one day at a time. """
+    from utility import loadData, getNumberOfDays, reduceToOneDay
+
+    output = loadData("", dailyPath)
+    days = getNumberOfDays(output, keyVariableToPlot)
+    secondsPerDay = timeFunction(lambda: [reduceToOneDay(output, keyVariableToPlot, day) for day in range(days)], 1) / days
+
+    print(f"reduceToOneDay: {secondsPerDay*1000:.2f} ms per day ({days} days)")
+    return {"days": days, "secondsPerDay": secondsPerDay}
+
+def benchmarkCompositeBuild(paths, outputDirectory, years=(2003,)):
+    """ Time building one composite per season over every synthetic track and model day,
+    the same way make_a_netCDF_file.mainAllSeasonsAndYears does. """
+    import make_a_netCDF_file as composites
+
+    startTime = time.perf_counter()
+    CELLCOUNT, timeDetails, synchronizerIndex, catalog, inputFingerprint = composites.loadCompositeInputs(
+        paths["mesh"], paths["synchronizer"], paths["directory"], paths["satelliteDirectory"], paths["catalog"])
+    inputSeconds = time.perf_counter() - startTime
+
+    selections = [(os.path.join(outputDirectory, f"{season}_{years[0]}_to_{years[-1]}.nc"), str(years[-1]),
+                   synchronizerIndex.select(seasons=season, years=list(years)).tolist())
+                  for season in BENCHMARK_SEASON_MONTHS]
+    tracks = sum(len(fileIndices) for _, _, fileIndices in selections)
+
+    startTime = time.perf_counter()
+    composites.makeComposites(selections, CELLCOUNT, timeDetails, synchronizerIndex, catalog, paths["dailyDataDirectory"],
+                              checkpointDirectory="")  # Always build from scratch
+    buildSeconds = time.perf_counter() - startTime
+
+    print(f"Composite build: inputs {inputSeconds:.2f} s, {tracks} tracks and their model days {buildSeconds:.2f} s")
+    return {"tracks": tracks, "inputSeconds": inputSeconds, "buildSeconds": buildSeconds}
+
+def benchmarkRenderAndEncode(meshPath, dailyPath, animationPath, frames=10, keyVariableToPlot="timeDaily_avg_iceAreaCell"):
+    """ Time drawing one frame of both poles with the animation engine (scatter and raster),
+    and encoding the frames into a streamed .gif. Map features are off, so nothing is downloaded. """
+    import matplotlib.pyplot as plt
+    from PIL import Image
+    from animation_engine import PolarAnimationEngine
+    from streaming_writer import StreamingGifWriter
+    from utility import loadMesh, loadData, reduceToOneDay
+
+    plt.switch_backend("Agg")
+    latCell, lonCell = loadMesh("", meshPath)
+    output = loadData("", dailyPath)
+    days = [reduceToOneDay(output, keyVariableToPlot, day) for day in range(frames)]
+
+    results = {}
+    for renderMode in ("scatter", "raster"):
+        engine = PolarAnimationEngine(latCell, lonCell, keyVariableToPlot=keyVariableToPlot, grid=0, oceanFeature=0,
+                                      landFeature=0, coastlines=0, animated=False, renderMode=renderMode)
+        engine.drawFrame(days[0], "")
+        engine.fig.canvas.draw()    # The first draw sets up the figure
+
+        images = []
+        startTime = time.perf_counter()
+        for day, variableToPlot1Day in enumerate(days):
+            engine.drawFrame(variableToPlot1Day, str(day))
+            engine.fig.canvas.draw()
+            images.append(Image.frombuffer("RGBA", engine.fig.canvas.get_width_height(),
+                                           bytes(engine.fig.canvas.buffer_rgba()), "raw", "RGBA", 0, 1))
+        results[f"{renderMode}FrameSeconds"] = (time.perf_counter() - startTime) / frames
+        plt.close(engine.fig)
+
+    writer = StreamingGifWriter(fps=1000 / INTERVALS)
+    writer.openFile(animationPath)
+    results["encodeFrameSeconds"] = timeFunction(lambda: [writer.writeImage(image) for image in images], 1) / frames
+    writer.finish()
+
+    print(f"Frame: scatter {results['scatterFrameSeconds']*1000:.0f} ms, raster {results['rasterFrameSeconds']*1000:.0f} ms, "
+          f"gif encode {results['encodeFrameSeconds']*1000:.0f} ms")
+    return results
+
+##########
+# REPORT #
+##########
+
+# Modules timed by benchmarkStartup, and the heavy packages that should only load when a plot needs them
+STARTUP_MODULES  = ("cli", "make_a_netCDF_file", "utility", "e3sm_data_visualization")
+HEAVY_PACKAGES   = ("matplotlib", "cartopy", "icepyx")
+
+def benchmarkStartup(modules=STARTUP_MODULES, repeats=3):
+    """ Import each module in a new Python process and time it (the best of repeats),
+    and record which of the heavy packages it loaded. """
+    programDirectory = os.path.dirname(os.path.abspath(__file__))
+    checkHeavyPackages = f"import sys; print(*[name for name in {HEAVY_PACKAGES!r} if name in sys.modules])"
+    results = {}
+    for module in modules:
+        seconds = []
+        for _ in range(repeats):
+            startTime = time.perf_counter()
+            completed = subprocess.run([sys.executable, "-c", f"import {module}; {checkHeavyPackages}"],
+                                       cwd=programDirectory, capture_output=True, text=True, check=True)
+            seconds.append(time.perf_counter() - startTime)
+        results[module] = {"seconds": min(seconds), "heavyPackages": completed.stdout.split()}
+        print(f"Import {module}: {min(seconds)*1000:.0f} ms, loads {results[module]['heavyPackages'] or 'no heavy packages'}")
+    return results
+
+def getCommit():
+    """ Return the current git commit and whether tracked files have changes, or (None, None) outside a git checkout. """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=directory, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        changes = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=directory,
+                                 capture_output=True, text=True, check=True).stdout.strip()
+        return commit, bool(changes)
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+def runBenchmarks(dataDirectory, reportDirectory, sizes=("small", "ec30to60"), years=(2003,),
+                  tracksPerMonth=30, samplesPerTrack=20000, frames=10):
+    """ Generate the synthetic data for each size, run every benchmark and save the report.
+    Use the same arguments on each commit to compare the reports. Returns the report. """
+    from instrumentation import setQuietMode
+    setQuietMode(True)
+
+    commit, hasChanges = getCommit()
+    report = {
+        "commit":       commit,
+        "hasChanges":   hasChanges,
+        "date":         time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine":      platform.node(),
+        "python":       platform.python_version(),
+        "numpy":        np.__version__,
+        "settings":     {"years": list(years), "tracksPerMonth": tracksPerMonth,
+                         "samplesPerTrack": samplesPerTrack, "frames": frames},
+        "startup":      benchmarkStartup(),
+        "sizes":        {},
+    }
+
+    for size in sizes:
+        cellCount = BENCHMARK_SIZES[size]
+        print(f"===== {size}: {cellCount} cells =====")
+        paths = generateSyntheticData(os.path.join(dataDirectory, size), cellCount, years, tracksPerMonth, samplesPerTrack)
+        firstDailyPath = os.path.join(paths["dailyDataDirectory"], sorted(os.listdir(paths["dailyDataDirectory"]))[0])
+
+        with tempfile.TemporaryDirectory() as outputDirectory:
+            report["sizes"][size] = {
+                "cells":            cellCount,
+                "polarCap":         benchmarkPolarCap(cellCount),
+                "rasterGrid":       benchmarkRasterGrid(cellCount),
+                "loadMesh":         benchmarkLoadMesh(paths["mesh"], os.path.join(outputDirectory, "cache")),
+                "reduceToOneDay":   benchmarkReduceToOneDay(firstDailyPath),
+                "compositeBuild":   benchmarkCompositeBuild(paths, outputDirectory, years),
+                "renderAndEncode":  benchmarkRenderAndEncode(paths["mesh"], firstDailyPath,
+                                                             os.path.join(outputDirectory, "benchmark.gif"), frames),
+            }
+
+    os.makedirs(reportDirectory, exist_ok=True)
+    reportPath = os.path.join(reportDirectory, f"benchmark_{(commit or 'unknown')[:10]}.json")
+    with open(reportPath, "w") as reportFile:
+        json.dump(report, reportFile, indent=4)
+    print("Saved benchmark report: ", reportPath)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the hot paths of the plotting and composite code on synthetic data.")
+    parser.add_argument("--data-directory", default=os.path.join(tempfile.gettempdir(), "icesat_benchmark_data"),
+                        help="where the synthetic data is written, and reused by later runs")
+    parser.add_argument("--report-directory", default="benchmark_reports", help="where benchmark_<commit>.json is saved")
+    parser.add_argument("--sizes", nargs="+", default=["small", "ec30to60"], choices=list(BENCHMARK_SIZES))
+    parser.add_argument("--years", nargs="+", type=int, default=[2003])
+    parser.add_argument("--tracks-per-month", type=int, default=30)
+    parser.add_argument("--samples-per-track", type=int, default=20000)
+    parser.add_argument("--frames", type=int, default=10)
+    arguments = parser.parse_args()
+
+    runBenchmarks(arguments.data_directory, arguments.report_directory, arguments.sizes, arguments.years,
+                  arguments.tracks_per_month, arguments.samples_per_track, arguments.frames)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+##########
+# TO RUN #
+##########
+
+# One command line for the main tasks. Make sure that you navigate to the directory that contains cli.py
+
+# $ python cli.py composite --season spring --year 2003
+# $ python cli.py composite --all --seasons spring fall --years 2003 2004 2005
+# $ python cli.py plot spring_2003.nc --variable meanof --image meanof_spring_2003.png --set VMAX=0.01
+# $ python cli.py animate output_files/*.nc --variable timeDaily_avg_iceAreaCell --animation ice_area.gif
+# $ python cli.py inspect v3.LR.historical_0051.mpassi.hist.am.timeSeriesStatsDaily.2003-02-01.nc --dates
+# $ python cli.py jobs jobs.json --workers 4
+
+# Each command imports only what it needs, when it runs:
+# composite and inspect never load matplotlib or cartopy, so they start in about the time it takes to import numpy and netCDF4.
+# Check with: python -X importtime cli.py inspect <file>, or the "startup" section of benchmarks.py.
+
+import argparse
+import json
+import os
+import sys
+from config import *
+from instrumentation import *
+
+def parseSettings(settingStrings):
+    """ Turn ["VMAX=0.01", "SEASON=fall"] into {"VMAX": 0.01, "SEASON": "fall"}.
+    Values are read as JSON when they can be (numbers, true/false, lists), otherwise kept as text. """
+    settings = {}
+    for settingString in settingStrings or []:
+        name, separator, value = settingString.partition("=")
+        if not separator:
+            raise argparse.ArgumentTypeError(f"Settings look like NAME=VALUE, not {settingString!r}")
+        try:
+            settings[name] = json.loads(value)
+        except json.JSONDecodeError:
+            settings[name] = value
+    return settings
+
+def runComposite(arguments):
+    """ Make the composite file for one season and year, or with --all for every season and year. """
+    import make_a_netCDF_file as composites
+
+    CELLCOUNT, timeDetails, synchronizerIndex, catalog, inputFingerprint = composites.loadCompositeInputs()
+    if arguments.all:
+        selections = composites.getSeasonAndYearSelections(synchronizerIndex, arguments.seasons, arguments.years,
+                                                           arguments.output_directory)
+    else:
+        fileIndices = synchronizerIndex.select(seasons=arguments.season, years=arguments.year).tolist()
+        selections = [(os.path.join(arguments.output_directory, f"{arguments.season}_{arguments.year}.nc"),
+                       arguments.year, fileIndices)]
+
+    composites.makeComposites(selections, CELLCOUNT, timeDetails, synchronizerIndex, catalog, layout=arguments.layout,
+                              checkpointDirectory=arguments.checkpoint_directory, inputFingerprint=inputFingerprint)
+    writeInstrumentationReport(extra={"datasetPool": composites.datasetPool.getStats()})
+
+def runPlotOrAnimation(job, arguments):
+    """ Run one plot or animation job with job_runner.py, so the settings work the same way as in a job file. """
+    from job_runner import runJob
+
+    settings = parseSettings(arguments.set)
+    if arguments.variable:
+        settings["VARIABLETOPLOT"] = arguments.variable
+    name, seconds, error = runJob(job, settings)
+    print(f"{name}: {seconds:.2f} s")
+    if error:
+        sys.exit(1)
+
+def runPlot(arguments):
+    """ Map one day of one variable and save it as an image. """
+    job = {"name": "plot", "type": "plot", "file": arguments.file, "day": arguments.day,
+           "hemispheres": arguments.hemispheres}
+    if arguments.image:
+        job["image"] = arguments.image
+    runPlotOrAnimation(job, arguments)
+
+def runAnimate(arguments):
+    """ Animate every day in some files and save the animation. """
+    job = {"name": "animate", "type": "animate", "files": arguments.files, "hemispheres": arguments.hemispheres,
+           "fileMax": arguments.file_max}
+    if arguments.animation:
+        job["animation"] = arguments.animation
+    runPlotOrAnimation(job, arguments)
+
+def runInspect(arguments):
+    """ Print the dimensions and variables of a netCDF file (like ncdump -h), and optionally its dates. """
+    import numpy as np
+    from utility import loadData, getNumberOfDays, printDateTime
+
+    output = loadData("", arguments.file)
+    print(arguments.file)
+    for name, dimension in output.dimensions.items():
+        print(f"    dimension {name}: {len(dimension)}" + (" (unlimited)" if dimension.isunlimited() else ""))
+    for name, variable in output.variables.items():
+        print(f"    {variable.dtype} {name}{variable.dimensions}: {variable.shape}")
+
+    if arguments.dates:
+        timeVariable = arguments.time_variable
+        for timeString in np.atleast_1d(printDateTime(output, timeStringVariable=timeVariable,
+                                                      days=getNumberOfDays(output, timeVariable), printTimes=False)):
+            print("   ", timeString)
+
+def runJobs(arguments):
+    """ Run a job file with job_runner.py. """
+    from job_runner import runJobs as runJobFile
+
+    results = runJobFile(arguments.jobFile, arguments.workers)
+    writeInstrumentationReport(extra={"jobs": [{"name": name, "seconds": seconds, "error": error}
+                                               for name, seconds, error in results]})
+    if any(error for _, _, error in results):
+        sys.exit(1)
+
+def getParser():
+    """ Return the argument parser with one subcommand per task. """
+    parser = argparse.ArgumentParser(description="Composites, plots and animations of E3SM and ICESat data.")
+    parser.add_argument("--quiet", action="store_true", help="turn off the debug prints")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    composite = commands.add_parser("composite", help="make composite netCDF files from the satellite tracks")
+    composite.add_argument("--season", default=SEASON)
+    composite.add_argument("--year", default=YEAR)
+    composite.add_argument("--all", action="store_true", help="every season and year, and each season over all years")
+    composite.add_argument("--seasons", nargs="+", default=BATCH_SEASONS)
+    composite.add_argument("--years", nargs="+", default=BATCH_YEARS)
+    composite.add_argument("--layout", default=COMPOSITE_LAYOUT, choices=["file", "stacked"])
+    composite.add_argument("--output-directory", default="")
+    composite.add_argument("--checkpoint-directory", default=CHECKPOINT_DIRECTORY,
+                           help="save checkpoints here, and only read new tracks if there are some (off by default)")
+    composite.set_defaults(function=runComposite)
+
+    for name, function, helpText in (("plot", runPlot, "map one day of a variable"),
+                                     ("animate", runAnimate, "animate every day in some files")):
+        command = commands.add_parser(name, help=helpText)
+        if name == "plot":
+            command.add_argument("file")
+            command.add_argument("--day", type=int, default=0)
+            command.add_argument("--image", help="image file to save (default: mapImageFileName)")
+        else:
+            command.add_argument("files", nargs="+")
+            command.add_argument("--file-max", type=int, default=None, help="only use this many files")
+            command.add_argument("--animation", help="animation file to save (default: animationFileName)")
+        command.add_argument("--variable", help="variable to plot (default: VARIABLETOPLOT)")
+        command.add_argument("--hemispheres", nargs="+", default=["north", "south"], choices=["north", "south"])
+        command.add_argument("--set", action="append", metavar="NAME=VALUE",
+                             help="change a config.py setting, i.e. --set VMAX=0.01 --set LAT_LIMIT=50")
+        command.set_defaults(function=function)
+
+    inspect = commands.add_parser("inspect", help="print the dimensions and variables of a netCDF file")
+    inspect.add_argument("file")
+    inspect.add_argument("--dates", action="store_true", help="also print the dates in the file")
+    inspect.add_argument("--time-variable", default=START_TIME_VARIABLE)
+    inspect.set_defaults(function=runInspect)
+
+    jobs = commands.add_parser("jobs", help="run a job file (see job_runner.py)")
+    jobs.add_argument("jobFile")
+    jobs.add_argument("--workers", type=int, default=1)
+    jobs.set_defaults(function=runJobs)
+
+    return parser
+
+def main(argv=None):
+    arguments = getParser().parse_args(argv)
+    if arguments.quiet:
+        setQuietMode(True)
+    arguments.function(arguments)
+
+if __name__ == "__main__":
+    main()
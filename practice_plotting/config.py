@@ -33,8 +33,23 @@ CELLVARIABLE        = "cell"
 SEASON              = "spring"        # spring or fall
 YEAR                = "2008"    # 2003 to 2008
 NEW_NETCDF_FILE_NAME = f"{SEASON}_{YEAR}.nc"
+
+# Used by make_a_netCDF_file.mainAllSeasonsAndYears to make every composite in one pass
+BATCH_SEASONS       = ["spring", "fall"]
+BATCH_YEARS         = ["2003", "2004", "2005", "2006", "2007", "2008"]
 #NEW_NETCDF_FILE_NAME = "ALL_SATELLITE_DATA.nc"
 
+# How make_a_netCDF_file.py lays out the composites
+COMPOSITE_LAYOUT    = "file"        # One file per composite, i.e. spring_2003.nc
+#COMPOSITE_LAYOUT    = "stacked"     # Every composite is one record along the time dimension of STACKED_NETCDF_FILE_NAME
+STACKED_NETCDF_FILE_NAME = "composites.nc"   # Plot with START_TIME_VARIABLE = "time_string"
+
+# Storage of the composite variables
+COMPOSITE_COMPRESSION_LEVEL = 4     # zlib level (1 to 9) with the shuffle filter; 0 writes uncompressed variables
+COMPOSITE_CHUNK_CELLS       = 65536 # Length of each chunk along nCells; a plot of one polar cap only reads the chunks it needs
+COMPOSITE_STATISTICS_TYPE   = "f4"  # Means, standard deviations and effective sample sizes (use "f8" for the old float64 files)
+COMPOSITE_COUNT_TYPE        = "i4"  # samplemf and sampleof
+
 # Change if you want a wider or narrower view
 #LAT_LIMIT       =  50  # Good wide view for the north and south poles for E3SM data
 LAT_LIMIT       =  65  # More of a closeup, better for the satellite data
@@ -45,9 +60,41 @@ LAT_LIMIT       =  65  # More of a closeup, better for the satellite data
 #DOT_SIZE        = 7.0  # Good for satellite tracks
 DOT_SIZE        = 0.1
 
+# Change how the mesh cells are drawn on the polar maps
+RENDER_MODE     = "scatter"   # One dot per cell; set DOT_SIZE for the mesh
+#RENDER_MODE     = "raster"    # Cells are averaged into an image, one imshow per map; no DOT_SIZE to tune
+
+# Width and height in pixels of the polar image when RENDER_MODE = "raster".
+# Keep it at or below the number of cells across the map, or some pixels will have no cells in them.
+RASTER_RESOLUTION = 150     # Good for IcoswISC30E3r5 with LAT_LIMIT = 65
+
 # Change if you want to downsample the amount of data by a certain factor
 DEFAULT_DOWNSAMPLE_FACTOR = 100
 
+# Number of netCDF files that utility.loadData keeps open at once (the least recently used file is closed first)
+DATASET_POOL_SIZE = 32
+
+# Set to True to turn off the debug prints (see instrumentation.debugPrint); they slow down tight loops
+QUIET_MODE = False
+
+# If set, make_a_netCDF_file.py saves the accumulators of each composite here (i.e. spring_2003.npz).
+# A later run loads them and only reads the tracks and model days that are new, then rewrites the composite.
+# A checkpoint made from another mesh, synchronizer or selection is not used, and neither is one that would need
+# tracks older than its latest track. Delete a checkpoint to build its composite from scratch.
+CHECKPOINT_DIRECTORY = ""   # Off
+#CHECKPOINT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkpoints")
+CHECKPOINT_TRACK_INTERVAL = 200     # Tracks read between checkpoints, so a run that dies can pick up where it stopped
+
+# Number of processes used to read satellite tracks in make_a_netCDF_file.py (1 reads them serially)
+INGEST_WORKERS = 1
+#INGEST_WORKERS = 64   # Good for a Perlmutter CPU node
+
+# Number of threads that calculate the model freeboard of each month in make_a_netCDF_file.py.
+# The files are still read one at a time (netCDF is not thread-safe); converting what was read 
+# and the freeboard math of one month run while the next month is read.
+MODEL_FREEBOARD_THREADS = 1
+#MODEL_FREEBOARD_THREADS = 4
+
 # Color Bar Range
 VMIN = 0
 VMAX = 1      # Good for Ice Area
@@ -66,6 +113,13 @@ VMAX = 0.01   # meanof - spring 2003 to 2008
 #INTERVALS = 250
 INTERVALS = 50 # used for year-long animation
 
+# Seconds of orbit shown per frame of a satellite track animation (see plotting_track_animation.py)
+TRACK_FRAME_SECONDS = 60
+
+# Number of processes that render animation frames (see animation_engine.saveAnimationInParallel)
+RENDER_WORKERS = 1
+#RENDER_WORKERS = 32
+
 ################
 #  File Paths  #
 ################
@@ -81,6 +135,9 @@ runDir = perlmutterpath1 # For perlmutter (PM) only
 #meshFileName   = r"/mesh_files/mpassi.IcoswISC30E3r5.20231120.nc" # for PM Perlmutter for the 1 year mesh
 meshFileName = perlmutterpathMesh # for PM
 
+# Degree coordinates of each mesh are cached here as .npy files by utility.loadMesh (set to "" to turn off)
+MESH_CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mesh_files", "cache")
+
 #SYNCH_FILE_NAME = r"\mesh_files\E3SM_IcoswISC30E3r5_ICESat_Orbital_Synchronizer.nc"
 SYNCH_FILE_NAME = r"/mesh_files/E3SM_IcoswISC30E3r5_ICESat_Orbital_Synchronizer.nc" #PM
 
@@ -102,6 +159,13 @@ subdirectory = "" # Use when running make_a_netCDF_file.py
 
 FULL_PATH = runDir + subdirectory
 
+# Sidecar file that maps each synchronizer track to its satellite file (see satellite_catalog.py).
+# It is kept in the satellite directory it indexes, wherever the program is run from; an absolute path is used as it is.
+SATELLITE_CATALOG_FILE = "satellite_catalog.json"
+
+# JSON report of the time, memory and file reads of each stage of a run (see instrumentation.py)
+INSTRUMENTATION_REPORT_FILE = "instrumentation_report.json"
+
 # Change these to save without overwriting your files
 #animationFileName = f"E3SM_2003_5_months_simulation.gif"
 #mapImageFileName = f"static_image.png"
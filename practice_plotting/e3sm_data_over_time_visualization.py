@@ -15,6 +15,8 @@
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from e3sm_data_visualization import *
+from animation_engine import *
+from streaming_writer import *
 from utility import *
 import time
 
@@ -24,7 +26,7 @@ def saveAnimation(fig, artists, animationFileName, interval=INTERVALS):
 
     print(f"Number of artists: {len(artists)}")
     ani = animation.ArtistAnimation(fig=fig, artists=artists, interval=interval)
-    ani.save(filename=animationFileName, writer="pillow")
+    ani.save(filename=animationFileName, writer=getStreamingWriter(animationFileName, interval))
     print("Saved .gif")
 
 def generateArtistsNorthAndSouth(fig, northMap, southMap, latCell, lonCell, output, 
@@ -47,7 +49,7 @@ def generateArtistsNorthAndSouth(fig, northMap, southMap, latCell, lonCell, outp
                                                                            latCell, lonCell, variableForOneDay, 
                                                                            mapImageFileName, 0,0,0,0,0,0)
         artists.append([northPoleScatter, southPoleScatter, textBox])
-        print("Day: ", i)
+        debugPrint("Day: ", i)
 
     if colorbar:
         plt.colorbar(northPoleScatter, ax=northMap)
@@ -77,7 +79,7 @@ def generateArtistsNorth(fig, northMap, latCell, lonCell, output,
         northPoleScatter = generateNorthPoleMap(fig, northMap, 
                                                                            latCell, lonCell, variableForOneDay, 
                                                                            mapImageFileName, 0,0,0,0,0,0)
-        print("generated scatter plot", i)
+        debugPrint("generated scatter plot", i)
         artists.append([northPoleScatter, textBox])
 
     if colorbar:
@@ -119,7 +121,7 @@ def animateNorthAndSouthFromMultipleFiles():
     files = gatherFiles(0, subdirectory)
     #files = gatherFiles(0)
     files.sort()
-    print("Sorted: ", files)
+    debugPrint("Sorted: ", files)
 
     fileMax = 5
 
@@ -130,7 +132,7 @@ def animateNorthAndSouthFromMultipleFiles():
     addColorBar = False
 
     for fileIndex, file in enumerate(files):
-        print("Length of Artists: ", len(artists))
+        debugPrint("Length of Artists: ", len(artists))
 
         if fileIndex == fileMax:
             return fig, artists
@@ -177,19 +179,41 @@ def animateNorthFromMultipleFiles():
                 fig, northMap, latCell, lonCell, output, 
                 mapImageFileName, days, artists, colorbar=False)
             
-        print("File plotted: ", file)
+        debugPrint("File plotted: ", file)
             
     return fig, artists
 
+def animateWithEngine(filePaths, hemispheres=("north", "south"), fileMax=None):
+    """ Animate every day in filePaths with one set of maps and scatter plots (see animation_engine.py).
+    Only the scatter colors and time box change per frame, so this is faster than the 
+    generateArtists functions and uses the same amount of memory for any number of days. """
+    latCell, lonCell = loadMesh("", meshFileName)
+    frames = gatherFramesFromFiles(filePaths, fileMax=fileMax)
+
+    # Render the frames across processes when there is more than one render worker (for .gif files)
+    if RENDER_WORKERS > 1 and animationFileName.lower().endswith(".gif"):
+        saveAnimationInParallel(frames, animationFileName, hemispheres=hemispheres)
+        return None
+
+    engine = PolarAnimationEngine(latCell, lonCell, hemispheres)
+    engine.save(frames, animationFileName)
+    return engine
+
 def main():
 
-    startTime = time.time()
-    #fig, artists = animateNorthAndSouth(runDir, meshFileName, outputFileName)
-    fig, artists = animateNorthAndSouthFromMultipleFiles()
-    #fig, artists = animateNorthFromMultipleFiles()
-    saveAnimation(fig, artists, animationFileName)
-    endTime = time.time()
-    print("It took this much time: ", endTime-startTime)
+    with stage("animation"):
+        #fig, artists = animateNorthAndSouth(runDir, meshFileName, outputFileName)
+        #fig, artists = animateNorthAndSouthFromMultipleFiles()
+        #fig, artists = animateNorthFromMultipleFiles()
+        #saveAnimation(fig, artists, animationFileName)
+
+        files = gatherFiles(0, subdirectory)
+        files.sort()
+        animateWithEngine([subdirectory + file for file in files], hemispheres=("north", "south"), fileMax=5)
+        #animateWithEngine([runDir + outputFileName], hemispheres=("north",))
+    print("It took this much time: ", stageStats["animation"]["wallSeconds"])
+
+    writeInstrumentationReport(extra={"datasetPool": datasetPool.getStats()})
 
 if __name__ == "__main__":
     main()
@@ -12,6 +12,7 @@
 
 # $ python e3sm-data-visualization.py
 
+import matplotlib as mpl
 import matplotlib.path as mpath
 import matplotlib.pyplot as plt     # For plotting
 
@@ -19,18 +20,27 @@ import matplotlib.pyplot as plt     # For plotting
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
 from utility import *
+from polar_caps import *
 
-def mapNorthernHemisphere(latCell, lonCell, variableToPlot1Day, title, hemisphereMap, dot_size=DOT_SIZE):
+def mapNorthernHemisphere(latCell, lonCell, variableToPlot1Day, title, hemisphereMap, dot_size=DOT_SIZE, renderMode=None):
     """ Map the northern hemisphere onto a matplotlib figure. 
     This requires latCell and lonCell to be filled by a mesh file.
-    It also requires variableToPlot1Day to be filled by an output .nc file. """
+    It also requires variableToPlot1Day to be filled by an output .nc file. 
+    Leave renderMode as None to use RENDER_MODE (read when this is called, so job_runner.py can change it). """
+
+    if renderMode is None:
+        renderMode = RENDER_MODE
 
-    indices = np.where(latCell > LAT_LIMIT)     # Only capture points between the lat limit and the pole.
+    cap = getPolarCap(latCell, lonCell, "north")     # Only capture points between the lat limit and the pole.
     
     norm=mpl.colors.Normalize(VMIN, VMAX)
-    sc = hemisphereMap.scatter(lonCell[indices], latCell[indices], 
-                               c=variableToPlot1Day[indices], cmap='bwr', 
-                               s=dot_size, transform=ccrs.PlateCarree(),
+    if renderMode == "raster":
+        return mapPolarCapAsRaster(cap, variableToPlot1Day, title, hemisphereMap, norm)
+
+    x, y = cap.getProjectedXY(hemisphereMap.projection)   # Already in the map's projection
+    sc = hemisphereMap.scatter(x, y, 
+                               c=cap.gather(variableToPlot1Day), cmap='bwr', 
+                               s=dot_size, transform=hemisphereMap.projection,
                                norm=norm)
     hemisphereMap.set_title(title)
     hemisphereMap.axis('off')
@@ -42,35 +52,58 @@ def mapInOneColorLatsAndLons(latCell, lonCell, title, hemisphereMap, dot_size=DO
     This requires latCell and lonCell to be filled by a mesh file.
     It also requires variableToPlot1Day to be filled by an output .nc file. """
 
-    indices = np.where(latCell > LAT_LIMIT)     # Only capture points between the lat limit and the pole.
+    cap = getPolarCap(latCell, lonCell, "north")     # Only capture points between the lat limit and the pole.
     
     norm=mpl.colors.Normalize(VMIN, VMAX)
-    sc = hemisphereMap.scatter(lonCell[indices], latCell[indices],
-                               s=dot_size, color = 'hotpink', transform=ccrs.PlateCarree(),
+    x, y = cap.getProjectedXY(hemisphereMap.projection)   # Already in the map's projection
+    sc = hemisphereMap.scatter(x, y,
+                               s=dot_size, color = 'hotpink', transform=hemisphereMap.projection,
                                norm=norm)
     hemisphereMap.set_title(title)
     hemisphereMap.axis('off')
 
     return sc
 
-def mapSouthernHemisphere(latCell, lonCell, variableToPlot1Day, title, hemisphereMap, dot_size=DOT_SIZE):
+def mapSouthernHemisphere(latCell, lonCell, variableToPlot1Day, title, hemisphereMap, dot_size=DOT_SIZE, renderMode=None):
     """ Map one hemisphere onto a matplotlib figure. 
     You do not need to include the minus sign for lower latitudes. 
     This requires latCell and lonCell to be filled by a mesh file.
-    It also requires variableToPlot1Day to be filled by an output .nc file. """
+    It also requires variableToPlot1Day to be filled by an output .nc file. 
+    Leave renderMode as None to use RENDER_MODE (read when this is called, so job_runner.py can change it). """
 
-    indices = np.where(latCell < -LAT_LIMIT)    # Only capture points between the lat limit and the pole.
+    if renderMode is None:
+        renderMode = RENDER_MODE
+
+    cap = getPolarCap(latCell, lonCell, "south")    # Only capture points between the lat limit and the pole.
     
     norm=mpl.colors.Normalize(VMIN, VMAX)
-    sc = hemisphereMap.scatter(lonCell[indices], latCell[indices], 
-                               c=variableToPlot1Day[indices], cmap='bwr', 
-                               s=dot_size, transform=ccrs.PlateCarree(),
+    if renderMode == "raster":
+        return mapPolarCapAsRaster(cap, variableToPlot1Day, title, hemisphereMap, norm)
+
+    x, y = cap.getProjectedXY(hemisphereMap.projection)   # Already in the map's projection
+    sc = hemisphereMap.scatter(x, y, 
+                               c=cap.gather(variableToPlot1Day), cmap='bwr', 
+                               s=dot_size, transform=hemisphereMap.projection,
                                norm=norm)
     hemisphereMap.set_title(title)
     hemisphereMap.axis('off')
 
     return sc
 
+def mapPolarCapAsRaster(cap, variableToPlot1Day, title, hemisphereMap, norm, resolution=None):
+    """ Map a polar cap as one image instead of one dot per cell (RENDER_MODE = "raster").
+    Each pixel shows the mean of the cells inside it. Returns the AxesImage;
+    to show another day, use image.set_data(grid.rasterize(cap.gather(variableToPlot1Day))). """
+
+    grid = cap.getRasterGrid(hemisphereMap.projection, resolution)
+    image = hemisphereMap.imshow(grid.rasterize(cap.gather(variableToPlot1Day)), 
+                                 extent=grid.extent, origin="lower", cmap='bwr', norm=norm,
+                                 interpolation="nearest", transform=hemisphereMap.projection)
+    hemisphereMap.set_title(title)
+    hemisphereMap.axis('off')
+
+    return image
+
 def makeCircle():
     """ Use this with Cartopy to make a circular map of the globe, 
     rather than a rectangular map. """
@@ -93,6 +126,24 @@ def addMapFeatures(my_map, oceanFeature=OCEANFEATURE, landFeature=LANDFEATURE, g
     if (coastlines == 1):
         my_map.coastlines()
 
+def setUpPolarMap(hemisphereMap, hemisphere, oceanFeature=OCEANFEATURE, landFeature=LANDFEATURE, 
+                  grid=GRIDON, coastlines=COASTLINES):
+    """ Set the extent, map features and round boundary of a north or south pole map. """
+
+    # Set your viewpoint (the bounding box for what you will see).
+    # You want to see the full range of longitude values, since this is a polar plot.
+    # The range for the latitudes should be from your latitude limit (i.e. 50 degrees or -50 to the pole at 90 or -90).
+    if hemisphere == "north":
+        hemisphereMap.set_extent([MINLONGITUDE, MAXLONGITUDE,  LAT_LIMIT, NORTHPOLE], ccrs.PlateCarree())
+    else:
+        hemisphereMap.set_extent([MINLONGITUDE, MAXLONGITUDE, -LAT_LIMIT, SOUTHPOLE], ccrs.PlateCarree())
+
+    # Add map features, like landFeature and oceanFeature.
+    addMapFeatures(hemisphereMap, oceanFeature, landFeature, grid, coastlines)
+
+    # Crop the map to be round instead of rectangular.
+    hemisphereMap.set_boundary(makeCircle(), transform=hemisphereMap.transAxes)
+
 def generateNorthandSouthPoleAxes():
     """ Return a figure and axes (maps) to use for plotting data for the North and South Poles. """
     fig = plt.figure(figsize=[10, 5]) #both north and south pole
@@ -119,6 +170,18 @@ def generateNorthPoleAxes():
     northMap = fig.add_subplot(1, 1, 1, projection=map_projection_north)
     return fig, northMap
 
+def generateSouthPoleAxes():
+    """ Return a figure and axes (map) to use for plotting data for the South Pole. """
+
+    fig = plt.figure(figsize=[5, 5]) #south pole only
+    
+    # Define projections for each map.
+    map_projection_south = ccrs.SouthPolarStereo(central_longitude=0, globe=None)
+    
+    # Create an axes for a map of the Antarctic on the figure
+    southMap = fig.add_subplot(1, 1, 1, projection=map_projection_south)
+    return fig, southMap
+
 def generateNorthandSouthPoleMaps(fig, northMap, southMap, latCell, lonCell, variableToPlot1Day, mapImageFileName, 
                                   timeStamp="YYYY:DD:HH:MM", colorBarOn=COLORBARON, grid=GRIDON,
                                   oceanFeature=OCEANFEATURE, landFeature=LANDFEATURE, 
@@ -128,19 +191,9 @@ def generateNorthandSouthPoleMaps(fig, northMap, southMap, latCell, lonCell, var
     # Adjust the margins around the plots (as a fraction of the width or height).
     fig.subplots_adjust(bottom=0.05, top=0.85, left=0.04, right=0.95, wspace=0.02)
 
-    # Set your viewpoint (the bounding box for what you will see).
-    # You want to see the full range of longitude values, since this is a polar plot.
-    # The range for the latitudes should be from your latitude limit (i.e. 50 degrees or -50 to the pole at 90 or -90).
-    northMap.set_extent([MINLONGITUDE, MAXLONGITUDE,  LAT_LIMIT, NORTHPOLE], ccrs.PlateCarree())
-    southMap.set_extent([MINLONGITUDE, MAXLONGITUDE, -LAT_LIMIT, SOUTHPOLE], ccrs.PlateCarree())
-
-    # Add map features, like landFeature and oceanFeature.
-    addMapFeatures(northMap, oceanFeature, landFeature, grid, coastlines)
-    addMapFeatures(southMap, oceanFeature, landFeature, grid, coastlines)
-
-    # Crop the map to be round instead of rectangular.
-    northMap.set_boundary(makeCircle(), transform=northMap.transAxes)
-    southMap.set_boundary(makeCircle(), transform=southMap.transAxes)
+    # Set the viewpoint, map features and round boundary of each map.
+    setUpPolarMap(northMap, "north", oceanFeature, landFeature, grid, coastlines)
+    setUpPolarMap(southMap, "south", oceanFeature, landFeature, grid, coastlines)
 
     # Map the 2 hemispheres.
     northPoleScatter = mapNorthernHemisphere(latCell, lonCell, variableToPlot1Day, "Arctic Sea Ice", northMap, dot_size=dot_size)     # Map northern hemisphere
@@ -168,16 +221,8 @@ def generateNorthPoleMap(fig, northMap, latCell, lonCell, variableToPlot1Day, ma
     # Adjust the margins around the plots (as a fraction of the width or height).
     fig.subplots_adjust(bottom=0.05, top=0.85, left=0.04, right=0.95, wspace=0.02)
 
-    # Set your viewpoint (the bounding box for what you will see).
-    # You want to see the full range of longitude values, since this is a polar plot.
-    # The range for the latitudes should be from your latitude limit (i.e. 50 degrees or -50 to the pole at 90 or -90).
-    northMap.set_extent([MINLONGITUDE, MAXLONGITUDE, LAT_LIMIT, NORTHPOLE], ccrs.PlateCarree())
-
-    # Add map features, like landFeature and oceanFeature.
-    addMapFeatures(northMap, oceanFeature, landFeature, grid, coastlines)
-
-    # Crop the map to be round instead of rectangular.
-    northMap.set_boundary(makeCircle(), transform=northMap.transAxes)
+    # Set the viewpoint, map features and round boundary of the map.
+    setUpPolarMap(northMap, "north", oceanFeature, landFeature, grid, coastlines)
 
     # Map the hemisphere
     scatter = mapNorthernHemisphere(latCell, lonCell, variableToPlot1Day, f"Arctic Sea Ice", northMap, dot_size)     # Map northern hemisphere
@@ -193,6 +238,32 @@ def generateNorthPoleMap(fig, northMap, latCell, lonCell, variableToPlot1Day, ma
 
     return scatter
 
+def generateSouthPoleMap(fig, southMap, latCell, lonCell, variableToPlot1Day, mapImageFileName, 
+                         timeStamp="YYYY:DD:HH:MM", colorBarOn=COLORBARON, grid=GRIDON,
+                         oceanFeature=OCEANFEATURE, landFeature=LANDFEATURE, 
+                         coastlines=COASTLINES, dot_size=DOT_SIZE):
+    """ Generate one map of the south pole. """
+
+    # Adjust the margins around the plots (as a fraction of the width or height).
+    fig.subplots_adjust(bottom=0.05, top=0.85, left=0.04, right=0.95, wspace=0.02)
+
+    # Set the viewpoint, map features and round boundary of the map.
+    setUpPolarMap(southMap, "south", oceanFeature, landFeature, grid, coastlines)
+
+    # Map the hemisphere
+    scatter = mapSouthernHemisphere(latCell, lonCell, variableToPlot1Day, "Antarctic Sea Ice", southMap, dot_size)     # Map southern hemisphere
+    
+    # Set Color Bar
+    if colorBarOn:
+        plt.colorbar(scatter, ax=southMap)
+
+    plt.suptitle(MAP_SUPTITLE_TOP, size="x-large", fontweight="bold")
+
+    # Save the maps as an image.
+    plt.savefig(mapImageFileName)
+
+    return scatter
+
 def main():
 
     # Load the mesh and data to plot.
@@ -0,0 +1,133 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Records where the time, memory and file reads go in a run.
+# Wrap a piece of work in a named stage:
+
+#   with stage("mesh load"):
+#       latCell, lonCell = loadMesh(runDir, meshFileName)
+
+# For each stage name this keeps the number of calls, the wall time, how much the stage raised the peak RSS
+# of the process, the bytes read from netCDF files and the number of files opened.
+# writeInstrumentationReport() saves everything as JSON.
+# With QUIET_MODE = True (or setQuietMode(True)), debugPrint does nothing,
+# so the debug prints in tight loops do not cost any time.
+
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from config import *
+
+try:
+    import resource     # Not available on Windows
+except ImportError:
+    resource = None
+
+# Running totals for the whole process. Stages record how much these grow while they run.
+ioCounters = {"bytesRead": 0, "filesOpened": 0}
+
+# Stage name -> totals for every time that stage ran, in the order the stages first ran
+stageStats = OrderedDict()
+
+runStartTime = time.time()
+quietMode = QUIET_MODE
+
+def setQuietMode(quiet=True):
+    """ Turn the debug prints off (True) or back on (False). """
+    global quietMode
+    quietMode = quiet
+
+def isQuietMode():
+    """ Return True if the debug prints are off. Check this before printing anything that is costly to work out. """
+    return quietMode
+
+def debugPrint(*args, **kwargs):
+    """ print, unless quiet mode is on. Use this for debug output, not for results the user asked for. """
+    if not quietMode:
+        print(*args, **kwargs)
+
+def getPeakRSS():
+    """ Return the peak resident memory of this process in bytes, or None if it cannot be measured. """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024   # Linux reports kilobytes, macOS bytes
+
+def countBytesRead(array):
+    """ Add the size of an array that was read from a netCDF file. Returns the array. """
+    ioCounters["bytesRead"] += int(getattr(array, "nbytes", 0))
+    return array
+
+def countFileOpened():
+    """ Add one netCDF file that was opened. """
+    ioCounters["filesOpened"] += 1
+
+def addIOCounts(counts):
+    """ Add counts from another process, i.e. as returned by takeIOCounts in a worker. """
+    for key in ioCounters:
+        ioCounters[key] += counts.get(key, 0)
+
+def takeIOCounts():
+    """ Return the counts since the last call and reset them. Worker processes send these back to the main process. """
+    counts = dict(ioCounters)
+    for key in ioCounters:
+        ioCounters[key] = 0
+    return counts
+
+@contextmanager
+def stage(name):
+    """ Time a named stage and record its memory and I/O. Stages can be nested;
+    the outer stage includes everything done in the inner stages. 
+    peakRSSRiseBytes is the most that one call raised the peak RSS of the process. The peak never goes down,
+    so a stage that stays below the peak of an earlier stage shows 0. """
+    startCounts = dict(ioCounters)
+    startPeakRSS = getPeakRSS()
+    startTime   = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = stageStats.setdefault(name, {"calls": 0, "wallSeconds": 0.0, "peakRSSRiseBytes": None,
+                                             "bytesRead": 0, "filesOpened": 0})
+        stats["calls"]        += 1
+        stats["wallSeconds"]  += time.perf_counter() - startTime
+        if startPeakRSS is not None:
+            stats["peakRSSRiseBytes"] = max(stats["peakRSSRiseBytes"] or 0, getPeakRSS() - startPeakRSS)
+        for key in ioCounters:
+            stats[key] += ioCounters[key] - startCounts[key]
+
+def instrumented(name):
+    """ Decorator that runs every call of a function inside stage(name). """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def getInstrumentationReport(extra=None):
+    """ Return the stages and totals for this run as a dictionary. """
+    report = {
+        "command":          sys.argv,
+        "startTime":        time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(runStartTime)),
+        "wallSeconds":      time.time() - runStartTime,
+        "peakRSSBytes":     getPeakRSS(),
+        "bytesRead":        ioCounters["bytesRead"],
+        "filesOpened":      ioCounters["filesOpened"],
+        "stages":           stageStats,
+    }
+    if extra:
+        report.update(extra)
+    return report
+
+def writeInstrumentationReport(fileName=INSTRUMENTATION_REPORT_FILE, extra=None):
+    """ Save the report for this run as JSON. Returns the report. """
+    report = getInstrumentationReport(extra)
+    with open(fileName, "w") as reportFile:
+        json.dump(report, reportFile, indent=4)
+    print("Saved instrumentation report: ", os.path.abspath(fileName))
+    return report
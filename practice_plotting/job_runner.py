@@ -0,0 +1,266 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+##########
+# TO RUN #
+##########
+
+# Runs a list of plot, animation and composite jobs in one Python process, so cartopy, matplotlib,
+# the mesh (utility.loadMesh), the open netCDF files (utility.datasetPool), the polar caps
+# and the map features are loaded once and reused by every job.
+# Make sure that you navigate to the directory that contains job_runner.py
+
+# $ python job_runner.py jobs.json
+# $ python job_runner.py jobs.json --workers 4     # Spread the jobs over 4 processes
+
+# A job file is JSON. "settings" are used by every job; each job can add its own.
+# Settings are the names in config.py, i.e. VARIABLETOPLOT, SEASON, YEAR, LAT_LIMIT, VMIN, VMAX or MAP_SUPTITLE_TOP.
+# They are only changed while the job runs. Names that config.py makes from VARIABLETOPLOT, SEASON and YEAR 
+# (like mapImageFileName and MAP_SUPTITLE_TOP) are made again for each job.
+# The few settings that a job cannot change (see UNSUPPORTED_SETTINGS) make the job fail.
+
+# {
+#     "settings": {"LAT_LIMIT": 65},
+#     "jobs": [
+#         {"type": "plot", "file": "spring_2003.nc", "image": "meanof_spring_2003.png",
+#          "settings": {"VARIABLETOPLOT": "meanof", "VMAX": 0.01, "MAP_SUPTITLE_TOP": "MEANOF SPRING 2003"}},
+#         {"type": "plot", "file": "spring_2003.nc", "image": "stdof_spring_2003.png", "hemispheres": ["north"],
+#          "settings": {"VARIABLETOPLOT": "stdof", "VMAX": 0.04}},
+#         {"type": "animate", "files": ["spring_2003.nc", "spring_2004.nc"], "animation": "meanof_spring.gif"},
+#         {"type": "composite", "seasons": ["spring"], "years": ["2003", "2004"], "outputDirectory": "composites"}
+#     ]
+# }
+
+# Job types and their options (anything left out comes from the settings):
+#   plot        file, image, day (0), hemispheres (["north", "south"]), mesh
+#   animate     files, animation, hemispheres (["north", "south"]), fileMax, mesh
+#   composite   seasons, years, outputDirectory, layout, stackedFileName
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+import config
+from instrumentation import *
+
+PROGRAM_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+def getProgramModules():
+    """ Return the modules of this program that are loaded (config.py, utility.py, ...). """
+    return [module for module in list(sys.modules.values())
+            if os.path.dirname(os.path.abspath(getattr(module, "__file__", None) or "/")) == PROGRAM_DIRECTORY]
+
+# Settings in config.py that a job cannot change: they are used once when the program starts
+# (DATASET_POOL_SIZE), after every job has run (INSTRUMENTATION_REPORT_FILE), or by code that no job runs
+UNSUPPORTED_SETTINGS = {"DATASET_POOL_SIZE", "INSTRUMENTATION_REPORT_FILE", "BATCH_SEASONS", "BATCH_YEARS",
+                        "RENDER_WORKERS", "TRACK_FRAME_SECONDS", "DEFAULT_DOWNSAMPLE_FACTOR", "FULL_PATH"}
+
+@contextmanager
+def jobSettings(settings):
+    """ Change config.py values for the length of a with block.
+    The modules use "from config import *", so each one has its own copy of every value;
+    all of the copies are changed, and put back afterwards.
+    A default argument is set when its module is imported, so the functions that the jobs call leave 
+    those settings as None and read them when they are called, or the jobs pass them explicitly.
+    Names that are not in config.py, or that are in UNSUPPORTED_SETTINGS, raise a ValueError. """
+    unknownNames = [name for name in settings if not hasattr(config, name)]
+    if unknownNames:
+        raise ValueError(f"Unknown settings (not in config.py): {unknownNames}")
+    unsupportedNames = sorted(UNSUPPORTED_SETTINGS & set(settings))
+    if unsupportedNames:
+        raise ValueError(f"These settings cannot be changed for a job: {unsupportedNames}")
+
+    originalValues = {name: getattr(config, name) for name in settings}
+    for module in getProgramModules():
+        for name, value in settings.items():
+            if name in vars(module):
+                setattr(module, name, value)
+
+    # Quiet mode is switched with setQuietMode, not read from config.py
+    originalQuietMode = isQuietMode()
+    setQuietMode(settings.get("QUIET_MODE", originalQuietMode))
+    try:
+        yield
+    finally:
+        setQuietMode(originalQuietMode)
+
+        # Modules imported during the job copied the changed values too, so check every module again
+        for module in getProgramModules():
+            for name, value in settings.items():
+                if vars(module).get(name, None) is value:
+                    setattr(module, name, originalValues[name])
+
+def addDerivedSettings(settings):
+    """ config.py makes some names from VARIABLETOPLOT, SEASON and YEAR. If a job changes those,
+    make the names again the same way (unless the job sets them too). """
+    if not {"VARIABLETOPLOT", "SEASON", "YEAR"} & set(settings):
+        return settings
+    variable    = settings.get("VARIABLETOPLOT", config.VARIABLETOPLOT)
+    season      = settings.get("SEASON", config.SEASON)
+    year        = settings.get("YEAR", config.YEAR)
+    derivedSettings = {
+        "NEW_NETCDF_FILE_NAME": f"{season}_{year}.nc",
+        "animationFileName":    f"{variable}_{season}_2003_to_{year}.gif",
+        "mapImageFileName":     f"{variable}_{season}_{year}.png",
+        "MAP_SUPTITLE_TOP":     f"{variable.upper()} {season.upper()} 2003 - {year}",
+    }
+    return {**derivedSettings, **settings}
+
+def getJobName(job, jobNumber):
+    """ Return the job's name, or one made from its number and type. """
+    return job.get("name", f"{jobNumber}: {job.get('type', 'unknown')}")
+
+def getHemispheres(job):
+    """ Return the job's hemispheres as ("north", "south"), ("north",) or ("south",). """
+    hemispheres = job.get("hemispheres", ["north", "south"])
+    unknownHemispheres = set(hemispheres) - {"north", "south"}
+    if not hemispheres or unknownHemispheres:
+        raise ValueError(f"hemispheres must be \"north\", \"south\" or both, not {hemispheres!r}")
+    return tuple(hemisphere for hemisphere in ("north", "south") if hemisphere in hemispheres)
+
+############
+# THE JOBS #
+############
+
+def runPlotJob(job):
+    """ Map one day of one variable on the north pole, the south pole or both poles, and save it as an image. """
+    import matplotlib.pyplot as plt
+    from e3sm_data_visualization import (generateNorthandSouthPoleAxes, generateNorthPoleAxes, generateSouthPoleAxes,
+                                         generateNorthandSouthPoleMaps, generateNorthPoleMap, generateSouthPoleMap)
+    from utility import loadMesh, loadData, reduceToOneDay
+
+    variable    = config.VARIABLETOPLOT
+    hemispheres = getHemispheres(job)
+    imageName   = job.get("image", config.mapImageFileName)
+    mapSettings = dict(colorBarOn=config.COLORBARON, grid=config.GRIDON, oceanFeature=config.OCEANFEATURE,
+                       landFeature=config.LANDFEATURE, coastlines=config.COASTLINES, dot_size=config.DOT_SIZE)
+
+    latCell, lonCell = loadMesh("", job.get("mesh", config.meshFileName))
+    output = loadData("", job["file"])
+    variableToPlot1Day = reduceToOneDay(output, keyVariableToPlot=variable, dayNumber=job.get("day", 0))
+
+    if hemispheres == ("north",):
+        fig, northMap = generateNorthPoleAxes()
+        generateNorthPoleMap(fig, northMap, latCell, lonCell, variableToPlot1Day, imageName, **mapSettings)
+    elif hemispheres == ("south",):
+        fig, southMap = generateSouthPoleAxes()
+        generateSouthPoleMap(fig, southMap, latCell, lonCell, variableToPlot1Day, imageName, **mapSettings)
+    else:
+        fig, northMap, southMap = generateNorthandSouthPoleAxes()
+        generateNorthandSouthPoleMaps(fig, northMap, southMap, latCell, lonCell, variableToPlot1Day, imageName, **mapSettings)
+        fig.savefig(imageName)
+
+    plt.close(fig)
+    print("Saved ", imageName)
+
+def runAnimationJob(job):
+    """ Animate every day in a list of files with the animation engine and save it as a .gif (or a video). """
+    import matplotlib.pyplot as plt
+    from animation_engine import gatherFramesFromFiles, PolarAnimationEngine
+    from utility import loadMesh
+
+    variable    = config.VARIABLETOPLOT
+    hemispheres = getHemispheres(job)
+
+    latCell, lonCell = loadMesh("", job.get("mesh", config.meshFileName))
+    frames = gatherFramesFromFiles(job["files"], keyVariableToPlot=variable, fileMax=job.get("fileMax"))
+
+    engine = PolarAnimationEngine(latCell, lonCell, hemispheres, variable, colorBarOn=config.COLORBARON,
+                                  grid=config.GRIDON, oceanFeature=config.OCEANFEATURE, landFeature=config.LANDFEATURE,
+                                  coastlines=config.COASTLINES, dot_size=config.DOT_SIZE, renderMode=config.RENDER_MODE)
+    engine.save(frames, job.get("animation", config.animationFileName), interval=config.INTERVALS)
+    plt.close(engine.fig)
+
+# Mesh, synchronizer, synchronizer index and satellite catalog of each set of input paths, loaded by the first composite job
+compositeInputs = {}
+
+def runCompositeJob(job):
+    """ Make the composite files for some seasons and years in one pass (see make_a_netCDF_file.makeComposites). """
+    import make_a_netCDF_file as composites
+
+    inputPaths = (config.meshFileName, config.SYNCH_FILE_NAME, config.runDir, 
+                  config.perlmutterpathSatellites, config.SATELLITE_CATALOG_FILE)
+    if inputPaths not in compositeInputs:
+        compositeInputs[inputPaths] = composites.loadCompositeInputs(*inputPaths)
+    CELLCOUNT, timeDetails, synchronizerIndex, catalog, inputFingerprint = compositeInputs[inputPaths]
+
+    selections = composites.getSeasonAndYearSelections(synchronizerIndex, job.get("seasons", [config.SEASON]),
+                                                       job.get("years", [config.YEAR]), job.get("outputDirectory", ""))
+    composites.makeComposites(selections, CELLCOUNT, timeDetails, synchronizerIndex, catalog,
+                              dailyDataDirectory=config.perlmutterpathDailyData,
+                              layout=job.get("layout", config.COMPOSITE_LAYOUT),
+                              checkpointDirectory=config.CHECKPOINT_DIRECTORY,
+                              stackedFileName=job.get("stackedFileName", config.STACKED_NETCDF_FILE_NAME),
+                              inputFingerprint=inputFingerprint)
+
+JOB_TYPES = {
+    "plot":         runPlotJob,
+    "animate":      runAnimationJob,
+    "composite":    runCompositeJob,
+}
+
+def runJob(job, settings=None, jobNumber=0):
+    """ Run one job with the shared settings and its own settings.
+    Returns (job name, seconds, error); error is None if the job worked. """
+    name = getJobName(job, jobNumber)
+    print(f"===== Job {name} =====")
+    startTime = time.perf_counter()
+    try:
+        if job.get("type") not in JOB_TYPES:
+            raise ValueError(f"Unknown job type {job.get('type')!r}; use one of {list(JOB_TYPES)}")
+        with stage(f"job {name}"), jobSettings(addDerivedSettings({**(settings or {}), **job.get("settings", {})})):
+            JOB_TYPES[job["type"]](job)
+        error = None
+    except Exception as exception:
+        traceback.print_exc()
+        error = f"{type(exception).__name__}: {exception}"
+    return name, time.perf_counter() - startTime, error
+
+def initializeJobWorker():
+    """ Each worker process draws off screen. """
+    import matplotlib
+    matplotlib.use("Agg")
+
+def runJobInWorker(arguments):
+    """ runJob for a worker process. The worker keeps its mesh, files and maps loaded for the next job it gets. """
+    job, settings, jobNumber = arguments
+    return runJob(job, settings, jobNumber)
+
+def runJobs(jobFile, workers=1):
+    """ Run every job in a job file. With more than one worker, the jobs are spread over a pool of processes,
+    so they must not depend on each other (i.e. an animation of composites made by another job).
+    Returns a list of (job name, seconds, error). """
+    with open(jobFile) as specFile:
+        spec = json.load(specFile)
+    settings, jobs = spec.get("settings", {}), spec["jobs"]
+    print(f"Jobs: {len(jobs)}, workers: {workers}")
+
+    if workers > 1:
+        with multiprocessing.Pool(workers, initializer=initializeJobWorker) as pool:
+            results = pool.map(runJobInWorker, [(job, settings, jobNumber) for jobNumber, job in enumerate(jobs)], chunksize=1)
+    else:
+        initializeJobWorker()
+        results = [runJob(job, settings, jobNumber) for jobNumber, job in enumerate(jobs)]
+
+    for name, seconds, error in results:
+        print(f"{name}: {seconds:.2f} s" + (f"  FAILED {error}" if error else ""))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Run plot, animation and composite jobs in one process.")
+    parser.add_argument("jobFile", help="JSON file with the settings and the list of jobs")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes that run jobs at the same time")
+    arguments = parser.parse_args()
+
+    results = runJobs(arguments.jobFile, arguments.workers)
+    writeInstrumentationReport(extra={"jobs": [{"name": name, "seconds": seconds, "error": error}
+                                               for name, seconds, error in results]})
+    if any(error for _, _, error in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -10,83 +10,88 @@ import numpy as np
 from netCDF4 import Dataset
 from datetime import datetime
 import os
+import multiprocessing
+import itertools
+import threading
+import hashlib
+import getpass
+from concurrent.futures import ThreadPoolExecutor
 from utility import *
+from accumulators import *
+from satellite_catalog import *
+from synchronizer_index import *
 
 import glob
 from pathlib import Path
-from utility import *
 
-USER                = os. getlogin()                        #TODO: check if this is ok for Perlmutter
+USER                = getpass.getuser()                     # os.getlogin() fails with no terminal (batch jobs)
 SOURCE              = "SOME PATH NAME TO FILL IN LATER"     #TODO: make this dynamic
 
 FILL_VALUE      = -99999.0
 
+STACKED_TIME_STRING_LENGTH = 64     # Characters in each time_string record of a stacked composite file
+
 DENSITY_WATER   = 1026
 DENSITY_ICE     = 917
 DENSITY_SNOW    = 330
 
-    #Clusters  1        2         3       4
-SEASONS = ["spring", "summer", "fall", "winter"]
-
 #TODO: Make this dynamic
 LEAPYEARS = ["2004", "2008"]
 
-def loadSynchronizer(synchronizerFile=SYNCH_FILE_NAME):
+@instrumented("synchronizer load")
+def loadSynchronizer(synchronizerFile=SYNCH_FILE_NAME, directory=runDir):
     """ Loads the synchronizer file that is organized in chronological order.
     Returns arrays of the time details for each satellite track and the total number of files. """
-    synchData        = loadData(runDir, synchronizerFile) # Make sure that runDir is set to perlmutterpath1
+    synchData        = loadData(directory, synchronizerFile) # Make sure that runDir is set to perlmutterpath1
     shapeOfSynchData = synchData.variables["time_string"].shape
-    timeStrings  = printDateTime(synchData, "time_string", shapeOfSynchData[0])
+    timeStrings  = printDateTime(synchData, "time_string", shapeOfSynchData[0], printTimes=False)
 
     # For ALL satellite data files:
-    timeCluster     = synchData.variables["seasonalcluster"]
-    timeYear        = synchData.variables["year"]
-    timeMonth       = synchData.variables["month"]
-    timeDay         = synchData.variables["day"]
-    timeHour        = synchData.variables["hour"]
-    timeGregorian   = synchData.variables["time"]
-
-    print("===== SYNCH FILE DETAILS ======")
+    # These are read into memory so they stay usable after the pool closes the synch file.
+    timeCluster     = synchData.variables["seasonalcluster"][:]
+    timeYear        = synchData.variables["year"][:]
+    timeMonth       = synchData.variables["month"][:]
+    timeDay         = synchData.variables["day"][:]
+    timeHour        = synchData.variables["hour"][:]
+    timeGregorian   = synchData.variables["time"][:]
+
+    debugPrint("===== SYNCH FILE DETAILS ======")
     # Looking at one specific satellite file
     fileCount = shapeOfSynchData[0]
 
     return fileCount, timeStrings, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian
 
-def getFileIndicesFromSynchronizerBySeasonalCluster(timeClusters):
-    """ Look at the seasonal cluster array from the synch file. Return the indices for the
-    season in specified in the config.py file. """
-    print("Season is ", SEASON)
-    season = SEASONS.index(SEASON) + 1  # Seasons are 1, 2, 3, 4
-    return [i for i in range(len(timeClusters)) if timeClusters[i] == season]
-
-def getFileIndicesFromSynchronizerByYear(timeYears):
-    """ Look at the year array from the synch file. Return the indices for the
-    year in specified in the config.py file. """
-    print("Year is ", YEAR)
-    return [i for i in range(len(timeYears)) if timeYears[i] == int(YEAR)]
-
-# From https://www.geeksforgeeks.org/python-intersection-two-lists/#
-def intersection(lst1, lst2):
-    """ Return the intersection of two lists (what they have in common)."""
-    lst3 = [value for value in lst1 if value in lst2]
-    return lst3
-
-#TODO: Make sure the data types are correct; there should be an "f" after many of them (from Andrew's example file)
-def createVariableForNetCDF(ncfile, shortName, longName, vmax, vmin = 0.0, fillvalue = None, dtype = np.float64):
+def createVariableForNetCDF(ncfile, shortName, longName, vmax, vmin = 0.0, fillvalue = None, dtype = None,
+                            dimensions = ('nCells',), compressionLevel = None, chunkCells = None):
     """ Add a variable to the netCDF file. 
-    It will appear in the header info. """
-    variable = ncfile.createVariable(shortName, dtype, ('nCells',))
+    It will appear in the header info. 
+    The variable is compressed with zlib and the shuffle filter unless compressionLevel is 0,
+    and stored in chunks of chunkCells cells (one record per chunk if there is a time dimension). 
+    With vmax = None there is no valid_range, so readers do not mask any value. 
+    Leave dtype, compressionLevel and chunkCells as None to use COMPOSITE_STATISTICS_TYPE, 
+    COMPOSITE_COMPRESSION_LEVEL and COMPOSITE_CHUNK_CELLS (read when this is called, so job_runner.py can change them). """
+    if dtype is None:
+        dtype = COMPOSITE_STATISTICS_TYPE
+    if compressionLevel is None:
+        compressionLevel = COMPOSITE_COMPRESSION_LEVEL
+    if chunkCells is None:
+        chunkCells = COMPOSITE_CHUNK_CELLS
+    cellCount = len(ncfile.dimensions['nCells'])
+    chunkSizes = [1] * (len(dimensions) - 1) + [min(chunkCells, cellCount)] if chunkCells else None
+
+    variable = ncfile.createVariable(shortName, dtype, dimensions, zlib=compressionLevel > 0, 
+                                     complevel=max(compressionLevel, 1), shuffle=compressionLevel > 0,
+                                     chunksizes=chunkSizes, fill_value=fillvalue)
     variable.long_name = longName
-    variable.valid_range = (vmin, vmax)
-    if fillvalue != None:
-        variable._fillvalue = fillvalue
+    if vmax is not None:
+        variable.valid_range = np.array((vmin, vmax), dtype=dtype)  # Attribute has the same type as the variable
     return variable
 
 def printSatelliteTimeDetails(fileIndex, timeStrings, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian):
     """ Take in arrays of time details and a fileIndex. Print and return those details
     for a specific satellite file. This assumes the synch file was read and that the
     time details have been filled in with values from the synch file. """
-    print("File index is    ", fileIndex)
+    debugPrint("File index is    ", fileIndex)
     
     timeString  = timeStrings[fileIndex]
     cluster     = timeCluster[fileIndex]
@@ -96,20 +101,24 @@ def printSatelliteTimeDetails(fileIndex, timeStrings, timeCluster, timeYear, tim
     hour        = timeHour[fileIndex]
     gregorian   = timeGregorian[fileIndex]
 
-    print("Time String:     ", timeString)
-    print("Cluster:         ", cluster)
-    print("Year:            ", year)
-    print("Month:           ", month)
-    print("Day:             ", day)
-    print("Hour:            ", hour)
-    print("Gregorian Time:  ", gregorian)
+    debugPrint("Time String:     ", timeString)
+    debugPrint("Cluster:         ", cluster)
+    debugPrint("Year:            ", year)
+    debugPrint("Month:           ", month)
+    debugPrint("Day:             ", day)
+    debugPrint("Hour:            ", hour)
+    debugPrint("Gregorian Time:  ", gregorian)
 
     return timeString, cluster, year, month, day, hour, gregorian
 
 # Not used currently
-def returnListOfSatFileNamesBySeasonAndYear(season = "*", year = "*"):
+def returnListOfSatFileNamesBySeasonAndYear(season = "*", year = "*", catalog = None):
     """ Assumes that the synch file was read and that arrays have been filled
-    with the time information for all satellite files. This can be used to return a list of files that match a pattern. Uses glob for this. """
+    with the time information for all satellite files. This can be used to return a list of files that match a pattern. 
+    Uses the satellite catalog if one is given; otherwise it uses glob for this. """
+
+    if catalog is not None:
+        return catalog.fileNamesBySeasonAndYear(season, year)
 
     filenamePattern = f"icesat_E3SM_{season}_{year}_*.nc"   
 
@@ -117,9 +126,10 @@ def returnListOfSatFileNamesBySeasonAndYear(season = "*", year = "*"):
     matchingFiles = glob.glob(searchPattern)
     return matchingFiles
 
-def loadOneSatFile(fileIndex, previousday, dayCount, timeStrings, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian):
+def loadOneSatFile(fileIndex, previousday, dayCount, timeStrings, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian, catalog = None):
     """ Assumes that the synch file was read and that arrays have been filled
-    with the time information. """
+    with the time information. Uses the satellite catalog if one is given, 
+    so that the satellite directory is not searched for every track. """
 
     timeString, cluster, year, month, day, hour, gregorian = printSatelliteTimeDetails(fileIndex, timeStrings, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian)
 
@@ -130,63 +140,212 @@ def loadOneSatFile(fileIndex, previousday, dayCount, timeStrings, timeCluster, t
     #satelliteFileName   = r"\satellite_data_preprocessed\one_day\icesat_E3SM_spring_2008_02_22_16.nc"
     #satelliteFileName    = r"icesat_E3SM_spring_2008_02_22_16.nc" #PM
 
+    if catalog is not None:
+        satelliteFileName = catalog.lookupIndex(fileIndex)
+        debugPrint("Satellite file name: ", satelliteFileName)
+        return satelliteFileName, previousday, dayCount
+
     # ALL SATELLITE FILES - Find the file using the file name pattern
     filenamePattern = f"icesat_E3SM_*_{year}_{str(month).zfill(2)}_{str(day).zfill(2)}_{str(hour).zfill(2)}.nc"
     
     searchPattern = os.path.join(perlmutterpathSatellites, filenamePattern)
     matchingFiles = glob.glob(searchPattern)
     satelliteFileName = matchingFiles[0] if matchingFiles else None
-    print("Matching files: ", matchingFiles)
-    print("Satellite file name: ", satelliteFileName)
+    debugPrint("Matching files: ", matchingFiles)
+    debugPrint("Satellite file name: ", satelliteFileName)
     return satelliteFileName, previousday, dayCount
 
 def getThickness(gridCellAveragedThickness, iceConcentration):
     """ Grid cell averaged thickness is the same as the sea ice volume variable in E3SM.
     Concentration is the same as the sea ice area variable in E3SM.
     volume / area of cell = height (thickness) 
+    Cells with no ice (zero area) have a thickness of 0 instead of inf or NaN.
     """
-    return gridCellAveragedThickness / iceConcentration
+    thickness = np.zeros(np.shape(gridCellAveragedThickness), dtype=np.result_type(gridCellAveragedThickness, iceConcentration))
+    return np.divide(gridCellAveragedThickness, iceConcentration, out=thickness, where=iceConcentration > 0)
 
 def getFreeboard(heightIce, heightSnow):
     """Formula to calculate freeboard: hf = hi (pw-pi)/pw + hs (pw-ps)/pw.
     Where p means density; h is height, w is water, i is ice, s is snow"""
     return heightIce*(DENSITY_WATER-DENSITY_ICE)/DENSITY_WATER + heightSnow*(DENSITY_WATER-DENSITY_SNOW)/DENSITY_WATER
 
-def main():
-    
-    ##################################
-    # OPEN THE MESH & SET CELL COUNT #
-    ##################################
-    latCell, lonCell = loadMesh("", meshFileName) # Make sure that runDir is set to perlmutterpath1
-    print("nCells", latCell.shape[0])
-    CELLCOUNT = latCell.shape[0]
+def readOneSatelliteTrackInWorker(satelliteFileName):
+    """ readOneSatelliteTrack for a worker process. Also returns what the worker read,
+    so the main process can add it to its instrumentation report. """
+    return readOneSatelliteTrack(satelliteFileName), takeIOCounts()
 
-    ########################
-    # Use the synchronizer #
-    ########################
-    fileCount, timeStrings, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian = loadSynchronizer()
-    print("Number of satellite tracks in Synch file: ", fileCount)
+def readOneSatelliteTrack(satelliteFileName):
+    """ Read one satellite track file and reduce it to what the composite needs:
+    the model cell indices, the observation cell indices, and one positive freeboard
+    reading per observed cell. This runs in the worker processes when ingesting in parallel. """
 
-    # Get all file indices by season and by year; find the intersection of those lists
-    seasonFileIndices = getFileIndicesFromSynchronizerBySeasonalCluster(np.array(timeCluster))
-    yearFileIndices = getFileIndicesFromSynchronizerByYear(np.array(timeYear))
-    fileIndices = intersection(seasonFileIndices, yearFileIndices)
-    print(f"File indices for {SEASON} {YEAR}: ", fileIndices)
+    # Load the data from the satellite
+    #satelliteData       = loadData(runDir, satelliteFileName) #local
+    satelliteData       = loadData("", satelliteFileName) #PM
+    
+    # Grab the variables from the satellite data file
+    freeBoardReadings               = reduceToOneDay(satelliteData, "freeboard")
+    cellIndicesForAllSamples        = returnCellIndices(satelliteData, "modcell")
+    cellIndicesForAllObservations   = returnCellIndices(satelliteData, "cell")
+
+    # Account for off-by-one converstion from MATLAB to Python indexing
+    cellIndicesForAllSamples = cellIndicesForAllSamples - 1
+    cellIndicesForAllObservations = cellIndicesForAllObservations - 1
+
+    debugPrint("Shape of freeBoardReadings:             ", freeBoardReadings.shape)
+    debugPrint("Shape of cellIndicesForAllSamples:      ", cellIndicesForAllSamples.shape)
+    debugPrint("Shape of cellIndicesForAllObservations: ", cellIndicesForAllObservations.shape)
+
+    observedCells, observedReadings = reduceTrackReadings(cellIndicesForAllObservations, freeBoardReadings)
+
+    return np.asarray(cellIndicesForAllSamples), np.asarray(cellIndicesForAllObservations), observedCells, observedReadings
+
+def ingestSatelliteTracks(satelliteFileNames, compositesPerTrack, workers=None, fileIndices=None,
+                          modelDays=None, saveCheckpoints=None, checkpointInterval=None):
+    """ Read every satellite track and add it to its composites.
+    compositesPerTrack[i] is the list of composites that satelliteFileNames[i] belongs to,
+    fileIndices[i] is its index in the synchronizer and modelDays[i] is its day in the model (see getModelDay).
+    With more than one worker, the files are read and reduced in a pool of processes.
+    The reduced tracks come back in the same order as satelliteFileNames and are added one at a time,
+    so the output is the same as reading the tracks serially. 
+    saveCheckpoints (if given) is called after every checkpointInterval tracks. 
+    Leave workers and checkpointInterval as None to use INGEST_WORKERS and CHECKPOINT_TRACK_INTERVAL 
+    (read when this is called, so job_runner.py can change them). """
+    if workers is None:
+        workers = INGEST_WORKERS
+    if checkpointInterval is None:
+        checkpointInterval = CHECKPOINT_TRACK_INTERVAL
+    if fileIndices is None:
+        fileIndices = [None] * len(satelliteFileNames)
+    if modelDays is None:
+        modelDays = [None] * len(satelliteFileNames)
+
+    with stage("track ingest"):
+        if workers > 1:
+            # Each worker starts its I/O counts at zero (takeIOCounts) and sends them back with every track
+            pool = multiprocessing.Pool(workers, initializer=takeIOCounts)
+            chunkSize = max(1, len(satelliteFileNames) // (workers * 4))
+            reducedTracks = pool.imap(readOneSatelliteTrackInWorker, satelliteFileNames, chunksize=chunkSize)
+        else:
+            pool = None
+            reducedTracks = ((readOneSatelliteTrack(fileName), {}) for fileName in satelliteFileNames)
+
+        try:
+            for trackCount, ((reducedTrack, workerCounts), composites, fileIndex, modelDay) in enumerate(
+                    zip(reducedTracks, compositesPerTrack, fileIndices, modelDays), start=1):
+                addIOCounts(workerCounts)
+                for composite in composites:
+                    composite.addTrack(*reducedTrack, fileIndex=fileIndex, modelDay=modelDay)
+
+                if saveCheckpoints is not None and trackCount % checkpointInterval == 0:
+                    saveCheckpoints()
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+def getModelDailyDataFileName(year, month):
+    """ Return the name of the E3SM timeSeriesStatsDaily file for one month. """
+    return "v3.LR.historical_0051.mpassi.hist.am.timeSeriesStatsDaily." + str(year) + "-" + str(month).zfill(2) + "-"+ str(1).zfill(2) + ".nc"
+
+def getModelDay(synchronizerIndex, fileIndex):
+    """ Return the (year, month, day) of a satellite track in the model.
+    Returns None for February 29th in leap years, since the model has no leap days. """
+    year, month, day = (int(synchronizerIndex.year[fileIndex]), int(synchronizerIndex.month[fileIndex]), 
+                        int(synchronizerIndex.day[fileIndex]))
+    if str(year) in LEAPYEARS and month == 2 and day == 29:
+        return None
+    return (year, month, day)
+
+# netCDF (HDF5) and the dataset pool are not thread-safe, so only one thread reads at a time
+modelReadLock = threading.Lock()
+
+def readModelSlab(modelData, keyVariableToPlot, days):
+    """ Read the given days (1-based, sorted) of one variable of a monthly file in one read.
+    Only the days from the first to the last one are read. Returns the slab as read (see selectModelDays). """
+    return reduceToDayRange(modelData, keyVariableToPlot, startDay=days[0] - 1, endDay=days[-1])
+
+def selectModelDays(slab, days):
+    """ Return the given days of a slab read by readModelSlab as a float32 array of (days, nCells). 
+    Masked values are 0. """
+    return np.ma.filled(slab[np.asarray(days) - days[0]], 0).astype(np.float32)
+
+def calculateModelFreeboardForMonth(dailyDataDirectory, year, month, days):
+    """ Calculate the model freeboard for every cell on the given days of one monthly timeSeriesStatsDaily file.
+    Each variable is read once, as a 2D slab, and the freeboard of every day is worked out at once, in float32.
+    Only the netCDF reads hold modelReadLock, so with more than one thread the conversion and freeboard math 
+    of one month run while another month is read. Returns an array of (days, nCells). """
+    with modelReadLock:
+        #with openData(runDir, getModelDailyDataFileName(year, month)) as modelData: # LOCAL
+        with openData(dailyDataDirectory, getModelDailyDataFileName(year, month)) as modelData: #PM
+            debugPrint("==============")
+            debugPrint(f"Month and days: {month} {days} {year}")
+            snowVolumeSlab  = readModelSlab(modelData, "timeDaily_avg_snowVolumeCell", days)
+            iceVolumeSlab   = readModelSlab(modelData, "timeDaily_avg_iceVolumeCell", days)
+            iceAreaSlab     = readModelSlab(modelData, "timeDaily_avg_iceAreaCell", days)
+
+            if not isQuietMode():
+                modelTimes = reduceToDayRange(modelData, START_TIME_VARIABLE, startDay=days[0] - 1, endDay=days[-1])
+                convertDateBytesToString(modelTimes[np.asarray(days) - days[0]])
+
+    snowVolumeCells = selectModelDays(snowVolumeSlab, days)
+    iceVolumeCells  = selectModelDays(iceVolumeSlab, days)
+    iceAreaCells    = selectModelDays(iceAreaSlab, days)
+    debugPrint("Ice Area Cells shape:       ", iceAreaCells.shape)
+
+    # Freeboard = Sea Ice Thickness * (1 - Sea Ice Density / Seawater Density) + Snow Thickness (1 - Snow Density / Seawater Density)
+    heightIceCells  = getThickness(iceVolumeCells, iceAreaCells)
+    heightSnowCells = getThickness(snowVolumeCells, iceAreaCells)
+    return getFreeboard(heightIceCells, heightSnowCells)
+
+@instrumented("model freeboard")
+def ingestModelFreeboard(compositesPerModelDay, dailyDataDirectory=perlmutterpathDailyData, threads=None):
+    """ Calculate the model freeboard once for each (year, month, day) key of compositesPerModelDay
+    and add it to every composite that needs that day. Each composite samples it at the cells 
+    its tracks passed over that day. Each monthly model file is opened once and each variable is read once per month.
+    With more than one thread, several months are calculated at the same time; 
+    they are still added to the composites in order, so the output is the same. 
+    Leave threads as None to use MODEL_FREEBOARD_THREADS (read when this is called, so job_runner.py can change it). """
+    if threads is None:
+        threads = MODEL_FREEBOARD_THREADS
+    months = [(yearAndMonth, [modelDay[2] for modelDay in daysInMonth]) for yearAndMonth, daysInMonth 
+              in itertools.groupby(sorted(compositesPerModelDay), key=lambda modelDay: modelDay[:2])]
+
+    def calculateMonth(monthAndDays):
+        (year, month), days = monthAndDays
+        return calculateModelFreeboardForMonth(dailyDataDirectory, year, month, days)
+
+    with ThreadPoolExecutor(max_workers=max(threads, 1)) as executor:
+        # Only threads months are in memory at a time
+        for start in range(0, len(months), max(threads, 1)):
+            batch = months[start:start + max(threads, 1)]
+            for ((year, month), days), modelFreeboards in zip(batch, executor.map(calculateMonth, batch)):
+                for day, modelFreeboard in zip(days, modelFreeboards):
+                    modelDay = (year, month, day)
+                    for composite in compositesPerModelDay[modelDay]:
+                        composite.addModelDay(modelFreeboard, modelDay)
+
+def createCompositeFile(fileName, CELLCOUNT, stacked = False):
+    """ Open a new composite netCDF file and add its dimensions, attributes and variables.
+    With stacked = True every variable also has a time dimension, with one record per composite.
+    Returns the open file and a dictionary of its variables. """
 
     ########################
     # OPEN THE NETCDF FILE #
     ########################
 
-    try: ncfile.close()  # just to be safe, make sure dataset is not already open.
-    except: pass
-    ncfile = Dataset(NEW_NETCDF_FILE_NAME, mode='w', format='NETCDF4_CLASSIC') 
+    ncfile = Dataset(fileName, mode='w', format='NETCDF4_CLASSIC') 
 
     ##############
     # DIMENSIONS #
     ##############
 
-    # Create the dimensions (nCells is the only dimension needed)
+    # Create the dimensions (nCells is the only dimension needed, unless the composites are stacked)
     nCells = ncfile.createDimension('nCells', CELLCOUNT)
+    time_dim = ncfile.createDimension('time', None)
+    if stacked:
+        ncfile.createDimension('StrLen', STACKED_TIME_STRING_LENGTH)
+    dimensions = ('time', 'nCells') if stacked else ('nCells',)
 
     ##############
     # ATTRIBUTES #
@@ -206,214 +365,333 @@ def main():
     # VARIABLES #
     #############
 
-    effmf   = createVariableForNetCDF(ncfile, "effmf", "model freeboard effective sample size", 
-                            vmax = 29.88248, fillvalue = FILL_VALUE)
-    effof   = createVariableForNetCDF(ncfile, "effof", "observed freeboard effective sample size", 
-                            vmax = 22321.38, vmin = 0.2787585, fillvalue = FILL_VALUE)
-    meanmf  = createVariableForNetCDF(ncfile, "meanmf", "model freeboard mean", 
-                            vmax = 0.9041953, vmin = 0.01583931, fillvalue = FILL_VALUE)
-    meanof  = createVariableForNetCDF(ncfile, "meanof", "observed freeboard mean", 
-                            vmax = 1.14699, fillvalue = FILL_VALUE)
-    samplemf = createVariableForNetCDF(ncfile, "samplemf", "model freeboard sample count", 
-                            vmax = 296)
-    sampleof = createVariableForNetCDF(ncfile, "sampleof", "observed freeboard sample count", 
-                            vmax = 46893)
-    stdmf   = createVariableForNetCDF(ncfile, "stdmf", "model freeboard standard deviation", 
-                            vmax = 0.2506092, vmin = 0.005416268, fillvalue = FILL_VALUE)
-    stdof   = createVariableForNetCDF(ncfile, "stdof", "observed freeboard standard deviation", 
-                            vmax = 0.9629242, vmin = 0.01656876, fillvalue = FILL_VALUE)
+    variables = {}
+    # The effective sample sizes go up to the sample count, which has no fixed bound, so they have no valid_range
+    variables["effmf"]    = createVariableForNetCDF(ncfile, "effmf", "model freeboard effective sample size", 
+                            vmax = None, fillvalue = FILL_VALUE, dimensions = dimensions)
+    variables["effof"]    = createVariableForNetCDF(ncfile, "effof", "observed freeboard effective sample size", 
+                            vmax = None, fillvalue = FILL_VALUE, dimensions = dimensions)
+    variables["meanmf"]   = createVariableForNetCDF(ncfile, "meanmf", "model freeboard mean", 
+                            vmax = 0.9041953, vmin = 0.01583931, fillvalue = FILL_VALUE, dimensions = dimensions)
+    variables["meanof"]   = createVariableForNetCDF(ncfile, "meanof", "observed freeboard mean", 
+                            vmax = 1.14699, fillvalue = FILL_VALUE, dimensions = dimensions)
+    variables["samplemf"] = createVariableForNetCDF(ncfile, "samplemf", "model freeboard sample count", 
+                            vmax = 296, dtype = COMPOSITE_COUNT_TYPE, dimensions = dimensions)
+    variables["sampleof"] = createVariableForNetCDF(ncfile, "sampleof", "observed freeboard sample count", 
+                            vmax = 46893, dtype = COMPOSITE_COUNT_TYPE, dimensions = dimensions)
+    variables["stdmf"]    = createVariableForNetCDF(ncfile, "stdmf", "model freeboard standard deviation", 
+                            vmax = 0.2506092, vmin = 0.005416268, fillvalue = FILL_VALUE, dimensions = dimensions)
+    variables["stdof"]    = createVariableForNetCDF(ncfile, "stdof", "observed freeboard standard deviation", 
+                            vmax = 0.9629242, vmin = 0.01656876, fillvalue = FILL_VALUE, dimensions = dimensions)
+
+    if stacked:
+        # Full labels (i.e. spring_2003), so the plotting scripts can decode them with printDateTime
+        variables["time_string"] = ncfile.createVariable("time_string", "S1", ('time', 'StrLen'))
+    else:
+        variables["time_string"] = ncfile.createVariable("time_string", "S1", ('time',))
+    variables["time_string"].long_name = "The season and year for this data"
+
+    return ncfile, variables
+
+def writeCompositeRecord(variables, composite, record = None):
+    """ Write the samplemf, sampleof, meanof, stdof, meanmf, stdmf, effmf and effof of one composite.
+    Leave record as None for a file with one composite, or give its index along the time dimension. 
+    In every statistic (meanof, stdof, meanmf, stdmf, effmf and effof) cells with no readings are the fill value. """
+    cells = slice(None) if record is None else (record, slice(None))
+    samplemf, sampleof = variables["samplemf"], variables["sampleof"]
+    meanof, stdof = variables["meanof"], variables["stdof"]
+    meanmf, stdmf = variables["meanmf"], variables["stdmf"]
+    effmf, effof = variables["effmf"], variables["effof"]
+
+    ############################
+    # SATELLITE-ONLY VARIABLES #
+    ############################
+
+    samplemf[cells] = composite.samples
+    sampleof[cells] = composite.observations
+
+    debugPrint("===   CALCULATING MEANOF AND STDOF   === ")
+    means = composite.observedFreeboard.getMean()
+    stdDeviations = composite.observedFreeboard.getStandardDeviation()
+
+    debugPrint("Shape of means", means.shape)
+    debugPrint("Shape of stdDeviations", stdDeviations.shape)
+    # Observed freeboard mean is the sum of all photon readings per cell over time
+    # divided by the number of tracks (ex. 409 for spring 2003)
+    meanof[cells] = np.ma.masked_invalid(means)
+    stdof[cells] = np.ma.masked_invalid(stdDeviations)
+
+    # # Read data back from variable, print min and max
+    if not isQuietMode():
+        print("===== SATELLITE VARIABLES ======")
+        print("Shape of samplemf", samplemf[cells].shape)
+        print("Shape of sampleof", sampleof[cells].shape)
+        print("Samplemf Min/Max values:", samplemf[cells].min(), samplemf[cells].max())
+        print("Sampleof Min/Max values:", sampleof[cells].min(), sampleof[cells].max())
+        print("Meanof   Min/Max values:", meanof[cells].min(),   meanof[cells].max())
+        print("Stdof    Min/Max values:", stdof[cells].min(),    stdof[cells].max())
 
     ###################
-    # SATELLITE FILES #
+    # MODEL VARIABLES #
     ###################
 
-    samples      = np.zeros(CELLCOUNT)
-    observations = np.zeros(CELLCOUNT)
-    allFreeboardFromSatelliteData = np.zeros((fileCount, CELLCOUNT)) 
-    
-    dayCount = 1
-    previousday = timeDay[0]
+    # The model freeboard was sampled along the tracks: on each day, at the model cells of that day's tracks.
+    # Cells that no track passed over are the fill value.
+    debugPrint("\n=====   ALONG TRACK   ======")
+    debugPrint("Cells sampled along the tracks: ", np.count_nonzero(composite.modelFreeboard.count > 0))
 
-    print("Shape of allFreeboardFromSatelliteData:   ", allFreeboardFromSatelliteData.shape)
+    debugPrint("===   CALCULATING MEANMF AND STDMF   === ")
+    meanmf[cells] = np.ma.masked_invalid(composite.modelFreeboard.getMean())
+    stdmf[cells] = np.ma.masked_invalid(composite.modelFreeboard.getStandardDeviation())
 
-    for fileIndex in fileIndices:
+    if not isQuietMode():
+        print("\n=====   MODEL VARIABLES   ======")
+        print("Meanmf   Min/Max values:", meanmf[cells].min(),   meanmf[cells].max())
+        print("Stdmf    Min/Max values:", stdmf[cells].min(),    stdmf[cells].max())
 
-        satelliteFileName, previousday, dayCount = loadOneSatFile(fileIndex, previousday, dayCount, timeStrings, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian)
+    ##########################
+    # EFFECTIVE SAMPLE SIZES #
+    ##########################
 
-        # Load the data from the satellite
-        #satelliteData       = loadData(runDir, satelliteFileName) #local
-        satelliteData       = loadData("", satelliteFileName) #PM
-        
-        # Grab the variables from the satellite data file
-        freeBoardReadings               = reduceToOneDay(satelliteData, "freeboard")
-        cellIndicesForAllSamples        = returnCellIndices(satelliteData, "modcell")
-        cellIndicesForAllObservations   = returnCellIndices(satelliteData, "cell")
+    # n (1 - r1) / (1 + r1), where r1 is the lag-1 autocorrelation of each cell's readings over time.
+    debugPrint("===   CALCULATING EFFMF AND EFFOF   === ")
+    effmf[cells] = np.ma.masked_invalid(composite.modelFreeboard.getEffectiveSampleSize())
+    effof[cells] = np.ma.masked_invalid(composite.observedFreeboard.getEffectiveSampleSize())
 
-        # Account for off-by-one converstion from MATLAB to Python indexing
-        cellIndicesForAllSamples = cellIndicesForAllSamples - 1
-        cellIndicesForAllObservations = cellIndicesForAllObservations - 1
+    if not isQuietMode():
+        print("Effmf    Min/Max values:", effmf[cells].min(),    effmf[cells].max())
+        print("Effof    Min/Max values:", effof[cells].min(),    effof[cells].max())
 
-        # Debugging and checking what cells have samples
-        # for index in cellIndicesForAllSamples:
-        #     samples[index] = 1
+@instrumented("write")
+def writeCompositeFile(fileName, composite, timeLabel):
+    """ Write the samplemf, sampleof, meanof, stdof, meanmf, stdmf, effmf and effof of one composite to a new netCDF file. """
+    ncfile, variables = createCompositeFile(fileName, composite.cellCount)
+    writeCompositeRecord(variables, composite)
 
-        # for index in cellIndicesForAllObservations:
-        #     observations[index] = 1
+    variables["time_string"][:] = [f"{timeLabel[-1]}"]
 
-        print("Shape of freeBoardReadings:             ", freeBoardReadings.shape)
-        print("Shape of cellIndicesForAllSamples:      ", cellIndicesForAllSamples.shape)
-        print("Shape of cellIndicesForAllObservations: ", cellIndicesForAllObservations.shape)
+    # close the Dataset
+    ncfile.close()
+    debugPrint('Dataset is closed!')
 
-        ############################
-        # SATELLITE-ONLY VARIABLES #
-        ############################
-        # These variables are easy to pull directly from the satellite data.
+@instrumented("write")
+def writeStackedCompositeFile(fileName, composites, timeLabels):
+    """ Write every composite to one netCDF file, one record along the time dimension each.
+    timeLabels has one label per composite (i.e. spring_2003), saved in time_string. """
+    ncfile, variables = createCompositeFile(fileName, composites[0].cellCount, stacked=True)
 
-        # Sample model freeboard is the # of times that cell was passed over 
-        # (ex. once in a day) in the full time
-        samples += np.bincount(cellIndicesForAllSamples, minlength=CELLCOUNT) # Collect one count of the satellite passing overhead.
+    for record, (composite, timeLabel) in enumerate(zip(composites, timeLabels)):
+        debugPrint(f"Record {record}: {timeLabel}")
+        writeCompositeRecord(variables, composite, record)
 
-        # Sample observation freeboard is the # of photon reads per cell over full time
-        observations += np.bincount(cellIndicesForAllObservations, minlength=CELLCOUNT) # Collect all photon counts into bins using cell indices.
+    # One row of characters per record, padded with nulls
+    timeStrings = np.array(timeLabels, dtype=f"S{STACKED_TIME_STRING_LENGTH}")
+    variables["time_string"][:] = timeStrings.view("S1").reshape(len(timeLabels), STACKED_TIME_STRING_LENGTH)
 
-        # Collecting all freeboard readings into a matrix for caculating the mean and standard deviation
-        allFreeboardFromSatelliteData[fileIndex][cellIndicesForAllObservations] = freeBoardReadings[:]
+    # close the Dataset
+    ncfile.close()
+    debugPrint('Dataset is closed!')
+
+def getInputFingerprint(latCell, lonCell, synchronizerIndex):
+    """ Return a hash of the mesh coordinates and the synchronizer's track times.
+    A checkpoint is only reused by a run with the same fingerprint. """
+    digest = hashlib.sha1()
+    for array in (latCell, lonCell, synchronizerIndex.cluster, synchronizerIndex.year, synchronizerIndex.month,
+                  synchronizerIndex.day, synchronizerIndex.hour, synchronizerIndex.time):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+def loadCompositeInputs(meshPath=meshFileName, synchronizerFile=SYNCH_FILE_NAME, directory=runDir, 
+                        satelliteDirectory=perlmutterpathSatellites, catalogFileName=SATELLITE_CATALOG_FILE):
+    """ Load the mesh, the synchronizer, the synchronizer index and the satellite file catalog. 
+    Returns the cell count, the synchronizer's time details, the index, the catalog 
+    and the fingerprint of the mesh and synchronizer (see getInputFingerprint). """
 
-        # for debugging - checking the latitudes and longitudes indexed
-        # satLat = np.array(latCell[cellIndicesForAllSamples])
-        # print("Length of latCell", len(latCell))
-        # print("Latitude: ", satLat)
-        # satLon = np.array(lonCell[cellIndicesForAllSamples])
-        # print("Length of lonCell", len(lonCell))
-        # print("Longitude: ", satLon)
+    ##################################
+    # OPEN THE MESH & SET CELL COUNT #
+    ##################################
+    latCell, lonCell = loadMesh("", meshPath) # Make sure that runDir is set to perlmutterpath1
+    debugPrint("nCells", latCell.shape[0])
+    CELLCOUNT = latCell.shape[0]
 
-    print("=== FINISHED GRABBING SATELLITE DATA === ")
+    ########################
+    # Use the synchronizer #
+    ########################
+    synchronizerDetails = loadSynchronizer(synchronizerFile, directory)
+    fileCount, timeStrings, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian = synchronizerDetails
+    debugPrint("Number of satellite tracks in Synch file: ", fileCount)
+
+    synchronizerIndex = SynchronizerIndex(timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian)
+
+    # Scan the satellite directory once (or read the saved catalog) instead of once per track
+    with stage("satellite catalog"):
+        catalog = loadSatelliteCatalog(timeYear, timeMonth, timeDay, timeHour, satelliteDirectory, catalogFileName)
+
+    return CELLCOUNT, synchronizerDetails[1:], synchronizerIndex, catalog, getInputFingerprint(latCell, lonCell, synchronizerIndex)
+
+def getCheckpointFileName(fileName, checkpointDirectory=CHECKPOINT_DIRECTORY):
+    """ Return the checkpoint of a composite file, i.e. checkpoints/spring_2003.npz for spring_2003.nc. """
+    return os.path.join(checkpointDirectory, Path(fileName).stem + ".npz")
+
+def getCheckpointProblem(composite, CELLCOUNT, fileIndices, inputFingerprint):
+    """ Return why a composite loaded from a checkpoint cannot be used for a selection, or None if it can. """
+    if composite.cellCount != CELLCOUNT:
+        return f"it has {composite.cellCount} cells, but the mesh has {CELLCOUNT}"
+    if composite.fingerprint != inputFingerprint:
+        return "it was made from a different mesh or synchronizer"
+    tracksOutsideSelection = composite.ingestedFileIndices - set(fileIndices)
+    if tracksOutsideSelection:
+        return f"it has {len(tracksOutsideSelection)} tracks that are not in this selection"
+
+    # The effective sample sizes depend on the order the readings were added. A full build adds the tracks 
+    # in synchronizer (time) order, so new tracks can only be added after the latest track in the checkpoint.
+    newTracks = set(fileIndices) - composite.ingestedFileIndices
+    if newTracks and composite.ingestedFileIndices and min(newTracks) < max(composite.ingestedFileIndices):
+        return "this selection has tracks from before the latest track in the checkpoint"
+    return None
+
+def loadCompositeOrCheckpoint(fileName, CELLCOUNT, fileIndices, inputFingerprint="", checkpointDirectory=CHECKPOINT_DIRECTORY):
+    """ Return the composite saved in the checkpoint of fileName, or a new one if there is no checkpoint
+    or the checkpoint cannot be used (see getCheckpointProblem). """
+    composite = CompositeAccumulator(CELLCOUNT, inputFingerprint, fileIndices)
+    if not checkpointDirectory:
+        return composite
+
+    checkpointFileName = getCheckpointFileName(fileName, checkpointDirectory)
+    if not os.path.exists(checkpointFileName):
+        return composite
+
+    savedComposite = CompositeAccumulator.fromCheckpoint(checkpointFileName)
+    problem = getCheckpointProblem(savedComposite, CELLCOUNT, fileIndices, inputFingerprint)
+    if problem is not None:
+        print(f"Not using checkpoint {checkpointFileName}: {problem}. Building {fileName} from scratch.")
+        return composite
+
+    savedComposite.selectedFileIndices = composite.selectedFileIndices
+    print(f"Loaded checkpoint {checkpointFileName}: {len(savedComposite.ingestedFileIndices)} tracks, "
+          f"{len(savedComposite.addedModelCellsPerDay)} model days")
+    return savedComposite
+
+def saveCompositeCheckpoints(composites, selections, checkpointDirectory=CHECKPOINT_DIRECTORY):
+    """ Save the accumulators of every composite in selections to its checkpoint. """
+    if not checkpointDirectory:
+        return
+    with stage("checkpoint"):
+        os.makedirs(checkpointDirectory, exist_ok=True)
+        for composite, (fileName, timeLabel, fileIndices) in zip(composites, selections):
+            composite.saveCheckpoint(getCheckpointFileName(fileName, checkpointDirectory))
+
+def makeComposites(selections, CELLCOUNT, timeDetails, synchronizerIndex, catalog, 
+                   dailyDataDirectory=perlmutterpathDailyData, layout=COMPOSITE_LAYOUT, 
+                   stackedFileName=STACKED_NETCDF_FILE_NAME, checkpointDirectory=CHECKPOINT_DIRECTORY, inputFingerprint=""):
+    """ Build and write every composite in selections in one pass over the data.
+    selections is a list of (file name, time label, file indices).
+    With layout = "stacked" the composites are written to stackedFileName instead,
+    one record each, labeled with their file names (i.e. spring_2003). 
+    Each satellite track file and each model daily file is read once, 
+    even if it belongs to more than one composite. 
+    If checkpointDirectory is set and a composite has a checkpoint there that was made from the same mesh and 
+    synchronizer (inputFingerprint, see loadCompositeInputs), only the tracks and model days that are not in 
+    the checkpoint are read. The checkpoints are saved as the tracks are read and at the end. """
+
+    composites = [loadCompositeOrCheckpoint(fileName, CELLCOUNT, fileIndices, inputFingerprint, checkpointDirectory) 
+                  for fileName, _, fileIndices in selections]
+
+    # Route each new track to every composite that contains it
+    compositesPerTrack = {}
+    for composite, (fileName, timeLabel, fileIndices) in zip(composites, selections):
+        for fileIndex in fileIndices:
+            if fileIndex not in composite.ingestedFileIndices:
+                compositesPerTrack.setdefault(fileIndex, []).append(composite)
 
-    samplemf[:] = samples
-    sampleof[:] = observations
+    ###################
+    # SATELLITE FILES #
+    ###################
 
-    condition = allFreeboardFromSatelliteData > 0
+    allFileIndices = sorted(compositesPerTrack)
+    timeStrings, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian = timeDetails
 
-    print("===   CALCULATING MEANOF AND STDOF   === ")
-    means = np.mean(allFreeboardFromSatelliteData, axis=0, dtype='float', where=condition)
-    stdDeviations = np.std(allFreeboardFromSatelliteData, axis=0, dtype='float', where=condition)
+    dayCount = 1
+    previousday = timeDay[0]
+    debugPrint(f"New tracks: {len(allFileIndices)}")
 
-    print("Shape of means", means.shape)
-    print("Shape of stdDeviations", stdDeviations.shape)
-    # Observed freeboard mean is the sum of all photon readings per cell over time
-    # divided by the number of tracks (ex. 409 for spring 2003)
-    meanof[:] = means
-    stdof[:] = stdDeviations
+    # Find the file for each track first; this keeps the day count in chronological order
+    satelliteFileNames = []
+    for fileIndex in allFileIndices:
+        satelliteFileName, previousday, dayCount = loadOneSatFile(fileIndex, previousday, dayCount, timeStrings, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian, catalog)
+        satelliteFileNames.append(satelliteFileName)
 
-    print("Number of days", dayCount)
+    # Read the tracks (in parallel if INGEST_WORKERS > 1) and reduce them into the accumulators
+    ingestSatelliteTracks(satelliteFileNames, [compositesPerTrack[fileIndex] for fileIndex in allFileIndices],
+                          fileIndices=allFileIndices, 
+                          modelDays=[getModelDay(synchronizerIndex, fileIndex) for fileIndex in allFileIndices],
+                          saveCheckpoints=lambda: saveCompositeCheckpoints(composites, selections, checkpointDirectory))
+    saveCompositeCheckpoints(composites, selections, checkpointDirectory)
 
-    # # Read data back from variable, print min and max
-    print("===== SATELLITE VARIABLES ======")
-    print("Shape of samplemf", samplemf[:].shape)
-    print("Shape of sampleof", sampleof[:].shape)
-    print("Samplemf Min/Max values:", samplemf[:].min(), samplemf[:].max())
-    print("Sampleof Min/Max values:", sampleof[:].min(), sampleof[:].max())
-    print("Meanof   Min/Max values:", meanof[:].min(),   meanof[:].max())
-    print("Stdof    Min/Max values:", stdof[:].min(),    stdof[:].max())
+    debugPrint("=== FINISHED GRABBING SATELLITE DATA === ")
+    debugPrint("Number of days", dayCount)
 
     # ######################################
     # # CALCULATE FREEBOARD FROM THE MODEL #
     # ######################################
 
-    months = np.array(timeMonth[fileIndices])
-    months = np.unique(months) # Removing duplicate months
-    print(months)
-
-    days = np.array(timeDay[fileIndices])
-
-    # https://stackoverflow.com/questions/32471310/python-split-list-in-subsets-if-the-current-element-is-minor-than-previous-elem
-    daysList = []
-    prev = float('inf')
-    for x in days:
-        if x < prev:
-            temp = []
-            daysList.append(temp)
-        temp.append(x)
-        prev = x
-
-    # Just get unique days on the list of days
-    daysList = [np.unique(np.array(row)) for row in daysList]
-    dayCount = sum(len(x) for x in daysList)
-    print(daysList)
-
-    if(SEASON == "spring" and YEAR in LEAPYEARS):
-        daysList[0] = daysList[0][:-1]
-        dayCount -= 1
-
-    allFreeboardFromE3SM = np.zeros((dayCount+1, CELLCOUNT))
-    print("E3SM Freeboard - all cells: ", allFreeboardFromE3SM.shape)
-
-    for monthIndex, month in enumerate(months):
-        modelDailyDataFile = "v3.LR.historical_0051.mpassi.hist.am.timeSeriesStatsDaily." + str(YEAR) + "-" + str(month).zfill(2) + "-"+ str(1).zfill(2) + ".nc"
-        
-        #modelData           = loadData(runDir, modelDailyDataFile) # LOCAL
-        modelData           = loadData(perlmutterpathDailyData, modelDailyDataFile) #PM
-
-        for dayIndex, day in enumerate(daysList[monthIndex]):
-            print("==============")
-            print(f"Month and day: {month} {day} {YEAR}")
-            snowVolumeCells     = reduceToOneDay(modelData, keyVariableToPlot = "timeDaily_avg_snowVolumeCell", dayNumber = day-1) 
-            iceVolumeCells      = reduceToOneDay(modelData, keyVariableToPlot = "timeDaily_avg_iceVolumeCell", dayNumber = day-1)
-            iceAreaCells        = reduceToOneDay(modelData, keyVariableToPlot = "timeDaily_avg_iceAreaCell", dayNumber = day-1)
-
-            modelTime     = reduceToOneDay(modelData, keyVariableToPlot = START_TIME_VARIABLE, dayNumber = day-1)
-            convertDateBytesToString(modelTime)
-            
-            print("Snow Volume Cells shape:    ", snowVolumeCells.shape)
-            print("Ice Volume Cells shape:     ", iceVolumeCells.shape)
-            print("Ice Area Cells shape:       ", iceAreaCells.shape)
-
-            # Freeboard = Sea Ice Thickness * (1 - Sea Ice Density / Seawater Density) + Snow Thickness (1 - Snow Density / Seawater Density)
-            heightIceCells  = getThickness(iceVolumeCells, iceAreaCells)
-            heightSnowCells = getThickness(snowVolumeCells, iceAreaCells)
-            print("Ice Height Cells shape:     ",   heightIceCells.shape)
-            print("Snow Height Cells shape:    ",  heightSnowCells.shape)
-
-            print("Shape of allFreeboardFromE3SM", allFreeboardFromE3SM.shape)
-            allFreeboardFromE3SM[dayIndex][:] = getFreeboard(heightIceCells, heightSnowCells) #changed from day to dayIndex to see if that helps
-
-    print("E3SM Freeboard - all cells: ", allFreeboardFromE3SM.shape)
-    freeBoardAlongSatelliteTracks = np.zeros((dayCount+1, CELLCOUNT)) 
-
-    # TODO: FIGURE THIS OUT TOMORROW
-    print("\n=====   ALONG TRACK   ======")
-    freeBoardAlongSatelliteTracks[:, cellIndicesForAllSamples] = allFreeboardFromE3SM[:, cellIndicesForAllSamples]
-
-    print("Shape of freeBoardAlongSatelliteTracks: ", freeBoardAlongSatelliteTracks.shape)
-    print("E3SM Freeboard - along satellite track", freeBoardAlongSatelliteTracks)
-
-    print("===   CALCULATING MEANMF AND STDMF   === ")
-    e3smMeans = np.mean(freeBoardAlongSatelliteTracks, axis=0, dtype='float')
-    e3smStdDeviations = np.std(freeBoardAlongSatelliteTracks, axis=0, dtype='float')
-
-    # Observed freeboard mean is the sum of all photon readings per cell over time
-    # divided by the number of tracks (ex. 409 for spring 2003)
-    meanmf[:] = e3smMeans
-    stdmf[:] = e3smStdDeviations
-
-    # Model freeboard mean is 
-    # Model freeboard standard deviation is
-    # Model freeboard effective sample size is
-    # Observation freeboard effective sample size is
+    # Route each model day to every composite with cells on that day that have not been sampled yet
+    compositesPerModelDay = {}
+    for composite in composites:
+        for modelDay in composite.getPendingModelDays():
+            compositesPerModelDay.setdefault(modelDay, []).append(composite)
 
-    print("\n=====   MODEL VARIABLES   ======")
-    print("Meanmf   Min/Max values:", meanmf[:].min(),   meanmf[:].max())
-    print("Stdmf    Min/Max values:", stdmf[:].min(),    stdmf[:].max())
+    debugPrint("Model days: ", sorted(compositesPerModelDay))
+    ingestModelFreeboard(compositesPerModelDay, dailyDataDirectory)
+    saveCompositeCheckpoints(composites, selections, checkpointDirectory)
 
-    time_dim = ncfile.createDimension('time', None)
-    time_string = ncfile.createVariable("time_string", "S1", ('time',))
-    time_string.long_name = "The season and year for this data"
+    if layout == "stacked":
+        print("Writing ", stackedFileName)
+        timeLabels = [Path(fileName).stem for fileName, timeLabel, fileIndices in selections]
+        writeStackedCompositeFile(stackedFileName, composites, timeLabels)
+    else:
+        for composite, (fileName, timeLabel, fileIndices) in zip(composites, selections):
+            print("Writing ", fileName)
+            writeCompositeFile(fileName, composite, timeLabel)
 
-    time_string[:] = [f"{YEAR[-1]}"]
+    printDatasetPoolStats()
 
-    # close the Dataset
-    ncfile.close()
-    print('Dataset is closed!')
+def main():
+    """ Make the composite file for the SEASON and YEAR in config.py. """
+    CELLCOUNT, timeDetails, synchronizerIndex, catalog, inputFingerprint = loadCompositeInputs()
+
+    # Get all file indices for the season and year in one vectorized query
+    fileIndices = synchronizerIndex.select(seasons=SEASON, years=YEAR).tolist()
+    debugPrint(f"File indices for {SEASON} {YEAR}: ", fileIndices)
+
+    makeComposites([(NEW_NETCDF_FILE_NAME, YEAR, fileIndices)], CELLCOUNT, timeDetails, synchronizerIndex, catalog,
+                   inputFingerprint=inputFingerprint)
+    writeInstrumentationReport(extra={"datasetPool": datasetPool.getStats()})
+
+def getSeasonAndYearSelections(synchronizerIndex, seasons=BATCH_SEASONS, years=BATCH_YEARS, outputDirectory=""):
+    """ Return the selections (see makeComposites) for every season and year (i.e. spring_2003.nc ... fall_2008.nc), 
+    and for each season over all of the years (i.e. spring_2003_to_2008.nc) when there is more than one year. """
+    selections = []
+    for season in seasons:
+        for year in years:
+            fileIndices = synchronizerIndex.select(seasons=season, years=year).tolist()
+            selections.append((os.path.join(outputDirectory, f"{season}_{year}.nc"), year, fileIndices))
+
+        # With one year, the composite over all of the years is the same as that year's composite
+        if len(years) > 1:
+            fileIndices = synchronizerIndex.select(seasons=season, years=years).tolist()
+            selections.append((os.path.join(outputDirectory, f"{season}_{years[0]}_to_{years[-1]}.nc"), years[-1], fileIndices))
+    return selections
+
+def mainAllSeasonsAndYears(seasons=BATCH_SEASONS, years=BATCH_YEARS):
+    """ Make a composite file for every season and year (i.e. spring_2003.nc ... fall_2008.nc), 
+    and one for each season over all of the years (i.e. spring_2003_to_2008.nc), in one pass. """
+    CELLCOUNT, timeDetails, synchronizerIndex, catalog, inputFingerprint = loadCompositeInputs()
+
+    selections = getSeasonAndYearSelections(synchronizerIndex, seasons, years)
+    makeComposites(selections, CELLCOUNT, timeDetails, synchronizerIndex, catalog, inputFingerprint=inputFingerprint)
+    writeInstrumentationReport(extra={"datasetPool": datasetPool.getStats()})
 
 if __name__ == "__main__":
     main()
+    #mainAllSeasonsAndYears() # Makes every season and year composite in one pass
@@ -15,10 +15,49 @@
 import matplotlib.animation as animation
 from e3sm_data_visualization import *
 from utility import *
-
-def plotNorthAndSouthTrackAnimation():
-    
-    # Load the data to plot
+from streaming_writer import *
+
+def getTrackFrameEnds(timeCell, frameSeconds=TRACK_FRAME_SECONDS):
+    """ Group the pulses of a track into frames that each cover frameSeconds of the orbit.
+    timeCell is in hours (see convertTime) and in the order the pulses were taken.
+    Returns the index one past the last pulse of each frame; frames with no new pulses are dropped. """
+    frameHours = frameSeconds / 3600
+    boundaries = np.arange(timeCell[0] + frameHours, timeCell[-1] + frameHours, frameHours)
+    frameEnds = np.searchsorted(timeCell, boundaries, side="right")
+    return np.unique(np.append(frameEnds, timeCell.size))
+
+def getFrameTimeStrings(timeCell, frameEnds):
+    """ Return the time of the last pulse in each frame, all at once. """
+    return convertTime(timeCell[frameEnds - 1], printTimes=False)
+
+class IncrementalTrack:
+    """ The scatter plot of one track on one map, which grows frame by frame.
+    Only the pulses in the map's polar cap are drawn. New points are appended to a preallocated
+    offsets buffer, so each frame only copies the points that are new since the last frame. """
+
+    def __init__(self, scatter, cap, projection, frameEnds):
+        self.scatter    = scatter
+        self.x, self.y  = cap.getProjectedXY(projection)
+        self.offsets    = np.empty((self.x.size, 2))
+        self.drawn      = 0
+
+        # cap.indices are in track order, so the frame ends in the cap come from the frame ends in the track
+        self.frameEnds  = np.searchsorted(cap.indices, frameEnds)
+
+    def update(self, frame):
+        end = self.frameEnds[frame]
+        if end < self.drawn:
+            self.drawn = 0  # The animation started over
+
+        self.offsets[self.drawn:end, 0] = self.x[self.drawn:end]
+        self.offsets[self.drawn:end, 1] = self.y[self.drawn:end]
+        self.drawn = end
+
+        self.scatter.set_offsets(self.offsets[:end])
+        return self.scatter
+
+def loadTrackToAnimate(factor=DEFAULT_DOWNSAMPLE_FACTOR):
+    """ Load and downsample the satellite track. Returns latCell, lonCell, timeCell and the variable to plot. """
     output              = loadData(runDir, outputFileName)
     latCell, lonCell    = getLatLon(output)
     timeCell            = getTimeArrayFromStartTime(output, len(lonCell))
@@ -26,8 +65,13 @@ def plotNorthAndSouthTrackAnimation():
     variableToPlot1Day  = reduceToOneDay(output, keyVariableToPlot=VARIABLETOPLOT)
 
     # Downsample the data
-    factor = 100  # Downsampling factor
-    latCell, lonCell, timeCell, variableToPlot1Day = downsampleData(latCell, lonCell, timeCell, variableToPlot1Day, factor)
+    return (downsampleData(latCell, factor), downsampleData(lonCell, factor), 
+            downsampleData(timeCell, factor), downsampleData(variableToPlot1Day, factor))
+
+def plotNorthAndSouthTrackAnimation(frameSeconds=TRACK_FRAME_SECONDS):
+    
+    # Load the data to plot
+    latCell, lonCell, timeCell, variableToPlot1Day = loadTrackToAnimate(factor=100)
 
     # Plot the north and south poles
     fig, northMap, southMap = generateNorthandSouthPoleAxes()
@@ -36,40 +80,31 @@ def plotNorthAndSouthTrackAnimation():
     # Initialize the text box
     textBox = northMap.text(0.05, 0.95, "", transform=northMap.transAxes, fontsize=14, verticalalignment='top', bbox=boxStyling)
 
-    def update(frame):
-        # Update the data stored on each artist for each frame
-        scatterNorth.set_offsets(np.c_[lonCell[:frame], latCell[:frame]])
-        scatterSouth.set_offsets(np.c_[lonCell[:frame], latCell[:frame]])
-
-        # Update the text box with the current time
-        textBoxString = "Time: " + str(convertTime(timeCell[frame]))
-        textBox.set_text(textBoxString)
+    # Each frame adds frameSeconds of the orbit; the frame times are worked out once
+    frameEnds   = getTrackFrameEnds(timeCell, frameSeconds)
+    timeStrings = getFrameTimeStrings(timeCell, frameEnds)
+    trackNorth  = IncrementalTrack(scatterNorth, getPolarCap(latCell, lonCell, "north"), northMap.projection, frameEnds)
+    trackSouth  = IncrementalTrack(scatterSouth, getPolarCap(latCell, lonCell, "south"), southMap.projection, frameEnds)
 
-        return scatterNorth, scatterSouth, textBox
+    def update(frame):
+        # Add the new points to each artist and update the text box with the current time
+        textBox.set_text("Time: " + timeStrings[frame])
+        return trackNorth.update(frame), trackSouth.update(frame), textBox
 
     print("Generated .png file")
 
-    startTime = time.time()
-    ani = animation.FuncAnimation(fig=fig, func=update, frames=latCell.size, interval=1)
-    ani.save(filename=animationFileName, writer="pillow")
-    endTime = time.time()
-    print("It took this much time: ", endTime-startTime)
+    with stage("animation"):
+        ani = animation.FuncAnimation(fig=fig, func=update, frames=frameEnds.size, interval=1)
+        ani.save(filename=animationFileName, writer=getStreamingWriter(animationFileName, interval=1))
+    print("It took this much time: ", stageStats["animation"]["wallSeconds"])
 
     # =======================
     print("Saved .gif file")
 
-def plotNorthPoleTrackAnimation():
+def plotNorthPoleTrackAnimation(frameSeconds=TRACK_FRAME_SECONDS):
     
     # Load the data to plot
-    output              = loadData(runDir, outputFileName)
-    latCell, lonCell    = getLatLon(output)
-    timeCell            = getTimeArrayFromStartTime(output, len(lonCell))
-
-    variableToPlot1Day  = reduceToOneDay(output, keyVariableToPlot=VARIABLETOPLOT)
-
-    # Downsample the data
-    factor = 100  # Downsampling factor
-    latCell, lonCell, timeCell, variableToPlot1Day = downsampleData(latCell, lonCell, timeCell, variableToPlot1Day, factor)
+    latCell, lonCell, timeCell, variableToPlot1Day = loadTrackToAnimate(factor=100)
 
     # Plot the north pole
     fig, northMap = generateNorthPoleAxes()
@@ -78,23 +113,22 @@ def plotNorthPoleTrackAnimation():
     # Initialize the text box
     textBox = northMap.text(0.05, 0.95, "", transform=northMap.transAxes, fontsize=14, verticalalignment='top', bbox=boxStyling)
 
-    def update(frame):
-        # Update the data stored on each artist for each frame
-        scatterNorth.set_offsets(np.c_[lonCell[:frame], latCell[:frame]])
-
-        # Update the text box with the current time
-        textBoxString = "Time: " + str(convertTime(timeCell[frame]))
-        textBox.set_text(textBoxString)
+    # Each frame adds frameSeconds of the orbit; the frame times are worked out once
+    frameEnds   = getTrackFrameEnds(timeCell, frameSeconds)
+    timeStrings = getFrameTimeStrings(timeCell, frameEnds)
+    trackNorth  = IncrementalTrack(scatterNorth, getPolarCap(latCell, lonCell, "north"), northMap.projection, frameEnds)
 
-        return scatterNorth, textBox
+    def update(frame):
+        # Add the new points to the artist and update the text box with the current time
+        textBox.set_text("Time: " + timeStrings[frame])
+        return trackNorth.update(frame), textBox
 
     print("Generated .png file")
 
-    startTime = time.time()
-    ani = animation.FuncAnimation(fig=fig, func=update, frames=latCell.size, interval=1)
-    ani.save(filename=animationFileName, writer="pillow")
-    endTime = time.time()
-    print("It took this much time: ", endTime-startTime)
+    with stage("animation"):
+        ani = animation.FuncAnimation(fig=fig, func=update, frames=frameEnds.size, interval=1)
+        ani.save(filename=animationFileName, writer=getStreamingWriter(animationFileName, interval=1))
+    print("It took this much time: ", stageStats["animation"]["wallSeconds"])
 
     # =======================
     print("Saved .gif file")
@@ -102,6 +136,7 @@ def plotNorthPoleTrackAnimation():
 def main():
     # plotNorthAndSouthTrackAnimation()
     plotNorthPoleTrackAnimation()
+    writeInstrumentationReport()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -21,102 +21,95 @@ import matplotlib.animation as animation
 from e3sm_data_visualization import *
 from utility import *
 from plotting_track_animation import *
+from streaming_writer import *
 
 import time
 import os
 
 def animateTrackLinesNorthAndSouth(filePaths):
     """ Animates all tracks for a given period of time (one day or one month). 
-    Depends on what items are in the specified subdirectory. """
+    Depends on what items are in the specified subdirectory.
+    The figure is written to the file after every track, so the frames are never all in memory.
+    Each track's scatter plot stays on the maps, so the memory and the time to draw a frame 
+    still grow with the number of tracks. """
     
-    artists = []
-    previousTracks = []  # List to keep track of all artists
     fig, northMap, southMap = generateNorthandSouthPoleAxes()
+    fig.subplots_adjust(bottom=0.05, top=0.85, left=0.04, right=0.95, wspace=0.02)
 
-    addMapFeatures(northMap, oceanFeature=OCEANFEATURE, landFeature=LANDFEATURE, grid=GRIDON, coastlines=COASTLINES)
-    addMapFeatures(southMap, oceanFeature=OCEANFEATURE, landFeature=LANDFEATURE, grid=GRIDON, coastlines=COASTLINES)
-       
-    startTime = time.time()
-
-    # Load the mesh and data to plot.
-    for file in filePaths:
-        # Get data from one file
-        output = netCDF4.Dataset(file)
-        latCell, lonCell = getLatLon(output)
-        satelliteTrack = reduceToOneDay(output, keyVariableToPlot=VARIABLETOPLOT, dayNumber=0)
-        
-        textBoxString = "Time: " + printDateTime(output)
-        textBox = northMap.text(0.05, 0.95, textBoxString, transform=northMap.transAxes, fontsize=14,
-                verticalalignment='top', bbox=boxStyling)
-
-        # Plot each track for that day
-        northPoleScatter, southPoleScatter = generateNorthandSouthPoleMaps(fig, northMap, southMap, 
-                                                                           latCell, lonCell, satelliteTrack, 
-                                                                           mapImageFileName, 0,0,0,0,0,0)
-        
-        # Allows it to remember all the tracks (not overwrite with each new track)
-        previousTracks.extend([northPoleScatter, southPoleScatter, textBox])
-        artists.append(list(previousTracks)) 
+    setUpPolarMap(northMap, "north", oceanFeature=OCEANFEATURE, landFeature=LANDFEATURE, grid=GRIDON, coastlines=COASTLINES)
+    setUpPolarMap(southMap, "south", oceanFeature=OCEANFEATURE, landFeature=LANDFEATURE, grid=GRIDON, coastlines=COASTLINES)
+    plt.suptitle(MAP_SUPTITLE_TOP, size="x-large", fontweight="bold")
 
-    ani = animation.ArtistAnimation(fig=fig, artists=artists, interval=100)
-
-    plt.colorbar(northPoleScatter, ax=northMap)
-    plt.colorbar(southPoleScatter, ax=southMap)
+    textBox = northMap.text(0.05, 0.95, "", transform=northMap.transAxes, fontsize=14,
+                verticalalignment='top', bbox=boxStyling)
+       
+    writer = getStreamingWriter(animationFileName, interval=100)
+    with stage("animation"), writer.saving(fig, animationFileName, dpi=fig.dpi):
+        for trackNumber, file in enumerate(filePaths):
+            # Get data from one file
+            output = loadData("", file)
+            latCell, lonCell = getLatLon(output)
+            satelliteTrack = reduceToOneDay(output, keyVariableToPlot=VARIABLETOPLOT, dayNumber=0)
+            
+            textBox.set_text("Time: " + printDateTime(output, printTimes=False))
+
+            # Plot each track for that day. The earlier tracks stay on the maps.
+            northPoleScatter = mapNorthernHemisphere(latCell, lonCell, satelliteTrack, "Arctic Sea Ice", northMap)
+            southPoleScatter = mapSouthernHemisphere(latCell, lonCell, satelliteTrack, "Antarctic Sea Ice", southMap)
+
+            if trackNumber == 0:
+                plt.colorbar(northPoleScatter, ax=northMap)
+                plt.colorbar(southPoleScatter, ax=southMap)
+
+            writer.grab_frame()
 
-    ani.save(filename=animationFileName, writer="pillow")
     print("Saved .gif file")
-
-    endTime = time.time()
-    print("It took this much time: ", endTime-startTime)
+    print("It took this much time: ", stageStats["animation"]["wallSeconds"])
 
 
 def animateTrackLinesNorth(filePaths):
     """ Animates all tracks for a given period of time (one day or one month). 
-    Depends on what items are in the specified subdirectory. """
+    Depends on what items are in the specified subdirectory.
+    The figure is written to the file after every track, so the frames are never all in memory.
+    Each track's scatter plot stays on the map, so the memory and the time to draw a frame 
+    still grow with the number of tracks. """
     
-    artists = []
-    previousTracks = []  # List to keep track of all artists
     fig, northMap = generateNorthPoleAxes()
+    fig.subplots_adjust(bottom=0.05, top=0.85, left=0.04, right=0.95, wspace=0.02)
 
-    addMapFeatures(northMap, oceanFeature=OCEANFEATURE, landFeature=LANDFEATURE, grid=GRIDON, coastlines=COASTLINES)
-
-    startTime = time.time()
+    setUpPolarMap(northMap, "north", oceanFeature=OCEANFEATURE, landFeature=LANDFEATURE, grid=GRIDON, coastlines=COASTLINES)
+    plt.suptitle(MAP_SUPTITLE_TOP, size="x-large", fontweight="bold")
 
-    # Load the mesh and data to plot.
-    for file in filePaths:
-        # Get data from one file
-        output = netCDF4.Dataset(file)
-        latCell, lonCell = getLatLon(output)
-        satelliteTrack = reduceToOneDay(output, keyVariableToPlot=VARIABLETOPLOT, dayNumber=0)
-        
-        textBoxString = "Time: " + printDateTime(output)
-        textBox = northMap.text(0.05, 0.95, textBoxString, transform=northMap.transAxes, fontsize=14,
+    textBox = northMap.text(0.05, 0.95, "", transform=northMap.transAxes, fontsize=14,
                 verticalalignment='top', bbox=boxStyling)
 
-        # Plot each track for that day
-        northPoleScatter = generateNorthPoleMap(fig, northMap,
-                                                         latCell, lonCell, satelliteTrack, 
-                                                         mapImageFileName, 0,0,0,0,0,0)
-        
-        # Allows it to remember all the tracks (not overwrite with each new track)
-        previousTracks.extend([northPoleScatter, textBox])
-        artists.append(list(previousTracks)) 
+    writer = getStreamingWriter(animationFileName, interval=100)
+    with stage("animation"), writer.saving(fig, animationFileName, dpi=fig.dpi):
+        for trackNumber, file in enumerate(filePaths):
+            # Get data from one file
+            output = loadData("", file)
+            latCell, lonCell = getLatLon(output)
+            satelliteTrack = reduceToOneDay(output, keyVariableToPlot=VARIABLETOPLOT, dayNumber=0)
+            
+            textBox.set_text("Time: " + printDateTime(output, printTimes=False))
 
-    ani = animation.ArtistAnimation(fig=fig, artists=artists, interval=100)
+            # Plot each track for that day. The earlier tracks stay on the map.
+            northPoleScatter = mapNorthernHemisphere(latCell, lonCell, satelliteTrack, "Arctic Sea Ice", northMap)
 
-    plt.colorbar(northPoleScatter, ax=northMap)
+            if trackNumber == 0:
+                plt.colorbar(northPoleScatter, ax=northMap)
 
-    ani.save(filename=animationFileName, writer="pillow")
-    print("Saved .gif file")
+            writer.grab_frame()
 
-    endTime = time.time()
-    print("It took this much time: ", endTime-startTime)
+    print("Saved .gif file")
+    print("It took this much time: ", stageStats["animation"]["wallSeconds"])
 
 
 def main():
     filePaths = gatherFiles()
     # animateTrackLinesNorthAndSouth(filePaths)
     animateTrackLinesNorth(filePaths)
+    writeInstrumentationReport()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -8,10 +8,11 @@ def generateNorthPoleStaticPlotOfTrackLatLong(fig, northMap, mapImageFileName, g
                          coastlines=COASTLINES):
     """ Just plot the lat and long of the satellite tracks from multiple satellite files."""
     fileCount, timeStrings, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian = loadSynchronizer()
+    catalog = loadSatelliteCatalog(timeYear, timeMonth, timeDay, timeHour)
     dayCount = 0
 
-    #fileList = returnListOfSatFileNamesBySeasonAndYear("spring", 2003)
-    satelliteFileName, previousday, dayCount = loadOneSatFile(0, 0, dayCount, timeStrings, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian)
+    #fileList = returnListOfSatFileNamesBySeasonAndYear("spring", 2003, catalog)
+    satelliteFileName, previousday, dayCount = loadOneSatFile(0, 0, dayCount, timeStrings, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian, catalog)
     
     fileList = []
     fileList.append(satelliteFileName)
@@ -32,11 +33,12 @@ def generateNorthPoleStaticPlotOfTrackLatLong(fig, northMap, mapImageFileName, g
     # Crop the map to be round instead of rectangular.
     northMap.set_boundary(makeCircle(), transform=northMap.transAxes)
 
+    latCell, lonCell = loadMesh("", meshFileName)
+
     for file in fileList:
         print("Satellite file: ", file)
         satelliteData       = loadData("", file) #PM
         #latCell, lonCell    = getLatLon(satelliteData) #changed to meshFileName
-        latCell, lonCell = loadMesh("", meshFileName)
         scatter = mapNorthernHemisphere(latCell, lonCell, satelliteData,"Arctic_lat_long", northMap, 0.01)     # Map northern hemisphere
 
     plt.suptitle("lat and long", size="x-large", fontweight="bold")
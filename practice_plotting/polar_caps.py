@@ -0,0 +1,134 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# The cells of a mesh that are between the latitude limit and the pole.
+# The mesh does not change during an animation, so the cell indices and
+# their coordinates are found once and reused for every frame.
+# For RENDER_MODE = "raster", each cap also keeps which image pixel every cell falls in.
+
+import numpy as np
+from collections import OrderedDict
+from config import *
+
+# How many (mesh, hemisphere, latitude limit) caps to keep.
+# Satellite tracks come with their own lat/lon arrays, so this keeps the cache from growing per track.
+POLAR_CAP_CACHE_SIZE = 8
+
+class PolarCap:
+    """ The cells north of latLimit (hemisphere="north") or south of -latLimit (hemisphere="south"),
+    with their latitudes and longitudes already gathered. """
+
+    def __init__(self, latCell, lonCell, hemisphere, latLimit=LAT_LIMIT):
+        self.meshLatCell    = latCell
+        self.meshLonCell    = lonCell
+        self.hemisphere     = hemisphere
+        self.latLimit       = latLimit
+
+        # Only capture points between the lat limit and the pole.
+        if hemisphere == "north":
+            self.indices = np.flatnonzero(np.asarray(latCell) > latLimit)
+        else:
+            self.indices = np.flatnonzero(np.asarray(latCell) < -latLimit)
+
+        self.latCell = np.ascontiguousarray(latCell[self.indices])
+        self.lonCell = np.ascontiguousarray(lonCell[self.indices])
+
+        # Projected x and y for each map projection, keyed by the projection's proj4 string
+        self.projectedCoordinates = {}
+
+        # Raster grids, keyed by the projection's proj4 string and the resolution
+        self.rasterGrids = {}
+
+    def getProjectedXY(self, projection):
+        """ Return the x and y of the cap's cells in the native coordinates of a cartopy projection
+        (i.e. NorthPolarStereo). They are transformed once in one vectorized call and then reused,
+        so the scatter can be drawn with transform=projection and cartopy skips reprojecting every point. """
+        key = projection.proj4_init
+        if key not in self.projectedCoordinates:
+            self.projectedCoordinates[key] = projectLonLat(projection, self.lonCell, self.latCell)
+        return self.projectedCoordinates[key]
+
+    def getRasterGrid(self, projection, resolution=None):
+        """ Return the RasterGrid that bins the cap's cells into a resolution x resolution image
+        in the native coordinates of a cartopy projection. It is built once per projection and resolution. 
+        Leave resolution as None to use RASTER_RESOLUTION (read when this is called, so job_runner.py can change it). """
+        if resolution is None:
+            resolution = RASTER_RESOLUTION
+        key = (projection.proj4_init, resolution)
+        if key not in self.rasterGrids:
+            x, y = self.getProjectedXY(projection)
+
+            # The image covers the circle at the latitude limit, so it lines up with the round map boundary
+            circleLon = np.linspace(MINLONGITUDE, MAXLONGITUDE, 361)
+            circleLat = np.full(circleLon.shape, self.latLimit if self.hemisphere == "north" else -self.latLimit)
+            circleX, circleY = projectLonLat(projection, circleLon, circleLat)
+            extent = (circleX.min(), circleX.max(), circleY.min(), circleY.max())
+
+            self.rasterGrids[key] = RasterGrid(x, y, extent, resolution)
+        return self.rasterGrids[key]
+
+    def gather(self, variableToPlot1Day):
+        """ Return the values of one day's variable for the cells in this cap. """
+        return variableToPlot1Day[self.indices]
+
+def projectLonLat(projection, lonCell, latCell):
+    """ Transform longitudes and latitudes (in degrees) into a cartopy projection's x and y. """
+    import cartopy.crs as ccrs  # Imported here so that non-plotting code does not need cartopy
+
+    points = projection.transform_points(ccrs.PlateCarree(), np.asarray(lonCell, dtype=np.float64), 
+                                         np.asarray(latCell, dtype=np.float64))
+    return np.ascontiguousarray(points[:, 0]), np.ascontiguousarray(points[:, 1])
+
+polarCapCache = OrderedDict()
+
+def getPolarCap(latCell, lonCell, hemisphere, latLimit=None):
+    """ Return the cap for this mesh, hemisphere and latitude limit, building it only the first time. 
+    Leave latLimit as None to use LAT_LIMIT (read when this is called, so job_runner.py can change it). """
+    if latLimit is None:
+        latLimit = LAT_LIMIT
+    key = (id(latCell), id(lonCell), hemisphere, latLimit)
+    cap = polarCapCache.get(key)
+
+    # The cap keeps a reference to the mesh arrays, so the ids cannot be reused while it is cached
+    if cap is not None and cap.meshLatCell is latCell and cap.meshLonCell is lonCell:
+        polarCapCache.move_to_end(key)
+        return cap
+
+    cap = PolarCap(latCell, lonCell, hemisphere, latLimit)
+    polarCapCache[key] = cap
+    while len(polarCapCache) > POLAR_CAP_CACHE_SIZE:
+        polarCapCache.popitem(last=False)
+    return cap
+
+class RasterGrid:
+    """ Maps each cell of a polar cap to one pixel of a square image.
+    rasterize() averages one day's values per pixel with np.bincount, so drawing a frame
+    is one imshow of resolution x resolution pixels, however many cells the mesh has. """
+
+    def __init__(self, x, y, extent, resolution=RASTER_RESOLUTION):
+        self.extent     = extent        # (xmin, xmax, ymin, ymax) in projected coordinates, for imshow
+        self.resolution = resolution
+
+        xMin, xMax, yMin, yMax = extent
+        columns = np.clip(((x - xMin) / (xMax - xMin) * resolution).astype(np.intp), 0, resolution - 1)
+        rows    = np.clip(((y - yMin) / (yMax - yMin) * resolution).astype(np.intp), 0, resolution - 1)
+
+        self.pixelIndices   = rows * resolution + columns
+        self.cellsPerPixel  = np.bincount(self.pixelIndices, minlength=resolution * resolution)
+
+    def rasterize(self, capValues):
+        """ Return a (resolution, resolution) masked image with the mean of the cells in each pixel.
+        Pixels without any cells, or with only masked or NaN cells, are masked. Row 0 is the bottom (origin="lower"). """
+        values = np.ma.filled(np.ma.asarray(capValues, dtype=np.float64), np.nan)
+        valid = np.isfinite(values)
+
+        if valid.all():
+            sums    = np.bincount(self.pixelIndices, weights=values, minlength=self.cellsPerPixel.size)
+            counts  = self.cellsPerPixel
+        else:
+            sums    = np.bincount(self.pixelIndices[valid], weights=values[valid], minlength=self.cellsPerPixel.size)
+            counts  = np.bincount(self.pixelIndices[valid], minlength=self.cellsPerPixel.size)
+
+        image = np.full(counts.size, np.nan)
+        np.divide(sums, counts, out=image, where=counts > 0)
+        return np.ma.masked_invalid(image.reshape(self.resolution, self.resolution))
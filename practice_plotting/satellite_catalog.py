@@ -0,0 +1,104 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# A catalog that maps each track in the orbital synchronizer to its preprocessed satellite file.
+# The satellite directory is scanned once and the result is saved to a sidecar .json file,
+# so finding a track's file does not need a glob over the (Lustre) scratch directory every time.
+# The sidecar is kept in the satellite directory and rebuilt when the directory's modification time changes.
+
+import json
+import os
+import fnmatch
+import numpy as np
+from config import *
+
+SATELLITE_FILE_PREFIX = "icesat_E3SM_"
+
+def makeTimeKey(year, month, day, hour):
+    """ Return the key used in the satellite file names, i.e. 2008_02_22_14 """
+    return f"{int(year)}_{int(month):02d}_{int(day):02d}_{int(hour):02d}"
+
+def timeKeyFromFileName(fileName):
+    """ Pull the time key out of a name like icesat_E3SM_spring_2008_02_22_14.nc
+    Returns None if the name does not follow that pattern. """
+    if not fileName.startswith(SATELLITE_FILE_PREFIX) or not fileName.endswith(".nc"):
+        return None
+    parts = fileName[:-len(".nc")].split("_")
+    if len(parts) < 6:
+        return None
+    return "_".join(parts[-4:])
+
+def scanSatelliteDirectory(directory):
+    """ Scan the satellite directory once. Returns a dictionary of time key to file name. """
+    filesByTimeKey = {}
+    with os.scandir(directory) as entries:
+        for entry in sorted(entries, key=lambda entry: entry.name):
+            key = timeKeyFromFileName(entry.name)
+            if key is not None and key not in filesByTimeKey:
+                filesByTimeKey[key] = entry.name
+    return filesByTimeKey
+
+class SatelliteFileCatalog:
+    """ Look up satellite files by synchronizer index, by time key, or by season and year. """
+
+    def __init__(self, directory, filesByTimeKey, indexTimeKeys):
+        self.directory      = directory
+        self.filesByTimeKey = filesByTimeKey
+        self.indexTimeKeys  = indexTimeKeys
+
+    def lookupTimeKey(self, timeKey):
+        """ Return the absolute path of the file for a time key, or None if there is no file. """
+        fileName = self.filesByTimeKey.get(timeKey)
+        if fileName is None:
+            return None
+        return os.path.join(self.directory, fileName)
+
+    def lookupIndex(self, fileIndex):
+        """ Return the absolute path of the file for a synchronizer index, or None if there is no file. """
+        return self.lookupTimeKey(self.indexTimeKeys[fileIndex])
+
+    def fileNamesBySeasonAndYear(self, season="*", year="*"):
+        """ Return the absolute paths of the files that match a season and year (* matches any). """
+        pattern = f"{SATELLITE_FILE_PREFIX}{season}_{year}_*.nc"
+        return [os.path.join(self.directory, fileName) for fileName in sorted(self.filesByTimeKey.values())
+                if fnmatch.fnmatch(fileName, pattern)]
+
+def loadSatelliteCatalog(timeYear, timeMonth, timeDay, timeHour, directory=perlmutterpathSatellites,
+                         catalogFileName=SATELLITE_CATALOG_FILE):
+    """ Load the catalog from the sidecar file, or build it (and save it) if the sidecar
+    is missing, was made for another directory or synchronizer, or the directory has changed since. 
+    A relative catalogFileName is in the satellite directory, so every run finds the same sidecar. """
+    directory = os.path.abspath(directory)
+    catalogFileName = os.path.join(directory, catalogFileName)
+    directoryMtime = os.stat(directory).st_mtime
+    indexTimeKeys = [makeTimeKey(*details) for details in zip(np.asarray(timeYear), np.asarray(timeMonth),
+                                                              np.asarray(timeDay), np.asarray(timeHour))]
+
+    try:
+        with open(catalogFileName) as sidecar:
+            saved = json.load(sidecar)
+        if (saved["directory"] == directory and saved["directoryMtime"] == directoryMtime
+                and saved["indexTimeKeys"] == indexTimeKeys):
+            print("Read satellite catalog: ", catalogFileName)
+            return SatelliteFileCatalog(directory, saved["filesByTimeKey"], indexTimeKeys)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    print("Building satellite catalog for ", directory)
+    filesByTimeKey = scanSatelliteDirectory(directory)
+    saved = {"directory": directory, "directoryMtime": directoryMtime,
+             "indexTimeKeys": indexTimeKeys, "filesByTimeKey": filesByTimeKey}
+    try:
+        with open(catalogFileName, "w") as sidecar:
+            json.dump(saved, sidecar)
+
+        # Making the sidecar in the satellite directory changed the directory's modification time.
+        # Save the new time; writing over the sidecar does not change it again.
+        if os.stat(directory).st_mtime != directoryMtime:
+            saved["directoryMtime"] = os.stat(directory).st_mtime
+            with open(catalogFileName, "w") as sidecar:
+                json.dump(saved, sidecar)
+    except OSError as error:
+        print("Could not save satellite catalog: ", error)
+
+    return SatelliteFileCatalog(directory, filesByTimeKey, indexTimeKeys)
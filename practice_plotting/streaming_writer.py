@@ -0,0 +1,75 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Animation writers that send each frame to the file as soon as it is drawn.
+# matplotlib's "pillow" writer keeps every frame in memory until the end;
+# these keep memory flat no matter how many frames there are.
+
+# Use with FuncAnimation.save(filename, writer=getStreamingWriter(filename, interval)),
+# or call writer.grab_frame() yourself inside writer.saving(fig, filename, dpi).
+
+import io
+import matplotlib.animation as animation
+from PIL import Image, GifImagePlugin
+from instrumentation import *
+
+def quantizeFrame(image):
+    """ Return an image as 256 colors (P mode), the way each .gif frame is stored. """
+    return image.convert("RGB").quantize(256)
+
+@animation.writers.register('streaming_gif')
+class StreamingGifWriter(animation.AbstractMovieWriter):
+    """ Writes a looping .gif one frame at a time. Each frame gets its own 256 color palette. """
+
+    @classmethod
+    def isAvailable(cls):
+        return True
+
+    def setup(self, fig, outfile, dpi=None):
+        super().setup(fig, outfile, dpi=dpi)
+        self.openFile(outfile)
+
+    def openFile(self, outfile):
+        """ Start a new .gif. Use this instead of setup when adding images without a figure. """
+        self.outfile = outfile
+        self.file = open(outfile, "wb")
+        self.frameCount = 0
+
+    @instrumented("frame encode")
+    def writeImage(self, image):
+        """ Append one Pillow image to the .gif and let it go.
+        P mode images (see quantizeFrame) are appended as they are; other images are quantized first. """
+        duration = int(1000 / self.fps)
+        frame = image if image.mode == "P" else quantizeFrame(image)
+
+        if self.frameCount == 0:
+            header, _ = GifImagePlugin.getheader(frame, info={"loop": 0, "duration": duration})
+            for block in header:
+                self.file.write(block)
+            frameBlocks = GifImagePlugin.getdata(frame, duration=duration)
+        else:
+            frameBlocks = GifImagePlugin.getdata(frame, duration=duration, include_color_table=True)
+
+        for block in frameBlocks:
+            self.file.write(block)
+        self.frameCount += 1
+
+    def grab_frame(self, **savefig_kwargs):
+        """ Draw the figure and append it as the next frame. """
+        buffer = io.BytesIO()
+        with stage("frame render"):
+            self.fig.savefig(buffer, **{**savefig_kwargs, "format": "rgba", "dpi": self.dpi})
+        self.writeImage(Image.frombuffer("RGBA", self.frame_size, buffer.getbuffer(), "raw", "RGBA", 0, 1))
+
+    def finish(self):
+        self.file.write(b";")  # GIF trailer
+        self.file.close()
+        debugPrint("Frames written: ", self.frameCount)
+
+def getStreamingWriter(animationFileName, interval):
+    """ Return a writer that does not keep frames in memory:
+    StreamingGifWriter for .gif files, and ffmpeg (which frames are piped to) for videos like .mp4. """
+    fps = 1000 / interval
+    if animationFileName.lower().endswith(".gif"):
+        return StreamingGifWriter(fps=fps)
+    return animation.FFMpegWriter(fps=fps)
@@ -0,0 +1,97 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Fast queries over the orbital synchronizer.
+# The synchronizer's time columns are read once into NumPy arrays, and
+# queries (seasons, years, months, date ranges, hour windows, time ranges)
+# are answered with boolean masks instead of Python loops.
+
+import numpy as np
+
+    #Clusters  1        2         3       4
+SEASONS = ["spring", "summer", "fall", "winter"]
+
+def seasonToCluster(season):
+    """ Return the seasonal cluster number (1 to 4) for a season name or number. """
+    if isinstance(season, str):
+        return SEASONS.index(season.lower()) + 1
+    return int(season)
+
+def makeDateKey(year, month, day):
+    """ Combine a year, month and day into one sortable number, i.e. 20080222 """
+    return np.asarray(year, dtype=np.int64)*10000 + np.asarray(month, dtype=np.int64)*100 + np.asarray(day, dtype=np.int64)
+
+class SynchronizerIndex:
+    """ Holds the time details for every satellite track in the synchronizer as NumPy arrays.
+    Every query returns a boolean mask over the tracks; select() combines them and returns the
+    matching synchronizer indices in chronological order. """
+
+    def __init__(self, timeCluster, timeYear, timeMonth, timeDay, timeHour, timeGregorian):
+        self.cluster    = np.asarray(timeCluster[:]).astype(np.int64)
+        self.year       = np.asarray(timeYear[:]).astype(np.int64)
+        self.month      = np.asarray(timeMonth[:]).astype(np.int64)
+        self.day        = np.asarray(timeDay[:]).astype(np.int64)
+        self.hour       = np.asarray(timeHour[:]).astype(np.int64)
+        self.time       = np.asarray(timeGregorian[:]).astype(np.float64)
+        self.dateKey    = makeDateKey(self.year, self.month, self.day)
+
+        # The synchronizer is in chronological order, but sort anyway so searchsorted is always valid
+        self.timeOrder  = np.argsort(self.time, kind="stable")
+        self.sortedTime = self.time[self.timeOrder]
+
+    def __len__(self):
+        return self.time.size
+
+    def maskForSeasons(self, seasons):
+        """ Tracks in any of the seasons (names like "spring" or cluster numbers 1 to 4). """
+        clusters = [seasonToCluster(season) for season in np.atleast_1d(seasons)]
+        return np.isin(self.cluster, clusters)
+
+    def maskForYears(self, years):
+        """ Tracks in any of the years. """
+        return np.isin(self.year, np.atleast_1d(years).astype(np.int64))
+
+    def maskForMonths(self, months):
+        """ Tracks in any of the months (1 to 12). """
+        return np.isin(self.month, np.atleast_1d(months).astype(np.int64))
+
+    def maskForHourWindow(self, startHour, endHour):
+        """ Tracks with startHour <= hour < endHour. The window wraps past midnight if startHour > endHour. """
+        if startHour <= endHour:
+            return (self.hour >= startHour) & (self.hour < endHour)
+        return (self.hour >= startHour) | (self.hour < endHour)
+
+    def maskForDateRange(self, startDate, endDate):
+        """ Tracks from startDate to endDate, including both. Dates are (year, month, day) tuples. """
+        return (self.dateKey >= makeDateKey(*startDate)) & (self.dateKey <= makeDateKey(*endDate))
+
+    def maskForTimeRange(self, startTime, endTime):
+        """ Tracks with startTime <= time < endTime, in the synchronizer's time units.
+        Uses searchsorted on the sorted time column. """
+        first = np.searchsorted(self.sortedTime, startTime, side="left")
+        last  = np.searchsorted(self.sortedTime, endTime, side="left")
+        mask = np.zeros(self.time.size, dtype=bool)
+        mask[self.timeOrder[first:last]] = True
+        return mask
+
+    def select(self, seasons=None, years=None, months=None, hourWindow=None,
+               startDate=None, endDate=None, startTime=None, endTime=None):
+        """ Return the synchronizer indices that match every query that is given.
+        Leave a query as None to not filter on it. """
+        mask = np.ones(self.time.size, dtype=bool)
+
+        if seasons is not None:
+            mask &= self.maskForSeasons(seasons)
+        if years is not None:
+            mask &= self.maskForYears(years)
+        if months is not None:
+            mask &= self.maskForMonths(months)
+        if hourWindow is not None:
+            mask &= self.maskForHourWindow(*hourWindow)
+        if startDate is not None or endDate is not None:
+            mask &= self.maskForDateRange(startDate or (0, 1, 1), endDate or (9999, 12, 31))
+        if startTime is not None or endTime is not None:
+            mask &= self.maskForTimeRange(-np.inf if startTime is None else startTime,
+                                          np.inf if endTime is None else endTime)
+
+        return np.flatnonzero(mask)
@@ -0,0 +1,63 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+##########
+# TO RUN #
+##########
+
+# Make sure that you navigate to the directory that contains the tests folder (practice_plotting)
+
+# $ python -m pytest tests
+
+# The tests run on the small synthetic data set from benchmarks.py, written once per test session.
+# perlmutterpath.py has each user's own paths and is not in the repo; if it is missing,
+# the tests fill in empty paths, since every test passes its paths explicitly.
+
+import os
+import sys
+import types
+import pytest
+
+PROGRAM_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROGRAM_DIRECTORY)
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+try:
+    import perlmutterpath
+except ImportError:
+    perlmutterpath = types.ModuleType("perlmutterpath")
+    perlmutterpath.perlmutterpath1          = ""
+    perlmutterpath.perlmutterpathMesh       = ""
+    perlmutterpath.perlmutterpathSatellites = ""
+    perlmutterpath.perlmutterpathDailyData  = ""
+    sys.modules["perlmutterpath"] = perlmutterpath
+
+from instrumentation import setQuietMode, isQuietMode
+
+# Small enough to write in a second; two years, so there are multi-year composites
+TEST_CELLS              = 2000
+TEST_YEARS              = (2003, 2004)
+TEST_TRACKS_PER_MONTH   = 6
+TEST_SAMPLES_PER_TRACK  = 2000
+
+@pytest.fixture(autouse=True)
+def quietMode():
+    """ Turn off the debug prints in every test. """
+    originalQuietMode = isQuietMode()
+    setQuietMode(True)
+    yield
+    setQuietMode(originalQuietMode)
+
+@pytest.fixture(scope="session")
+def syntheticData(tmp_path_factory):
+    """ The paths of the synthetic mesh, synchronizer, satellite tracks and daily model files (see benchmarks.py). """
+    from benchmarks import generateSyntheticData
+    return generateSyntheticData(str(tmp_path_factory.mktemp("synthetic_data")), TEST_CELLS, TEST_YEARS,
+                                 TEST_TRACKS_PER_MONTH, TEST_SAMPLES_PER_TRACK)
+
+@pytest.fixture(scope="session")
+def compositeInputs(syntheticData):
+    """ The cell count, time details, synchronizer index, satellite catalog and fingerprint of the synthetic data. """
+    import make_a_netCDF_file as composites
+    return composites.loadCompositeInputs(syntheticData["mesh"], syntheticData["synchronizer"], syntheticData["directory"],
+                                          syntheticData["satelliteDirectory"], syntheticData["catalog"])
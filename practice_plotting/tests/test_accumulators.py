@@ -0,0 +1,107 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Tests for the streaming accumulators, checked against NumPy on every reading kept in memory.
+
+import numpy as np
+import pytest
+from accumulators import *
+
+CELLS = 50
+
+def getLag1AutocorrelationWithLoop(readings):
+    """ r1 = sum((x[t] - mean) * (x[t+1] - mean)) / sum((x[t] - mean)**2), or 0 if it is not defined. """
+    readings = np.asarray(readings)
+    deviations = readings - readings.mean()
+    denominator = np.sum(deviations**2)
+    if readings.size < 2 or denominator == 0:
+        return 0.0
+    return np.sum(deviations[:-1] * deviations[1:]) / denominator
+
+@pytest.fixture
+def tracks():
+    """ 40 tracks, each with readings for a random set of cells. The readings drift over time, 
+    so the cells' readings are autocorrelated. """
+    rng = np.random.default_rng(0)
+    return [(np.sort(rng.choice(CELLS, rng.integers(1, CELLS), replace=False)), 
+             0.3 + 0.01 * track + rng.normal(0, 0.05, CELLS)) for track in range(40)]
+
+def addTracks(accumulator, tracks):
+    """ Add every track and return each cell's readings in the order they were added. """
+    readingsPerCell = [[] for _ in range(CELLS)]
+    for cells, readings in tracks:
+        accumulator.addReadings(cells, readings[cells])
+        for cell in cells:
+            readingsPerCell[cell].append(readings[cell])
+    return readingsPerCell
+
+def test_meanAndStandardDeviationMatchNumPy(tracks):
+    accumulator = FreeboardAccumulator(CELLS + 1)   # The last cell gets no readings
+    readingsPerCell = addTracks(accumulator, tracks)
+
+    np.testing.assert_array_equal(accumulator.count[:CELLS], [len(readings) for readings in readingsPerCell])
+    np.testing.assert_allclose(accumulator.getMean()[:CELLS], [np.mean(readings) for readings in readingsPerCell], rtol=1e-12)
+    np.testing.assert_allclose(accumulator.getStandardDeviation()[:CELLS], [np.std(readings) for readings in readingsPerCell], 
+                               rtol=1e-9, atol=1e-15)
+    assert np.isnan(accumulator.getMean()[CELLS]) and np.isnan(accumulator.getStandardDeviation()[CELLS])
+
+def test_lag1AutocorrelationMatchesLoop(tracks):
+    accumulator = FreeboardAccumulator(CELLS)
+    readingsPerCell = addTracks(accumulator, tracks)
+
+    expected = [getLag1AutocorrelationWithLoop(readings) for readings in readingsPerCell]
+    np.testing.assert_allclose(accumulator.getLag1Autocorrelation(), expected, atol=1e-12)
+    assert np.mean(expected) > 0.3  # The drift makes the readings autocorrelated
+
+def test_effectiveSampleSize(tracks):
+    accumulator = FreeboardAccumulator(CELLS + 1)
+    readingsPerCell = addTracks(accumulator, tracks)
+
+    r1 = np.clip([getLag1AutocorrelationWithLoop(readings) for readings in readingsPerCell], 0, 1)
+    expected = [len(readings) for readings in readingsPerCell] * (1 - r1) / (1 + r1)
+    np.testing.assert_allclose(accumulator.getEffectiveSampleSize()[:CELLS], expected, rtol=1e-10)
+    assert np.isnan(accumulator.getEffectiveSampleSize()[CELLS])
+
+def test_effectiveSampleSizeIsNeverMoreThanTheCount():
+    accumulator = FreeboardAccumulator(3)
+    for readings in ([1.0, 5.0, 2.0], [-1.0, 5.0, 2.0], [1.0, 5.0, 2.0], [-1.0, 5.0, 2.0]):
+        accumulator.addReadings(np.arange(3), readings)
+
+    # Cell 0 alternates (r1 < 0), cell 1 never changes (r1 = 0)
+    assert accumulator.getLag1Autocorrelation()[0] < 0
+    np.testing.assert_array_equal(accumulator.getEffectiveSampleSize()[:2], [4, 4])
+
+def test_stateRoundTrip(tracks):
+    accumulator = FreeboardAccumulator(CELLS)
+    addTracks(accumulator, tracks[:20])
+    restored = FreeboardAccumulator(CELLS)
+    restored.setState(accumulator.getState("observed"), "observed")
+
+    # Adding the rest to the restored accumulator is the same as adding every track to one
+    addTracks(restored, tracks[20:])
+    addTracks(accumulator, tracks[20:])
+    for name, array in accumulator.getState("observed").items():
+        np.testing.assert_array_equal(restored.getState("observed")[name], array, err_msg=name)
+
+def test_reduceTrackReadingsKeepsTheLastPositiveReadingPerCell():
+    cells, readings = reduceTrackReadings(np.array([4, 2, 4, 7, 2, 9]), np.array([0.1, 0.2, 0.3, -0.5, 0.0, 0.6]))
+    assert cells.tolist() == [4, 9]
+    assert readings.tolist() == [0.3, 0.6]
+
+def test_packCellsPerDayRoundTrip():
+    cellsPerDay = {(2003, 2, 1): np.array([3, 8, 9]), (2003, 3, 15): np.array([], dtype=np.int64), (2004, 2, 28): np.array([1])}
+    unpacked = unpackCellsPerDay(*packCellsPerDay(cellsPerDay))
+    assert sorted(unpacked) == sorted(cellsPerDay)
+    for day, cells in cellsPerDay.items():
+        np.testing.assert_array_equal(unpacked[day], cells)
+    assert unpackCellsPerDay(*packCellsPerDay({})) == {}
+
+def test_addTrackCountsEveryRepeatedCell():
+    composite = CompositeAccumulator(6)
+    composite.addTrack(np.array([1, 1, 4]), np.array([0, 5, 5, 5]), np.array([5]), np.array([0.2]), fileIndex=3, modelDay=(2003, 2, 1))
+    composite.addTrack(np.array([4]), np.array([5]), np.array([5]), np.array([0.4]))
+
+    assert composite.samples.tolist() == [0, 2, 0, 0, 2, 0]
+    assert composite.observations.tolist() == [1, 0, 0, 0, 0, 4]
+    assert composite.ingestedFileIndices == {3}
+    assert composite.modelCellsPerDay[(2003, 2, 1)].tolist() == [1, 4]
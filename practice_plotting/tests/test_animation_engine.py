@@ -0,0 +1,77 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Tests for drawing and saving animations with animation_engine.py, on the synthetic mesh and daily files.
+# The map features are off, so nothing is downloaded.
+
+import numpy as np
+import pytest
+import matplotlib.pyplot as plt
+from PIL import Image, ImageSequence
+import utility
+from animation_engine import *
+from make_a_netCDF_file import getModelDailyDataFileName
+
+KEY_VARIABLE    = "timeDaily_avg_iceAreaCell"
+ENGINE_OPTIONS  = dict(colorBarOn=1, grid=0, oceanFeature=0, landFeature=0, coastlines=0, dot_size=1)
+FRAME_COUNT     = 4
+INTERVAL        = 100
+
+@pytest.fixture
+def frames(syntheticData):
+    """ The first FRAME_COUNT days of one synthetic daily file. """
+    dailyFile = syntheticData["dailyDataDirectory"] + getModelDailyDataFileName(2003, 2)
+    return gatherFramesFromFiles([dailyFile], keyVariableToPlot=KEY_VARIABLE)[:FRAME_COUNT]
+
+@pytest.fixture
+def mesh(syntheticData, monkeypatch):
+    """ The synthetic mesh, read without writing .npy files to the mesh cache. """
+    monkeypatch.setattr(utility, "MESH_CACHE_DIRECTORY", "")
+    return loadMesh("", syntheticData["mesh"])
+
+def readGifFrames(fileName):
+    """ Return each frame of a .gif as an RGB array, and the duration of each frame. """
+    with Image.open(fileName) as gif:
+        return [(np.asarray(frame.convert("RGB")), frame.info["duration"]) for frame in ImageSequence.Iterator(gif)]
+
+def test_gatherFramesFromFiles(frames):
+    assert [day for _, day, _ in frames] == list(range(FRAME_COUNT))
+    assert [timeString for _, _, timeString in frames] == [f"2003-02-0{day}_00:00:00" for day in range(1, FRAME_COUNT + 1)]
+
+@pytest.mark.parametrize("hemispheres, renderMode", [(("north", "south"), "scatter"), (("north",), "raster"), 
+                                                     (("south",), "scatter"), (("south",), "raster")])
+def test_savedAnimationHasEveryFrame(mesh, frames, tmp_path, hemispheres, renderMode):
+    latCell, lonCell = mesh
+    engine = PolarAnimationEngine(latCell, lonCell, hemispheres, KEY_VARIABLE, renderMode=renderMode, **ENGINE_OPTIONS)
+    engine.save(frames, str(tmp_path / "animation.gif"), interval=INTERVAL)
+    plt.close(engine.fig)
+
+    gifFrames = readGifFrames(str(tmp_path / "animation.gif"))
+    assert len(gifFrames) == FRAME_COUNT
+    assert [duration for _, duration in gifFrames] == [INTERVAL] * FRAME_COUNT
+    assert not np.array_equal(gifFrames[0][0], gifFrames[1][0])     # Each day is drawn
+
+def test_unknownHemispheresAreRejected(mesh):
+    with pytest.raises(ValueError):
+        PolarAnimationEngine(*mesh, ("east",), KEY_VARIABLE, **ENGINE_OPTIONS)
+
+@pytest.mark.parametrize("hemispheres", [("north", "south"), ("south",)])
+def test_parallelRenderEqualsSerialRender(syntheticData, mesh, frames, tmp_path, hemispheres):
+    latCell, lonCell = mesh
+    engine = PolarAnimationEngine(latCell, lonCell, hemispheres, KEY_VARIABLE, animated=False, **ENGINE_OPTIONS)
+    serialFrames = [np.asarray(engine.renderFrameToPalette(frame).convert("RGB")) for frame in frames]
+    plt.close(engine.fig)
+
+    saveAnimationInParallel(frames, str(tmp_path / "parallel.gif"), workers=2, interval=INTERVAL, 
+                            meshPath=syntheticData["mesh"], hemispheres=hemispheres, keyVariableToPlot=KEY_VARIABLE,
+                            **ENGINE_OPTIONS)
+
+    parallelFrames = readGifFrames(str(tmp_path / "parallel.gif"))
+    assert len(parallelFrames) == FRAME_COUNT
+    for frameNumber, ((parallelFrame, duration), serialFrame) in enumerate(zip(parallelFrames, serialFrames)):
+        np.testing.assert_array_equal(parallelFrame, serialFrame, err_msg=f"frame {frameNumber}")
+        assert duration == INTERVAL
+
+def test_saveAnimationInParallelOnlyWritesGifs(frames, tmp_path):
+    with pytest.raises(ValueError, match="gif"):
+        saveAnimationInParallel(frames, str(tmp_path / "animation.mp4"))
@@ -0,0 +1,22 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Tests for the stage records of instrumentation.py.
+
+import numpy as np
+import pytest
+from instrumentation import *
+
+RISE_BYTES = 100 * 1024 * 1024
+
+@pytest.mark.skipif(getPeakRSS() is None, reason="the peak RSS cannot be measured here")
+def test_peakRSSRiseIsRecordedForTheStageThatRaisedIt():
+    # Going over the peak of the earlier tests by at least RISE_BYTES, however much memory is in use now
+    with stage("test allocation"):
+        array = np.ones((getPeakRSS() + RISE_BYTES) // 8)
+        del array
+    with stage("test after the allocation"):
+        array = np.ones(1024)
+
+    assert stageStats["test allocation"]["peakRSSRiseBytes"] >= 0.9 * RISE_BYTES
+    assert stageStats["test after the allocation"]["peakRSSRiseBytes"] < 0.1 * RISE_BYTES
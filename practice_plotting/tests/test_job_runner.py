@@ -0,0 +1,102 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Tests for the settings that job_runner.py changes while each job runs.
+
+import json
+import numpy as np
+import pytest
+import config
+import utility
+from instrumentation import isQuietMode
+from job_runner import *
+
+def test_jobSettingsChangeEveryCopyAndPutThemBack():
+    originalVmax, originalLatLimit = config.VMAX, utility.LAT_LIMIT
+    with jobSettings({"VMAX": 0.5, "LAT_LIMIT": 80}):
+        assert config.VMAX == 0.5 and utility.VMAX == 0.5
+        assert config.LAT_LIMIT == 80 and utility.LAT_LIMIT == 80
+    assert config.VMAX == originalVmax and utility.VMAX == originalVmax
+    assert utility.LAT_LIMIT == originalLatLimit
+
+def test_jobSettingsArePutBackAfterAnError():
+    originalVmax = utility.VMAX
+    with pytest.raises(RuntimeError):
+        with jobSettings({"VMAX": 0.5}):
+            raise RuntimeError("The job failed")
+    assert utility.VMAX == originalVmax
+
+def test_unknownSettingsAreRejected():
+    originalVmax = utility.VMAX
+    with pytest.raises(ValueError, match="NOT_A_SETTING"):
+        with jobSettings({"VMAX": 0.5, "NOT_A_SETTING": 1}):
+            pass
+    assert utility.VMAX == originalVmax
+
+def test_quietModeSettingUsesSetQuietMode():
+    # The quietMode fixture turned quiet mode on
+    with jobSettings({"QUIET_MODE": False}):
+        assert not isQuietMode()
+    assert isQuietMode()
+
+def test_addDerivedSettings():
+    settings = addDerivedSettings({"VARIABLETOPLOT": "stdof", "SEASON": "fall", "YEAR": "2005"})
+    assert settings["NEW_NETCDF_FILE_NAME"] == "fall_2005.nc"
+    assert settings["animationFileName"] == "stdof_fall_2003_to_2005.gif"
+    assert settings["mapImageFileName"] == "stdof_fall_2005.png"
+    assert settings["MAP_SUPTITLE_TOP"] == "STDOF FALL 2003 - 2005"
+
+    # The job's own names win, and settings without VARIABLETOPLOT, SEASON or YEAR are left alone
+    assert addDerivedSettings({"YEAR": "2005", "mapImageFileName": "mine.png"})["mapImageFileName"] == "mine.png"
+    assert addDerivedSettings({"VMAX": 0.5}) == {"VMAX": 0.5}
+
+@pytest.mark.parametrize("hemispheres, expected", [(["south", "north"], ("north", "south")), 
+                                                   (["south"], ("south",)), (None, ("north", "south"))])
+def test_getHemispheres(hemispheres, expected):
+    job = {} if hemispheres is None else {"hemispheres": hemispheres}
+    assert getHemispheres(job) == expected
+
+@pytest.mark.parametrize("hemispheres", [[], ["east"], ["north", "up"]])
+def test_getHemispheresRejectsUnknownNames(hemispheres):
+    with pytest.raises(ValueError):
+        getHemispheres({"hemispheres": hemispheres})
+
+def test_runJobsReportsEachFailedJob(tmp_path):
+    jobFile = tmp_path / "jobs.json"
+    jobFile.write_text(json.dumps({"settings": {"VMAX": 0.5},
+                                   "jobs": [{"type": "sketch"}, {"type": "plot", "settings": {"NOT_A_SETTING": 1}}]}))
+    originalVmax = utility.VMAX
+
+    results = runJobs(str(jobFile))
+
+    assert [name for name, _, _ in results] == ["0: sketch", "1: plot"]
+    assert "Unknown job type 'sketch'" in results[0][2]
+    assert "NOT_A_SETTING" in results[1][2]
+    assert utility.VMAX == originalVmax
+
+def test_unsupportedSettingsAreRejected():
+    with pytest.raises(ValueError, match="DATASET_POOL_SIZE"):
+        with jobSettings({"DATASET_POOL_SIZE": 4}):
+            pass
+
+@pytest.mark.parametrize("dtype, compressionLevel", [("f8", 0), ("f4", 2)])
+def test_compositeJobWritesTheConfiguredStorage(syntheticData, tmp_path, dtype, compressionLevel):
+    from netCDF4 import Dataset
+    settings = {"meshFileName": syntheticData["mesh"], "SYNCH_FILE_NAME": syntheticData["synchronizer"],
+                "runDir": syntheticData["directory"], "perlmutterpathSatellites": syntheticData["satelliteDirectory"],
+                "SATELLITE_CATALOG_FILE": syntheticData["catalog"], 
+                "perlmutterpathDailyData": syntheticData["dailyDataDirectory"],
+                "COMPOSITE_STATISTICS_TYPE": dtype, "COMPOSITE_COMPRESSION_LEVEL": compressionLevel}
+    job = {"type": "composite", "seasons": ["spring"], "years": ["2004"], "outputDirectory": str(tmp_path)}
+
+    name, seconds, error = runJob(job, settings)
+
+    assert error is None
+    with Dataset(str(tmp_path / "spring_2004.nc")) as composite:
+        for variableName in ("meanof", "stdmf", "effof"):
+            variable = composite.variables[variableName]
+            assert variable.dtype == np.dtype(dtype)
+            assert variable.filters()["zlib"] == (compressionLevel > 0)
+            if compressionLevel > 0:
+                assert variable.filters()["complevel"] == compressionLevel
+        assert composite.variables["samplemf"].dtype == np.dtype(config.COMPOSITE_COUNT_TYPE)
@@ -0,0 +1,210 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Tests for building composites with make_a_netCDF_file.py, on the synthetic data from conftest.py.
+
+import numpy as np
+import netCDF4
+import pytest
+from accumulators import CompositeAccumulator
+from make_a_netCDF_file import *
+
+STATISTICS = ["samplemf", "sampleof", "meanof", "stdof", "meanmf", "stdmf", "effmf", "effof"]
+
+def readComposite(fileName):
+    """ Return every statistic in a composite file, with the empty cells (the fill value) as NaN.
+    Masking is turned off, since netCDF4 would also mask the values outside each variable's valid_range. """
+    with netCDF4.Dataset(fileName) as composite:
+        composite.set_auto_mask(False)
+        statistics = {name: composite[name][:].astype(np.float64) for name in STATISTICS}
+    return {name: np.where(values == FILL_VALUE, np.nan, values) for name, values in statistics.items()}
+
+def assertSameComposite(composite, expectedComposite):
+    for name in STATISTICS:
+        np.testing.assert_array_equal(composite[name], expectedComposite[name], err_msg=name)
+
+def ingestInOneComposite(compositeInputs, fileIndices, workers):
+    """ Read the tracks of fileIndices into a new CompositeAccumulator with ingestSatelliteTracks. """
+    CELLCOUNT, timeDetails, synchronizerIndex, catalog, inputFingerprint = compositeInputs
+    composite = CompositeAccumulator(CELLCOUNT)
+    ingestSatelliteTracks([catalog.lookupIndex(fileIndex) for fileIndex in fileIndices], [[composite]] * len(fileIndices),
+                          workers=workers, fileIndices=fileIndices,
+                          modelDays=[getModelDay(synchronizerIndex, fileIndex) for fileIndex in fileIndices])
+    return composite
+
+def test_parallelIngestEqualsSerialIngest(compositeInputs):
+    synchronizerIndex = compositeInputs[2]
+    fileIndices = synchronizerIndex.select(seasons="spring", years=[2003, 2004]).tolist()
+
+    serial = ingestInOneComposite(compositeInputs, fileIndices, workers=1)
+    parallel = ingestInOneComposite(compositeInputs, fileIndices, workers=3)
+
+    assert serial.observations.sum() > 0
+    np.testing.assert_array_equal(parallel.samples, serial.samples)
+    np.testing.assert_array_equal(parallel.observations, serial.observations)
+    for name, array in serial.observedFreeboard.getState("observed").items():
+        np.testing.assert_array_equal(parallel.observedFreeboard.getState("observed")[name], array, err_msg=name)
+    assert parallel.ingestedFileIndices == serial.ingestedFileIndices == set(fileIndices)
+    assert sorted(parallel.modelCellsPerDay) == sorted(serial.modelCellsPerDay)
+    for modelDay, cells in serial.modelCellsPerDay.items():
+        np.testing.assert_array_equal(parallel.modelCellsPerDay[modelDay], cells)
+
+def buildComposite(compositeInputs, syntheticData, fileName, fileIndices, checkpointDirectory="", inputFingerprint=None):
+    """ Build one composite with makeComposites and return its statistics. """
+    CELLCOUNT, timeDetails, synchronizerIndex, catalog, fingerprint = compositeInputs
+    makeComposites([(str(fileName), "2004", fileIndices)], CELLCOUNT, timeDetails, synchronizerIndex, catalog, 
+                   dailyDataDirectory=syntheticData["dailyDataDirectory"], checkpointDirectory=str(checkpointDirectory),
+                   inputFingerprint=fingerprint if inputFingerprint is None else inputFingerprint)
+    return readComposite(fileName)
+
+@pytest.fixture
+def tracksRead(monkeypatch):
+    """ A list that gets the file name of every satellite track read. """
+    import make_a_netCDF_file as composites
+    fileNames = []
+    readOneSatelliteTrack = composites.readOneSatelliteTrack
+    def readAndRecord(satelliteFileName):
+        fileNames.append(satelliteFileName)
+        return readOneSatelliteTrack(satelliteFileName)
+    monkeypatch.setattr(composites, "readOneSatelliteTrack", readAndRecord)
+    return fileNames
+
+def test_noCheckpointIsWrittenByDefault(compositeInputs, syntheticData, tmp_path, monkeypatch):
+    CELLCOUNT, timeDetails, synchronizerIndex, catalog, inputFingerprint = compositeInputs
+    fileIndices = synchronizerIndex.select(seasons="spring", years=2004).tolist()
+    (tmp_path / "run").mkdir()
+    monkeypatch.chdir(tmp_path / "run")
+
+    # No checkpointDirectory, so makeComposites uses CHECKPOINT_DIRECTORY from config.py
+    makeComposites([(str(tmp_path / "spring_2004.nc"), "2004", fileIndices)], CELLCOUNT, timeDetails, synchronizerIndex,
+                   catalog, dailyDataDirectory=syntheticData["dailyDataDirectory"], inputFingerprint=inputFingerprint)
+
+    assert sorted(path.name for path in tmp_path.rglob("*")) == ["run", "spring_2004.nc"]
+
+def test_resumedBuildEqualsFullBuild(compositeInputs, syntheticData, tmp_path, tracksRead):
+    fileIndices = compositeInputs[2].select(seasons="spring", years=[2003, 2004]).tolist()
+    fullComposite = buildComposite(compositeInputs, syntheticData, tmp_path / "full.nc", fileIndices)
+
+    half = len(fileIndices) // 2
+    buildComposite(compositeInputs, syntheticData, tmp_path / "spring.nc", fileIndices[:half], tmp_path / "checkpoints")
+    del tracksRead[:]
+    resumedComposite = buildComposite(compositeInputs, syntheticData, tmp_path / "spring.nc", fileIndices, tmp_path / "checkpoints")
+
+    assert len(tracksRead) == len(fileIndices) - half     # Only the new tracks were read
+    assertSameComposite(resumedComposite, fullComposite)
+
+@pytest.mark.parametrize("change", ["other selection", "other fingerprint", "older tracks"])
+def test_unusableCheckpointIsBuiltFromScratch(compositeInputs, syntheticData, tmp_path, tracksRead, change):
+    synchronizerIndex = compositeInputs[2]
+    spring2003 = synchronizerIndex.select(seasons="spring", years=2003).tolist()
+    spring2004 = synchronizerIndex.select(seasons="spring", years=2004).tolist()
+    fall2003 = synchronizerIndex.select(seasons="fall", years=2003).tolist()
+    checkpointedTracks, fileIndices, inputFingerprint = {
+        "other selection":      (spring2003, fall2003, None),
+        "other fingerprint":    (spring2003, spring2003 + spring2004, "another mesh"),
+        "older tracks":         (spring2004, spring2003 + spring2004, None),
+    }[change]
+
+    buildComposite(compositeInputs, syntheticData, tmp_path / "composite.nc", checkpointedTracks, tmp_path / "checkpoints")
+    del tracksRead[:]
+    composite = buildComposite(compositeInputs, syntheticData, tmp_path / "composite.nc", fileIndices, 
+                               tmp_path / "checkpoints", inputFingerprint)
+
+    assert len(tracksRead) == len(fileIndices)
+    assertSameComposite(composite, buildComposite(compositeInputs, syntheticData, tmp_path / "fresh.nc", fileIndices,
+                                                  inputFingerprint=inputFingerprint))
+
+def test_checkpointRoundTrip(compositeInputs, tmp_path):
+    synchronizerIndex = compositeInputs[2]
+    fileIndices = synchronizerIndex.select(seasons="fall", years=2004).tolist()
+    composite = ingestInOneComposite(compositeInputs, fileIndices, workers=1)
+    composite.fingerprint, composite.selectedFileIndices = "fingerprint", fileIndices
+
+    composite.saveCheckpoint(str(tmp_path / "fall.npz"))
+    loaded = CompositeAccumulator.fromCheckpoint(str(tmp_path / "fall.npz"), composite.cellCount)
+
+    assert (loaded.fingerprint, loaded.selectedFileIndices) == ("fingerprint", fileIndices)
+    assert loaded.ingestedFileIndices == composite.ingestedFileIndices
+    np.testing.assert_array_equal(loaded.samples, composite.samples)
+    for name, array in composite.observedFreeboard.getState("observed").items():
+        np.testing.assert_array_equal(loaded.observedFreeboard.getState("observed")[name], array, err_msg=name)
+    assert sorted(loaded.modelCellsPerDay) == sorted(composite.modelCellsPerDay)
+    for modelDay, cells in composite.modelCellsPerDay.items():
+        np.testing.assert_array_equal(loaded.modelCellsPerDay[modelDay], cells)
+
+def getReadingsWithLoop(compositeInputs, syntheticData, fileIndices):
+    """ Return the model freeboard readings of each cell, in time order, and samplemf, 
+    worked out one track and one day at a time straight from the files. """
+    CELLCOUNT, timeDetails, synchronizerIndex, catalog, inputFingerprint = compositeInputs
+    cellsPerDay, samples = {}, np.zeros(CELLCOUNT)
+    for fileIndex in fileIndices:
+        with netCDF4.Dataset(catalog.lookupIndex(fileIndex)) as track:
+            cells = track["modcell"][0, :] - 1
+        np.add.at(samples, cells, 1)
+        modelDay = (int(synchronizerIndex.year[fileIndex]), int(synchronizerIndex.month[fileIndex]), int(synchronizerIndex.day[fileIndex]))
+        cellsPerDay[modelDay] = cellsPerDay.get(modelDay, set()) | set(cells.tolist())
+
+    readings = [[] for _ in range(CELLCOUNT)]
+    for year, month, day in sorted(cellsPerDay):
+        with netCDF4.Dataset(syntheticData["dailyDataDirectory"] + getModelDailyDataFileName(year, month)) as daily:
+            snowVolume, iceVolume, iceArea = (np.asarray(daily[name][day - 1], dtype=np.float32) for name in 
+                                              ("timeDaily_avg_snowVolumeCell", "timeDaily_avg_iceVolumeCell", "timeDaily_avg_iceAreaCell"))
+        for cell in sorted(cellsPerDay[(year, month, day)]):
+            heightIce = iceVolume[cell] / iceArea[cell] if iceArea[cell] > 0 else 0
+            heightSnow = snowVolume[cell] / iceArea[cell] if iceArea[cell] > 0 else 0
+            readings[cell].append(heightIce * (DENSITY_WATER - DENSITY_ICE) / DENSITY_WATER 
+                                  + heightSnow * (DENSITY_WATER - DENSITY_SNOW) / DENSITY_WATER)
+    return readings, samples
+
+@pytest.mark.parametrize("resumed", [False, True])
+def test_modelFreeboardMatchesLoop(compositeInputs, syntheticData, tmp_path, resumed):
+    fileIndices = compositeInputs[2].select(seasons="fall", years=[2003, 2004]).tolist()
+    if resumed:
+        buildComposite(compositeInputs, syntheticData, tmp_path / "fall.nc", fileIndices[:len(fileIndices) // 3], tmp_path)
+    composite = buildComposite(compositeInputs, syntheticData, tmp_path / "fall.nc", fileIndices, tmp_path if resumed else "")
+
+    readings, samples = getReadingsWithLoop(compositeInputs, syntheticData, fileIndices)
+    np.testing.assert_array_equal(composite["samplemf"], samples)
+    np.testing.assert_allclose(composite["meanmf"], [np.mean(cellReadings) if cellReadings else np.nan for cellReadings in readings],
+                               rtol=1e-5, atol=1e-7)
+    np.testing.assert_allclose(composite["stdmf"], [np.std(cellReadings) if cellReadings else np.nan for cellReadings in readings], 
+                               rtol=1e-4, atol=1e-6)
+
+def test_monthSlabMatchesOneDayAtATime(syntheticData):
+    days = [1, 5, 6, 28]
+    freeboards = calculateModelFreeboardForMonth(syntheticData["dailyDataDirectory"], 2004, 2, days)
+
+    assert freeboards.shape == (len(days), 2000)
+    with netCDF4.Dataset(syntheticData["dailyDataDirectory"] + getModelDailyDataFileName(2004, 2)) as daily:
+        for day, freeboard in zip(days, freeboards):
+            snowVolume, iceVolume, iceArea = (np.asarray(daily[name][day - 1], dtype=np.float32) for name in 
+                                              ("timeDaily_avg_snowVolumeCell", "timeDaily_avg_iceVolumeCell", "timeDaily_avg_iceAreaCell"))
+            np.testing.assert_array_equal(freeboard, getFreeboard(getThickness(iceVolume, iceArea), getThickness(snowVolume, iceArea)))
+
+def test_getThicknessIsZeroWithNoIce():
+    np.testing.assert_array_equal(getThickness(np.array([1.0, 0.0, 2.0]), np.array([0.5, 0.0, 0.0])), [2.0, 0.0, 0.0])
+
+def test_modelFreeboardThreadsGiveTheSameAccumulators(compositeInputs, syntheticData):
+    fileIndices = compositeInputs[2].select(seasons="spring", years=[2003, 2004]).tolist()
+    modelFreeboards = []
+    for threads in (1, 3):
+        composite = ingestInOneComposite(compositeInputs, fileIndices, workers=1)
+        ingestModelFreeboard({modelDay: [composite] for modelDay in composite.getPendingModelDays()}, 
+                             syntheticData["dailyDataDirectory"], threads=threads)
+        assert composite.getPendingModelDays() == []
+        modelFreeboards.append(composite.modelFreeboard.getState("model"))
+
+    for name, array in modelFreeboards[0].items():
+        np.testing.assert_array_equal(modelFreeboards[1][name], array, err_msg=name)
+
+def test_effectiveSampleSizesAreNeverMasked(compositeInputs, syntheticData, tmp_path):
+    fileIndices = compositeInputs[2].select(seasons="fall", years=[2003, 2004]).tolist()
+    composite = buildComposite(compositeInputs, syntheticData, tmp_path / "fall.nc", fileIndices)
+
+    # Read as most readers do, with netCDF4's masking on; only the empty cells are masked
+    with netCDF4.Dataset(str(tmp_path / "fall.nc")) as maskedComposite:
+        for name in ("effmf", "effof"):
+            assert "valid_range" not in maskedComposite[name].ncattrs()
+            values = maskedComposite[name][:]
+            np.testing.assert_array_equal(np.ma.getmaskarray(values), np.isnan(composite[name]), err_msg=name)
+            np.testing.assert_array_equal(values.filled(np.nan), composite[name], err_msg=name)
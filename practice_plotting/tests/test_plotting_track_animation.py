@@ -0,0 +1,41 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Tests for grouping the pulses of a satellite track into animation frames.
+
+import numpy as np
+from plotting_track_animation import getTrackFrameEnds, getFrameTimeStrings
+
+def getFrameEndsWithLoop(timeCell, frameSeconds):
+    """ Put each pulse in the frame (frameSeconds long, counted from the first pulse) that it ends in, 
+    one pulse at a time, and return the index one past the last pulse of each frame that has pulses. """
+    frameEnds = []
+    for pulse, time in enumerate(timeCell):
+        frame = max(int(np.ceil((time - timeCell[0]) * 3600 / frameSeconds)) - 1, 0)
+        if frameEnds and frameEnds[-1][0] == frame:
+            frameEnds[-1] = (frame, pulse + 1)
+        else:
+            frameEnds.append((frame, pulse + 1))
+    return [end for frame, end in frameEnds]
+
+def test_frameEndsMatchLoop():
+    # Pulses every 0.25 s (in hours, like convertTime), with a 5 minute gap that leaves empty frames
+    rng = np.random.default_rng(0)
+    seconds = np.concatenate((np.arange(0, 600, 0.25), np.arange(900, 1000, 0.25)))
+    seconds = np.sort(seconds + rng.uniform(0, 0.2, seconds.size))
+    timeCell = 36000 + seconds / 3600
+
+    frameEnds = getTrackFrameEnds(timeCell, frameSeconds=60)
+    assert frameEnds.tolist() == getFrameEndsWithLoop(timeCell, 60)
+    assert frameEnds[-1] == timeCell.size
+    assert np.all(np.diff(frameEnds) > 0)
+
+def test_onePulseIsOneFrame():
+    assert getTrackFrameEnds(np.array([12.5]), frameSeconds=60).tolist() == [1]
+
+def test_frameTimeStringsAreTheLastPulseOfEachFrame():
+    timeCell = np.array([0.0, 10, 30, 70, 80, 150]) / 3600
+    frameEnds = getTrackFrameEnds(timeCell, frameSeconds=60)
+    assert frameEnds.tolist() == [3, 5, 6]
+    assert getFrameTimeStrings(timeCell, frameEnds).tolist() == ["2000-01-01 00:00:30", "2000-01-01 00:01:20",
+                                                                "2000-01-01 00:02:30"]
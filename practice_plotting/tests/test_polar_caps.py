@@ -0,0 +1,54 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Tests for the per-pixel means of polar_caps.RasterGrid, on a tiny hand-built grid.
+
+import numpy as np
+from polar_caps import *
+
+# A 4 x 4 image over x and y from 0 to 4, so cell (x, y) falls in row int(y) and column int(x)
+RESOLUTION  = 4
+EXTENT      = (0.0, 4.0, 0.0, 4.0)
+X           = np.array([0.5, 0.7, 3.2, 1.5, 1.1, 3.9, 0.2, 4.0])   # x = 4.0 is on the edge and goes in the last column
+Y           = np.array([0.5, 0.1, 0.4, 2.5, 2.9, 3.9, 3.3, 0.0])
+
+def getPixelMeansWithLoop(values):
+    """ The mean of the finite values in each pixel, or NaN if there are none, one pixel at a time. """
+    image = np.full((RESOLUTION, RESOLUTION), np.nan)
+    for row in range(RESOLUTION):
+        for column in range(RESOLUTION):
+            inPixel = [value for x, y, value in zip(X, Y, values) 
+                       if min(int(y), RESOLUTION - 1) == row and min(int(x), RESOLUTION - 1) == column and np.isfinite(value)]
+            if inPixel:
+                image[row, column] = np.mean(inPixel)
+    return image
+
+def test_rasterizeMatchesPixelMeans():
+    grid = RasterGrid(X, Y, EXTENT, RESOLUTION)
+    values = np.array([1.0, 2.0, 5.0, 0.25, 0.75, -1.0, 8.0, 3.0])
+
+    image = grid.rasterize(values)
+
+    assert image.shape == (RESOLUTION, RESOLUTION)
+    np.testing.assert_allclose(image.filled(np.nan), getPixelMeansWithLoop(values))
+    assert image[0, 0] == 1.5 and image[2, 1] == 0.5 and image[0, 3] == 4.0
+    assert grid.cellsPerPixel.sum() == X.size
+
+def test_emptyPixelsAreMasked():
+    image = RasterGrid(X, Y, EXTENT, RESOLUTION).rasterize(np.arange(X.size, dtype=np.float64))
+    expected = getPixelMeansWithLoop(np.arange(X.size, dtype=np.float64))
+
+    np.testing.assert_array_equal(np.ma.getmaskarray(image), np.isnan(expected))
+    assert np.ma.getmaskarray(image).sum() == RESOLUTION * RESOLUTION - 5  # 8 cells in 5 pixels
+
+def test_nanAndMaskedCellsAreLeftOut():
+    grid = RasterGrid(X, Y, EXTENT, RESOLUTION)
+    values = np.ma.masked_array([1.0, np.nan, 5.0, 0.25, 0.75, -1.0, 8.0, 3.0],
+                                mask=[False, False, False, False, True, False, True, False])
+
+    image = grid.rasterize(values)
+
+    assert image[0, 0] == 1.0                        # Only the finite cell of the two
+    assert image[2, 1] == 0.25                       # The masked cell is left out
+    assert np.ma.is_masked(image[3, 0])              # Its only cell is masked, so the pixel is empty
+    np.testing.assert_allclose(image.filled(np.nan), getPixelMeansWithLoop(np.ma.filled(values, np.nan)))
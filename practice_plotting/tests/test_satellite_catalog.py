@@ -0,0 +1,45 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Tests for where the satellite catalog sidecar is kept and when it is rebuilt.
+
+import os
+import numpy as np
+import pytest
+from satellite_catalog import *
+
+TRACK_TIMES = [(2003, 2, 1, 0), (2003, 2, 1, 6), (2003, 3, 9, 12)]
+
+@pytest.fixture
+def satelliteDirectory(tmp_path):
+    """ A satellite directory with an empty file for each of TRACK_TIMES. """
+    directory = tmp_path / "satellite_data_preprocessed"
+    directory.mkdir()
+    for timeDetails in TRACK_TIMES:
+        (directory / f"{SATELLITE_FILE_PREFIX}spring_{makeTimeKey(*timeDetails)}.nc").touch()
+    return directory
+
+def loadCatalog(directory):
+    return loadSatelliteCatalog(*np.array(TRACK_TIMES).T, directory=str(directory))
+
+def test_sidecarIsKeptInTheSatelliteDirectory(satelliteDirectory, tmp_path, monkeypatch, capsys):
+    for runDirectory in ("first run", "second run"):
+        (tmp_path / runDirectory).mkdir()
+        monkeypatch.chdir(tmp_path / runDirectory)
+        catalog = loadCatalog(satelliteDirectory)
+        assert os.listdir(".") == []
+
+    assert (satelliteDirectory / SATELLITE_CATALOG_FILE).exists()
+    assert capsys.readouterr().out.count("Read satellite catalog") == 1     # The second run did not rebuild it
+    assert catalog.lookupIndex(2) == str(satelliteDirectory / f"{SATELLITE_FILE_PREFIX}spring_2003_03_09_12.nc")
+
+def test_sidecarIsRebuiltWhenTheDirectoryChanges(satelliteDirectory, capsys):
+    loadCatalog(satelliteDirectory)
+    (satelliteDirectory / f"{SATELLITE_FILE_PREFIX}spring_2003_02_01_06.nc").unlink()
+
+    catalog = loadCatalog(satelliteDirectory)
+
+    assert "Read satellite catalog" not in capsys.readouterr().out
+    assert catalog.lookupIndex(1) is None
+    assert loadCatalog(satelliteDirectory).lookupIndex(1) is None
+    assert "Read satellite catalog" in capsys.readouterr().out
@@ -0,0 +1,55 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Tests for the .gif that StreamingGifWriter writes one frame at a time.
+
+import numpy as np
+import pytest
+import matplotlib.pyplot as plt
+from PIL import Image, ImageSequence
+from streaming_writer import *
+
+def readGif(fileName):
+    """ Return the frame count, the loop setting, each frame's duration and each frame as an RGB array. """
+    with Image.open(fileName) as gif:
+        frames = [(frame.info["duration"], np.asarray(frame.convert("RGB"))) for frame in ImageSequence.Iterator(gif)]
+        return gif.n_frames, gif.info.get("loop"), [duration for duration, _ in frames], [image for _, image in frames]
+
+def makeImages(count, size=(40, 30)):
+    """ count RGB images, each one color, so quantizing them does not change them. """
+    return [Image.new("RGB", size, (40 * number, 255 - 40 * number, 100)) for number in range(count)]
+
+@pytest.mark.parametrize("interval", [50, 250])
+def test_writeImageMakesAGifWithEveryFrame(tmp_path, interval):
+    images = makeImages(5)
+    writer = StreamingGifWriter(fps=1000 / interval)
+    writer.openFile(str(tmp_path / "frames.gif"))
+    for number, image in enumerate(images):
+        writer.writeImage(image if number % 2 else quantizeFrame(image))   # RGB and P mode images
+    writer.finish()
+
+    frameCount, loop, durations, frames = readGif(str(tmp_path / "frames.gif"))
+    assert writer.frameCount == frameCount == len(images)
+    assert loop == 0
+    assert durations == [interval] * len(images)
+    for frame, image in zip(frames, images):
+        np.testing.assert_array_equal(frame, np.asarray(image))
+
+def test_animationSaveStreamsEveryFrame(tmp_path):
+    fig, axes = plt.subplots(figsize=(2, 2), dpi=50)
+    line, = axes.plot([], [])
+    axes.set_xlim(0, 10)
+    axes.set_ylim(0, 10)
+    ani = animation.FuncAnimation(fig, lambda frame: line.set_data([0, frame], [0, frame]), frames=range(7))
+    ani.save(str(tmp_path / "line.gif"), writer=getStreamingWriter("line.gif", interval=200))
+    plt.close(fig)
+
+    frameCount, loop, durations, frames = readGif(str(tmp_path / "line.gif"))
+    assert frameCount == 7
+    assert durations == [200] * 7
+    assert frames[0].shape == (100, 100, 3)
+    assert not np.array_equal(frames[0], frames[-1])
+
+def test_getStreamingWriterPicksTheWriterForTheFile():
+    assert isinstance(getStreamingWriter("animation.GIF", 100), StreamingGifWriter)
+    assert isinstance(getStreamingWriter("animation.mp4", 100), animation.FFMpegWriter)
@@ -0,0 +1,62 @@
+# Author:   Breanna Powell
+# Date:     10/18/2026
+
+# Tests for SynchronizerIndex.select, checked against a plain loop over the tracks.
+
+import numpy as np
+import pytest
+from synchronizer_index import *
+
+@pytest.fixture
+def synchronizerIndex():
+    """ 500 random tracks from 2003 to 2008, not in time order. """
+    rng = np.random.default_rng(0)
+    trackCount = 500
+    year, month, day, hour = (rng.integers(2003, 2009, trackCount), rng.integers(1, 13, trackCount),
+                              rng.integers(1, 29, trackCount), rng.integers(0, 24, trackCount))
+    cluster = rng.integers(1, 5, trackCount)
+    gregorian = (year - 2000) * 8760.0 + (month - 1) * 730.0 + (day - 1) * 24.0 + hour
+    return SynchronizerIndex(cluster, year, month, day, hour, gregorian)
+
+def selectWithLoop(synchronizerIndex, keep):
+    """ The indices of the tracks where keep(cluster, year, month, day, hour, time) is True. """
+    return [fileIndex for fileIndex in range(len(synchronizerIndex))
+            if keep(synchronizerIndex.cluster[fileIndex], synchronizerIndex.year[fileIndex], synchronizerIndex.month[fileIndex],
+                    synchronizerIndex.day[fileIndex], synchronizerIndex.hour[fileIndex], synchronizerIndex.time[fileIndex])]
+
+def test_selectBySeasonAndYear(synchronizerIndex):
+    expected = selectWithLoop(synchronizerIndex, lambda cluster, year, *rest: cluster == 3 and year == 2005)
+    assert synchronizerIndex.select(seasons="fall", years="2005").tolist() == expected
+    assert synchronizerIndex.select(seasons=3, years=2005).tolist() == expected
+
+def test_selectBySeveralSeasonsYearsAndMonths(synchronizerIndex):
+    expected = selectWithLoop(synchronizerIndex, lambda cluster, year, month, *rest: 
+                              cluster in (1, 3) and year in (2003, 2008) and month in (2, 3, 10))
+    assert synchronizerIndex.select(seasons=["spring", "fall"], years=["2003", "2008"], months=[2, 3, 10]).tolist() == expected
+
+def test_selectByHourWindow(synchronizerIndex):
+    expected = selectWithLoop(synchronizerIndex, lambda cluster, year, month, day, hour, time: 6 <= hour < 18)
+    assert synchronizerIndex.select(hourWindow=(6, 18)).tolist() == expected
+
+    # A window past midnight
+    expected = selectWithLoop(synchronizerIndex, lambda cluster, year, month, day, hour, time: hour >= 22 or hour < 2)
+    assert synchronizerIndex.select(hourWindow=(22, 2)).tolist() == expected
+
+def test_selectByDateRange(synchronizerIndex):
+    expected = selectWithLoop(synchronizerIndex, lambda cluster, year, month, day, hour, time:
+                              (2004, 2, 15) <= (year, month, day) <= (2006, 11, 1))
+    assert synchronizerIndex.select(startDate=(2004, 2, 15), endDate=(2006, 11, 1)).tolist() == expected
+
+    expected = selectWithLoop(synchronizerIndex, lambda cluster, year, month, day, hour, time: (year, month, day) >= (2007, 6, 1))
+    assert synchronizerIndex.select(startDate=(2007, 6, 1)).tolist() == expected
+
+def test_selectByTimeRange(synchronizerIndex):
+    startTime, endTime = np.sort(synchronizerIndex.time)[[100, 300]]
+    expected = selectWithLoop(synchronizerIndex, lambda cluster, year, month, day, hour, time: startTime <= time < endTime)
+    assert synchronizerIndex.select(startTime=startTime, endTime=endTime).tolist() == expected
+
+    expected = selectWithLoop(synchronizerIndex, lambda cluster, year, month, day, hour, time: time < endTime)
+    assert synchronizerIndex.select(endTime=endTime).tolist() == expected
+
+def test_selectWithNoQueriesReturnsEveryTrack(synchronizerIndex):
+    assert synchronizerIndex.select().tolist() == list(range(len(synchronizerIndex)))
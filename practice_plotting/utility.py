@@ -4,27 +4,169 @@ import netCDF4                      # For opening .nc files for numpy
 import numpy as np
 from datetime import datetime, timedelta 
 import time
-import matplotlib as mpl
+from collections import OrderedDict
+import hashlib
+import os
+from contextlib import contextmanager
+from instrumentation import *
 
-def loadMesh(runDir, meshFileName):
+# Mesh coordinates that were already loaded in this process, keyed by (mesh path, modification time)
+meshCache = {}
+
+def getMeshCacheFileNames(meshPath, modificationTime, cacheDirectory=MESH_CACHE_DIRECTORY):
+    """ Return the .npy file names used to cache the degree coordinates of a mesh. 
+    The names change when the mesh file changes, so an old cache is never used. """
+    key = hashlib.sha1(f"{os.path.abspath(meshPath)}:{modificationTime}".encode()).hexdigest()[:16]
+    baseName = os.path.splitext(os.path.basename(meshPath))[0]
+    return (os.path.join(cacheDirectory, f"{baseName}.{key}.latCell.npy"),
+            os.path.join(cacheDirectory, f"{baseName}.{key}.lonCell.npy"))
+
+def saveMeshCacheFile(fileName, array):
+    """ Save to a temporary file first and then rename it, 
+    so another process never memory-maps a half-written file. """
+    temporaryFileName = f"{fileName}.{os.getpid()}.tmp"
+    with open(temporaryFileName, "wb") as cacheFile:
+        np.save(cacheFile, array)
+    os.replace(temporaryFileName, fileName)
+
+@instrumented("mesh load")
+def loadMesh(runDir, meshFileName, cacheDirectory=None):
     """ Load the mesh from an .nc file. 
-    The mesh must have the same resolution as the output file. """
-    print('Read Mesh: ', runDir, meshFileName)
+    The mesh must have the same resolution as the output file. 
+    The coordinates (in degrees) are kept in memory for this process and in .npy files in the cache directory,
+    which are memory-mapped (read only) so that every process shares the same pages. 
+    Set cacheDirectory to "" to turn off the .npy files, or leave it as None to use MESH_CACHE_DIRECTORY. """
+    if cacheDirectory is None:
+        cacheDirectory = MESH_CACHE_DIRECTORY
+    meshPath = runDir + meshFileName
+    modificationTime = os.stat(meshPath).st_mtime
 
-    dataset = netCDF4.Dataset(runDir + meshFileName)
-    latCell = np.degrees(dataset.variables['latCell'][:]) 
-    lonCell = np.degrees(dataset.variables['lonCell'][:])
+    key = (os.path.abspath(meshPath), modificationTime)
+    if key in meshCache:
+        return meshCache[key]
+
+    debugPrint('Read Mesh: ', runDir, meshFileName)
+
+    if cacheDirectory:
+        latFileName, lonFileName = getMeshCacheFileNames(meshPath, modificationTime, cacheDirectory)
+        if not (os.path.exists(latFileName) and os.path.exists(lonFileName)):
+            latCell, lonCell = readMeshInDegrees(meshPath)
+            os.makedirs(cacheDirectory, exist_ok=True)
+            saveMeshCacheFile(latFileName, latCell)
+            saveMeshCacheFile(lonFileName, lonCell)
+        latCell = np.load(latFileName, mmap_mode='r')
+        lonCell = np.load(lonFileName, mmap_mode='r')
+    else:
+        latCell, lonCell = readMeshInDegrees(meshPath)
 
+    meshCache[key] = (latCell, lonCell)
     return latCell, lonCell
 
+def readMeshInDegrees(meshPath):
+    """ Read latCell and lonCell from the mesh file and convert them from radians to degrees. """
+    countFileOpened()
+    with netCDF4.Dataset(meshPath) as dataset:
+        latCell = np.degrees(np.asarray(countBytesRead(dataset.variables['latCell'][:]))) 
+        lonCell = np.degrees(np.asarray(countBytesRead(dataset.variables['lonCell'][:])))
+
+    return latCell, lonCell
+
+class DatasetPool:
+    """ Keeps up to maxSize netCDF datasets open, so a file that is used again is not reopened.
+    When the pool is full, the least recently used dataset is closed.
+    Datasets that are in use inside a pool.use() block are never closed by the pool. """
+
+    def __init__(self, maxSize=DATASET_POOL_SIZE):
+        self.maxSize    = maxSize
+        self.datasets   = OrderedDict()
+        self.pinCounts  = {}
+        self.hits       = 0
+        self.misses     = 0
+        self.evictions  = 0
+
+    def open(self, path):
+        """ Return the open dataset for this path, opening it if it is not in the pool. """
+        dataset = self.datasets.get(path)
+        if dataset is not None and dataset.isopen():
+            self.hits += 1
+            self.datasets.move_to_end(path)
+            return dataset
+
+        self.misses += 1
+        countFileOpened()
+        dataset = netCDF4.Dataset(path)
+        self.datasets[path] = dataset
+        self.evict()
+        return dataset
+
+    def evict(self):
+        """ Close the least recently used datasets until the pool fits in maxSize. """
+        for path in list(self.datasets):
+            if len(self.datasets) <= self.maxSize:
+                break
+            if self.pinCounts.get(path, 0) > 0:
+                continue
+            self.datasets.pop(path).close()
+            self.evictions += 1
+
+    @contextmanager
+    def use(self, path):
+        """ Open a dataset and keep it open (not evicted) until the end of the with block. """
+        dataset = self.open(path)
+        self.pinCounts[path] = self.pinCounts.get(path, 0) + 1
+        try:
+            yield dataset
+        finally:
+            self.pinCounts[path] -= 1
+            if self.pinCounts[path] == 0:
+                del self.pinCounts[path]
+            self.evict()
+
+    def closeAll(self):
+        """ Close every dataset in the pool. """
+        for dataset in self.datasets.values():
+            if dataset.isopen():
+                dataset.close()
+        self.datasets.clear()
+        self.pinCounts.clear()
+
+    def getStats(self):
+        """ Return the hit, miss and eviction counts and how many datasets are open. """
+        return {"hits": self.hits, "misses": self.misses, 
+                "evictions": self.evictions, "open": len(self.datasets)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closeAll()
+
+# Shared by loadData and openData
+datasetPool = DatasetPool()
+
 def loadData(runDir, outputFileName):
     """ Load the data from an .nc output file. 
     Returns a 1D array of the variable you want to plot of size nCells.
     The indices of the 1D array match with those of the latitude and longitude arrays, 
-    which are also size nCells."""
-    print('Read Output: ', runDir, outputFileName)
+    which are also size nCells.
+    The dataset comes from the shared dataset pool, so do not close it yourself."""
+    debugPrint('Read Output: ', runDir, outputFileName)
+
+    return datasetPool.open(runDir + outputFileName)
 
-    return netCDF4.Dataset(runDir + outputFileName)
+def openData(runDir, outputFileName):
+    """ Use in a with statement to keep a dataset from the pool open for the whole block:
+    with openData(runDir, outputFileName) as output: """
+    debugPrint('Read Output: ', runDir, outputFileName)
+
+    return datasetPool.use(runDir + outputFileName)
+
+def printDatasetPoolStats():
+    """ Print how often the dataset pool found a file already open. """
+    stats = datasetPool.getStats()
+    print("Dataset pool hits: ", stats["hits"], " misses: ", stats["misses"], 
+          " evictions: ", stats["evictions"], " open: ", stats["open"])
+    return stats
 
 def printAllAvailableVariables(output):
     """ See what variables you can use in this netCDF file. 
@@ -35,9 +177,9 @@ def printAllAvailableVariables(output):
 
 def getNumberOfDays(output, keyVariableToPlot=VARIABLETOPLOT):
     """ Find out how many days are in the simulation by looking at the netCDF file 
-    and at the variable you have chosen to plot. """
-    variableForAllDays = output.variables[keyVariableToPlot][:]
-    return variableForAllDays.shape[0]
+    and at the variable you have chosen to plot. 
+    Only the variable's shape is read, not its data. """
+    return output.variables[keyVariableToPlot].shape[0]
 
 def loadAllDays(runDir, meshFileName, outputFileName):
     """ Load the mesh and data to plot. """
@@ -52,25 +194,41 @@ def loadAllDays(runDir, meshFileName, outputFileName):
 
     return latCell, lonCell, output, days
 
+@instrumented("reduce")
 def reduceToOneDay(output, keyVariableToPlot=VARIABLETOPLOT, dayNumber=0):
     """ Reduce the variable to one day's worth of data so we can plot 
     using each index per cell. The indices for each cell of the 
     variableToPlot1Day array coincide with the indices 
-    of the latCell and lonCell. """
+    of the latCell and lonCell. 
+    Only the requested day is read from the file, not the whole variable. """
     
-    variableForAllDays = output.variables[keyVariableToPlot][:]
+    variableForAllDays = output.variables[keyVariableToPlot]
 
     # Check if the variable is one-dimensional
     if variableForAllDays.ndim != 1:
-        return variableForAllDays[dayNumber,:]
+        return countBytesRead(variableForAllDays[dayNumber,:])
     else:
-        return variableForAllDays[:]
+        return countBytesRead(variableForAllDays[:])
+
+@instrumented("reduce")
+def reduceToDayRange(output, keyVariableToPlot=VARIABLETOPLOT, startDay=0, endDay=None):
+    """ Read the days from startDay up to (not including) endDay in one read.
+    Returns a 2D array of (days, nCells); row i is the same as reduceToOneDay(output, key, startDay + i). 
+    Leave endDay as None to read to the last day. """
+    
+    variableForAllDays = output.variables[keyVariableToPlot]
+
+    # A one-dimensional variable has no days to pick from
+    if variableForAllDays.ndim == 1:
+        return countBytesRead(variableForAllDays[:])[np.newaxis, :]
+    
+    return countBytesRead(variableForAllDays[startDay:endDay, :])
 
 def gatherFiles(useFullPath = True, path = FULL_PATH):
     """ Use the subdirectory specified in the config file. 
     Get all files in that folder. """
     filesToPlot = []
-    print("Path to files is ", path)
+    debugPrint("Path to files is ", path)
 
     if useFullPath:
         for root, dirs, files in os.walk(path, topdown=False):
@@ -84,7 +242,7 @@ def gatherFiles(useFullPath = True, path = FULL_PATH):
                 if name.endswith('.nc'):
                     filesToPlot.append(name)
 
-    print("Read this many files: ", len(filesToPlot))
+    debugPrint("Read this many files: ", len(filesToPlot))
 
     return filesToPlot
 
@@ -98,65 +256,76 @@ def downsampleData(variable, factor=DEFAULT_DOWNSAMPLE_FACTOR):
 
 def returnCellIndices(output, cellVariable = CELLVARIABLE):
     """ Get only the indices that correspond to the E3SM mesh. """
-    indices = output.variables[cellVariable][:1]
+    indices = countBytesRead(output.variables[cellVariable][:1])
     return indices.ravel()
 
 def getLatLon(output):
     """ Pull the latitude and longitude variables from an .nc file. """
-    latCell = output.variables[LATITUDEVARIABLE][:1]
+    latCell = countBytesRead(output.variables[LATITUDEVARIABLE][:1])
     latCell = latCell.ravel()
-    lonCell = output.variables[LONGITUDEVARIABLE][:1]
+    lonCell = countBytesRead(output.variables[LONGITUDEVARIABLE][:1])
     lonCell = lonCell.ravel()
     return latCell, lonCell
 
-def printDateTime(output, timeStringVariable = TIMESTRINGVARIABLE, days = 1):
+def decodeTimeStrings(charArray):
+    """ Decode a netCDF character array, like xtime_startDaily or time_string, into an array of strings.
+    Every record is decoded at once with netCDF4.chartostring; the null padding is dropped. 
+    Empty records are left out. """
+    charArray = np.ma.filled(np.ma.asarray(charArray), b"")
+    if charArray.ndim == 1:
+        charArray = charArray[np.newaxis, :]  # One record, i.e. from reduceToOneDay
+    timeStrings = netCDF4.chartostring(charArray)
+    return timeStrings[timeStrings != ""]
+
+def returnOneOrList(timeStrings, printTimes):
+    """ Optionally print the decoded times. Return one string if there is only one, otherwise a list. """
+    if len(timeStrings) == 1:
+        if printTimes:
+            debugPrint(timeStrings[0])
+        return str(timeStrings[0])
+
+    timeStrings = timeStrings.tolist()
+    if printTimes:
+        debugPrint(timeStrings)
+    return timeStrings
+
+def printDateTime(output, timeStringVariable = TIMESTRINGVARIABLE, days = 1, printTimes = True):
     """ Prints and returns the date from the .nc file's time string variable. 
     This assumes that the time needs to be decoded and is the format
     [b'0' b'0' b'0' b'1' b'-' b'0' b'1' b'-' b'0' b'2' b'_' b'0' b'0' b':' b'0' b'0' b':' b'0' b'0']
+    Set printTimes to False to skip printing, i.e. for all the records of a synchronizer.
     """
 
     # Get all the time variables
-    rawTime = output.variables[timeStringVariable][:days]
-    rawTime = rawTime.ravel()
-    rawTime = bytearray(rawTime).decode()
-    timeStrings = rawTime.split('\x00')
-    timeStrings[:] = [x for x in timeStrings if x]
-    
-    if len(timeStrings) == 1:
-        print(timeStrings[0])
-        return timeStrings[0]
-    
-    print(timeStrings)
-    return timeStrings
+    rawTime = countBytesRead(output.variables[timeStringVariable][:days])
+    return returnOneOrList(decodeTimeStrings(rawTime), printTimes)
 
-def convertDateBytesToString(bytesTime):
+def convertDateBytesToString(bytesTime, printTimes = True):
     """ Prints and returns the date from a byte string. 
     This assumes that the time needs to be decoded and is the format
     [b'0' b'0' b'0' b'1' b'-' b'0' b'1' b'-' b'0' b'2' b'_' b'0' b'0' b':' b'0' b'0' b':' b'0' b'0']
     """
-    bytesTime = bytearray(bytesTime).decode()
-    timeStrings = bytesTime.split('\x00')
-    timeStrings[:] = [x for x in timeStrings if x]
-    
-    if len(timeStrings) == 1:
-        print(timeStrings[0])
-        return timeStrings[0]
-    
-    print(timeStrings)
-    return timeStrings
+    return returnOneOrList(decodeTimeStrings(bytesTime), printTimes)
 
-def convertTime(timeToConvert):
-    """ Convert time from proleptic_gregorian to a human-readable string."""
-    base_date = datetime(2000, 1, 1)
-    d = base_date + timedelta(hours=timeToConvert)
-    timeString = d.strftime("%Y-%m-%d %H:%M:%S")
-    print("Time converted", timeString)
-    return timeString
+def convertTimeToDatetime64(timeToConvert):
+    """ Convert times in hours since 2000-01-01 (proleptic_gregorian) to numpy datetime64, to the microsecond. """
+    hours = np.asarray(timeToConvert, dtype=np.float64)
+    return np.datetime64("2000-01-01T00:00:00") + np.round(hours * 3600e6).astype("timedelta64[us]")
+
+def convertTime(timeToConvert, printTimes = True):
+    """ Convert time from proleptic_gregorian to a human-readable string.
+    Works on one time or a whole array of times; an array returns an array of strings. """
+    timeStrings = np.char.replace(np.datetime_as_string(convertTimeToDatetime64(timeToConvert), unit="s"), "T", " ")
+    if np.ndim(timeStrings) == 0:
+        timeStrings = str(timeStrings)
+    if printTimes:
+        debugPrint("Time converted", timeStrings)
+    return timeStrings
 
 def getTimeArrayFromStartTime(output, length):
     """ Pull the starting timestamp from the .nc file. 
-    Populate an array with times. (These are approximate, not real)"""
-    start = float(output.variables["time"][:1])
-    stop = output.variables[TIMEVARIABLE][:1] + length
+    Populate an array with length times, in hours. (These are approximate, not real)
+    Use convertTime or convertTimeToDatetime64 on the result to get dates. """
+    start = float(output.variables[TIMEVARIABLE][:1])
     step = .00036 # How much time elapses between pulses (there are 10,000 pulses per second)
-    return np.arange(start, stop, step)
\ No newline at end of file
+    return start + np.arange(length) * step
\ No newline at end of file